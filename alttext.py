@@ -0,0 +1,229 @@
+import base64
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageChops
+
+from storage import load_json, save_json, data_dir
+
+MODEL = "gpt-4o"
+# Gleichzeitige Anfragen an die OpenAI-API
+MAX_IN_FLIGHT = 4
+# Kantenlänge der Vorschau, die statt der ganzen Datei gesendet wird ("detail": "low" nutzt ohnehin 512 px)
+THUMBNAIL_SIZE = 512
+THUMBNAIL_QUALITY = 80
+
+# dHash mit 8x8 = 64 Bit; bis zu so vielen abweichenden Bits gilt ein Bild als gleich
+HASH_SIZE = 8
+DEFAULT_THRESHOLD = 8
+DEFAULT_MAX_ENTRIES = 5000
+# Mittlere Farbe des Motivs: so weit darf jeder Kanal abweichen (der dHash sieht nur Helligkeit)
+COLOR_TOLERANCE = 32
+CACHE_VERSION = 2
+
+PROMPT = (
+    "Erstelle einen prägnanten Alt-Text mit maximal 125 Zeichen für das angehängte Produktbild. "
+    "Beschreibe objektiv, was auf dem Bild zu sehen ist, idealerweise mit Hinweisen auf Art, "
+    "Einsatzbereich oder Zielgruppe. Hinterlege Markennamen und Modell wenn diese ersichtlich sind. "
+    "Keine Erklärungen oder Meta-Kommentare wie zb 'Markenname nicht erkenntlich', nur der reine Alt-Text. "
+    "Schreibe nicht zu hochgestochen, sondern so, dass es für eine breite Zielgruppe verständlich ist."
+)
+
+
+def thumbnail_data_url(image_path, size=THUMBNAIL_SIZE):
+    """Verkleinert das Bild im Speicher und liefert es als JPEG-Data-URL."""
+    with Image.open(image_path) as img:
+        img.draft("RGB", (size, size))
+        img.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=2.0)
+        if img.mode in ("RGBA", "LA", "P"):
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.getchannel("A"))
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+        buffer = io.BytesIO()
+        img.save(buffer, "JPEG", quality=THUMBNAIL_QUALITY)
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+def perceptual_hash(image_path):
+    """
+    Differenz-Hash (dHash) als 64-Bit-Zahl plus mittlere Farbe (r, g, b) des Motivs, damit
+    rote und blaue Varianten desselben Produkts nicht zusammenfallen. Ein einfarbiger Rand,
+    etwa der weiße Hintergrund der quadratischen Variante, wird vorher abgeschnitten.
+    """
+    with Image.open(image_path) as img:
+        img.draft("RGB", (256, 256))
+        img.thumbnail((256, 256), Image.Resampling.BOX, reducing_gap=2.0)
+        if img.mode in ("RGBA", "LA", "P"):
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.getchannel("A"))
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+        gray = img.convert("L")
+
+    border = Image.new("L", gray.size, gray.getpixel((0, 0)))
+    bbox = ImageChops.difference(gray, border).point(lambda v: 255 if v > 8 else 0).getbbox()
+    if bbox:
+        img, gray = img.crop(bbox), gray.crop(bbox)
+    color = img.resize((1, 1), Image.Resampling.BOX).getpixel((0, 0))
+
+    pixels = gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BOX).tobytes()
+    bits = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + col]
+            bits = bits << 1 | (left > pixels[row * (HASH_SIZE + 1) + col + 1])
+    return bits, color
+
+def same_color(a, b, tolerance=COLOR_TOLERANCE):
+    return all(abs(x - y) <= tolerance for x, y in zip(a, b))
+
+def request_alt_text(client, image_path):
+    """Fragt einen ALT-Text für das Bild bei der OpenAI-API an (blockierend)."""
+    response = client.chat.completions.create(
+        model=MODEL,
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": PROMPT},
+                    {"type": "image_url", "image_url": {"url": thumbnail_data_url(image_path), "detail": "low"}},
+                ]
+            }
+        ],
+        max_tokens=100
+    )
+    return response.choices[0].message.content.strip()
+
+
+class AltTextCache:
+    """
+    ALT-Texte auf der Platte, Schlüssel ist perceptual_hash() des Bildes. Ein Eintrag passt,
+    wenn höchstens `threshold` der 64 Bits abweichen (Re-Exporte, Varianten, leicht andere
+    Ausschnitte) und die mittlere Farbe übereinstimmt. Über `max_entries` werden die am
+    längsten unbenutzten verdrängt.
+
+    store() überschreibt nur einen Eintrag mit genau diesem Hash und derselben Farbe, etwa
+    wenn der Benutzer den KI-Vorschlag korrigiert; ähnliche Bilder bekommen einen eigenen
+    Eintrag. Threadsicher.
+    """
+
+    def __init__(self, path=None, threshold=DEFAULT_THRESHOLD, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path or os.path.join(data_dir(), "alttext-cache.json")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        data = load_json(self.path, {})
+        entries = data.get("entries", []) if data.get("version") == CACHE_VERSION else []
+        self.entries = [{**entry, "hash": int(entry["hash"], 16), "color": tuple(bytes.fromhex(entry["color"]))}
+                        for entry in entries]
+        self.lock = threading.Lock()
+        self.dirty = False
+
+    def _nearest(self, key):
+        image_hash, color = key
+        best, best_distance = None, self.threshold + 1
+        for entry in self.entries:
+            distance = (entry["hash"] ^ image_hash).bit_count()
+            if distance < best_distance and same_color(entry["color"], color):
+                best, best_distance = entry, distance
+        return best
+
+    def lookup(self, key):
+        with self.lock:
+            entry = self._nearest(key)
+            if entry is not None:
+                entry["used"] = time.time()
+                self.dirty = True
+            return entry
+
+    def store(self, key, text, source):
+        """source: "ai" oder "user"."""
+        image_hash, color = key
+        with self.lock:
+            entry = next((entry for entry in self.entries
+                          if entry["hash"] == image_hash and same_color(entry["color"], color)), None)
+            if entry is None:
+                entry = {"hash": image_hash, "color": color}
+                self.entries.append(entry)
+            entry.update(text=text, source=source, used=time.time())
+            if len(self.entries) > self.max_entries:
+                self.entries.sort(key=lambda e: e["used"], reverse=True)
+                del self.entries[self.max_entries:]
+            self.dirty = True
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            save_json(self.path, {
+                "version": CACHE_VERSION,
+                "entries": [{**entry, "hash": f"{entry['hash']:016x}", "color": bytes(entry["color"]).hex()}
+                            for entry in self.entries],
+            })
+            self.dirty = False
+
+
+class AltTextGenerator:
+    """
+    Erzeugt ALT-Texte im Hintergrund, sobald ein Bild fertig konvertiert ist, mit höchstens
+    `max_in_flight` gleichzeitigen Anfragen. submit() liefert ein Future und ist für
+    denselben Pfad idempotent, der Dialog findet den Text also meist schon fertig vor.
+
+    Das Future liefert {"text", "source"} mit source "cache" oder "ai", oder None, wenn
+    ohne API-Key nichts im AltTextCache stand.
+    """
+
+    def __init__(self, api_key, max_in_flight=MAX_IN_FLIGHT, cache=None):
+        self.api_key = api_key
+        self.cache = cache
+        self.pool = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="alttext")
+        self.futures = {}
+        self.lock = threading.Lock()
+        self._client = None
+
+    def client(self):
+        with self.lock:
+            if self._client is None:
+                from openai import OpenAI  # erst laden, wenn wirklich ein Text gebraucht wird
+                self._client = OpenAI(api_key=self.api_key)
+            return self._client
+
+    def submit(self, image_path, refresh=False):
+        with self.lock:
+            future = self.futures.get(image_path)
+            if future is None or refresh:
+                # Neu generieren heißt: am Cache vorbei die KI fragen
+                future = self.futures[image_path] = self.pool.submit(self._generate, image_path, not refresh)
+            return future
+
+    def pending(self, image_path):
+        """True, wenn für das Bild schon ein Text angefordert wurde (fertig oder unterwegs)."""
+        with self.lock:
+            return image_path in self.futures
+
+    def _generate(self, image_path, use_cache):
+        key = perceptual_hash(image_path) if self.cache is not None else None
+        if use_cache and key is not None:
+            entry = self.cache.lookup(key)
+            if entry is not None:
+                return {"text": entry["text"], "source": "cache"}
+        if not self.api_key:
+            return None
+        text = request_alt_text(self.client(), image_path)
+        if key is not None:
+            self.cache.store(key, text, "ai")
+        return {"text": text, "source": "ai"}
+
+    def remember(self, image_path, text):
+        """Merkt sich den vom Benutzer bestätigten Text; blockiert kurz für den Hash."""
+        if self.cache is not None:
+            self.cache.store(perceptual_hash(image_path), text, "user")
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        if self.cache is not None:
+            self.cache.save()
@@ -0,0 +1,183 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from converter import convert_image, ENCODE_PROFILES, estimate_peak_memory, measure_encode_speed, output_megapixels
+
+# Aufschlag auf die reine Kodierzeit für Dekodieren, Skalieren und Schreiben
+PIPELINE_OVERHEAD = 1.5
+
+# Falls der installierte Arbeitsspeicher nicht ermittelbar ist
+FALLBACK_MEMORY_LIMIT = 4 * 1024 ** 3
+
+# Kodierart im Ergebnis → Text für die Meldung
+KIND_LABELS = {"lossy": "verlustbehaftet", "near_lossless": "nahezu verlustfrei", "lossless": "verlustfrei"}
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+def choose_profile_for_deadline(jobs, minutes, workers=None):
+    """
+    Wählt das Profil mit dem kleinsten Ergebnis, das den Batch voraussichtlich in `minutes`
+    Minuten schafft. Grundlage sind die Megapixel aus den Dateiköpfen und die auf diesem
+    Rechner gemessene Kodiergeschwindigkeit. Schafft es keins, wird "fast" gewählt.
+    Rückgabe: (Profil, geschätzte Sekunden)
+    """
+    workers = workers or default_workers()
+    megapixels = 0.0
+    for job in jobs:
+        try:
+            megapixels += output_megapixels(job["input_path"], job["max_size"], job["square"], job.get("variants"))
+        except OSError:
+            pass
+
+    estimates = {
+        profile: megapixels * measure_encode_speed(profile) * PIPELINE_OVERHEAD / workers
+        for profile in ENCODE_PROFILES
+    }
+    for profile in reversed(list(ENCODE_PROFILES)):
+        if estimates[profile] <= minutes * 60:
+            return profile, estimates[profile]
+    fastest = next(iter(ENCODE_PROFILES))
+    return fastest, estimates[fastest]
+
+def run_job(job):
+    """Führt einen Konvertierungsauftrag im Worker-Prozess aus und liefert ein Ergebnis-Dict."""
+    name = os.path.basename(job["input_path"])
+    start = time.perf_counter()
+    try:
+        result = convert_image(**job)
+        result["ok"] = True
+        result["message"] = f"{name} erfolgreich konvertiert ({result['original_size']} → {result['size']})"
+        if result.get("frames"):
+            result["message"] += f", animiert ({result['frames']} von {result['source_frames']} Frames)"
+        elif job.get("max_bytes") and all(kind == "lossy" for kind in result["compression"]):
+            result["message"] += f", Qualität {'/'.join(str(q) for q in result['qualities'])}"
+        elif job.get("max_bytes") or job.get("compression"):
+            # Die Qualität zählt nur bei verlustbehafteter Kodierung
+            labels = [
+                f"Qualität {quality}" if kind == "lossy" and job.get("max_bytes") else KIND_LABELS[kind]
+                for quality, kind in zip(result["qualities"], result["compression"])
+            ]
+            result["message"] += f", {'/'.join(labels)}"
+    except Exception as e:
+        result = {"input": job["input_path"], "ok": False, "message": f"Fehler bei {name}: {e}"}
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+def physical_memory():
+    """Installierter Arbeitsspeicher in Bytes oder None, falls nicht ermittelbar."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        pass
+    if sys.platform.startswith("win"):
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullTotalPhys
+    return None
+
+def default_memory_limit():
+    """Standard-Obergrenze für alle gleichzeitig laufenden Konvertierungen: 60 % des RAM."""
+    total = physical_memory()
+    return int(total * 0.6) if total else FALLBACK_MEMORY_LIMIT
+
+def job_memory(job):
+    """Geschätzter Spitzenspeicher eines Auftrags; 0, wenn der Dateikopf nicht lesbar ist."""
+    try:
+        return estimate_peak_memory(job["input_path"], job["max_size"], job["square"], job.get("variants"))
+    except Exception:
+        return 0  # Der Worker meldet den eigentlichen Fehler
+
+def run_batch(jobs, workers=None, cancel_event=None, cache=None, memory_limit=None):
+    """
+    Verarbeitet Aufträge (Dicts mit den Argumenten von convert_image) in einem Prozesspool
+    und liefert die Ergebnisse in Abschlussreihenfolge. Aufträge werden erst abgerufen,
+    wenn im Pool Platz ist, daher darf `jobs` auch ein Generator sein.
+
+    Mit einem ConversionCache werden unveränderte Quellen übersprungen (Ergebnis mit
+    "cached": True) und neue Ergebnisse im Manifest eingetragen.
+
+    Mit `memory_limit` (Bytes) wird vor dem Start jedes Auftrags sein Spitzenspeicher aus
+    dem Dateikopf geschätzt. Ein Auftrag startet nur, solange die Summe aller laufenden
+    Schätzungen unter dem Limit bleibt; liegt er allein schon darüber, läuft er ohne andere.
+    """
+    workers = workers or default_workers()
+    jobs = iter(jobs)
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending = set()
+    cache_keys = {}
+    memory = {}
+    held = None  # (Auftrag, Cache-Schlüssel, Speicher), der auf freien Speicher wartet
+    exhausted = False
+    cancelled = False
+    try:
+        while True:
+            cancelled = cancel_event is not None and cancel_event.is_set()
+            if cancelled:
+                break
+
+            # Höchstens zwei Aufträge pro Prozess vorhalten, damit ein Abbruch schnell greift
+            while (held or not exhausted) and len(pending) < workers * 2:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+
+                if held is None:
+                    job = next(jobs, None)
+                    if job is None:
+                        exhausted = True
+                        break
+
+                    key = None
+                    if cache is not None:
+                        try:
+                            key = cache.key(job)
+                        except OSError:
+                            pass  # Quelle nicht lesbar, der Worker meldet den Fehler
+                        entry = cache.lookup(key) if key else None
+                        if entry is not None:
+                            yield cache.cached_result(entry, job["input_path"])
+                            continue
+
+                    held = (job, key, job_memory(job) if memory_limit else 0)
+
+                job, key, needed = held
+                if pending and memory_limit and sum(memory.values()) + needed > memory_limit:
+                    break  # warten, bis laufende Aufträge Speicher freigeben
+
+                future = pool.submit(run_job, job)
+                cache_keys[future] = key
+                memory[future] = needed
+                pending.add(future)
+                held = None
+
+            if not pending:
+                break
+
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                key = cache_keys.pop(future)
+                memory.pop(future)
+                if key and result["ok"]:
+                    cache.store(key, result)
+                yield result
+    finally:
+        # Bei Abbruch laufen begonnene Bilder im Hintergrund zu Ende, Wartendes wird verworfen
+        pool.shutdown(wait=not (cancelled or pending), cancel_futures=True)
+        if cache is not None:
+            cache.save()
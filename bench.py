@@ -0,0 +1,234 @@
+"""
+Reproduzierbarer Benchmark für die Konvertierung:
+
+    python bench.py --out bench-<commit>.json
+    python bench.py --compare alt.json neu.json
+
+Erzeugt lokal einen synthetischen Testkorpus (JPEG, PNG mit Alpha, GIF mit Palette,
+16-Bit-TIFF; 500 bis 8000 px Kantenlänge) und misst pro Bild die Zeit je Verarbeitungsschritt,
+Ausgabegröße und Spitzen-RSS, jeweils mit und ohne quadratische Ausgabe. Zusätzlich läuft der
+ganze Korpus einmal in einem Prozess und einmal parallel durch run_batch.
+
+Jeder Messfall läuft in einem frisch gestarteten Prozess, damit der Spitzenspeicher nicht
+von vorherigen Fällen verfälscht wird. Benötigt nur Pillow.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from PIL import Image
+
+from batch import run_batch, default_workers
+from converter import convert_image
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_SIZES = (500, 2000, 4000, 8000)
+KINDS = ("jpeg", "png_alpha", "gif_palette", "tiff16")
+EXTENSIONS = {"jpeg": ".jpg", "png_alpha": ".png", "gif_palette": ".gif", "tiff16": ".tif"}
+
+
+def synthetic_photo(size):
+    """Deterministisches, detailreiches RGB-Bild (Mandelbrot plus Verläufe)."""
+    detail = Image.effect_mandelbrot(size, (-0.7436, 0.1318, -0.7426, 0.1328), 100)
+    horizontal = Image.linear_gradient("L").rotate(90).resize(size)
+    radial = Image.radial_gradient("L").resize(size)
+    return Image.merge("RGB", (detail, horizontal, radial))
+
+def make_corpus(folder, sizes):
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for edge in sizes:
+        size = (edge, edge * 2 // 3)
+        photo = None
+        for kind in KINDS:
+            path = os.path.join(folder, f"{kind}-{edge}{EXTENSIONS[kind]}")
+            paths.append(path)
+            if os.path.exists(path):
+                continue
+            photo = photo or synthetic_photo(size)
+            if kind == "jpeg":
+                photo.save(path, quality=90)
+            elif kind == "png_alpha":
+                rgba = photo.copy()
+                rgba.putalpha(Image.radial_gradient("L").resize(size).point(lambda v: 255 - v))
+                rgba.save(path)
+            elif kind == "gif_palette":
+                photo.quantize(256).save(path)
+            elif kind == "tiff16":
+                photo.convert("L").point(lambda v: v * 257, mode="I").convert("I;16").save(path)
+    return paths
+
+def peak_rss_mb(who):
+    if who == "self":
+        # Unter Linux überlebt ru_maxrss ein exec, VmHWM gilt nur für diesen Prozess
+        try:
+            with open("/proc/self/status", encoding="ascii") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return round(int(line.split()[1]) / 1024, 1)
+        except OSError:
+            pass
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF if who == "self" else resource.RUSAGE_CHILDREN).ru_maxrss
+    # Linux meldet KB, macOS Bytes
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def _run_isolated(queue, func, args):
+    queue.put(func(*args))
+
+def in_fresh_process(func, *args):
+    """Führt func(*args) in einem neu gestarteten Prozess aus und liefert das Ergebnis."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_isolated, args=(queue, func, args))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def single_case(path, output_folder, square):
+    start = time.perf_counter()
+    info = convert_image(path, output_folder, 2048, square)
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": seconds,
+        "stages": info["timings"],
+        "output_bytes": os.path.getsize(info["output"]),
+        "size": list(info["original_size"]),
+        "peak_rss_mb": peak_rss_mb("self"),
+    }
+
+def parallel_case(paths, output_folder, square, workers):
+    jobs = [{"input_path": p, "output_path": output_folder, "max_size": 2048, "square": square} for p in paths]
+    start = time.perf_counter()
+    results = list(run_batch(jobs, workers))
+    seconds = time.perf_counter() - start
+    failed = [r["message"] for r in results if not r["ok"]]
+    return {
+        "workers": workers,
+        "images": len(results),
+        "failed": failed,
+        "seconds": seconds,
+        "images_per_sec": len(results) / seconds if seconds else None,
+        "output_bytes": sum(os.path.getsize(r["output"]) for r in results if r["ok"]),
+        "peak_rss_mb": peak_rss_mb("children"),
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args):
+    corpus = args.corpus or os.path.join(tempfile.gettempdir(), "image2webp-bench-corpus")
+    print(f"Korpus: {corpus}", file=sys.stderr)
+    # Eigener Prozess, damit der Speicher der Korpuserzeugung nicht in die Messungen vererbt wird
+    paths = in_fresh_process(make_corpus, corpus, args.sizes)
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "pillow": Image.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sizes": list(args.sizes),
+            "repeat": args.repeat,
+        },
+        "single": [],
+        "parallel": [],
+    }
+
+    with tempfile.TemporaryDirectory() as output_folder:
+        for square in (False, True):
+            for path in paths:
+                runs = [in_fresh_process(single_case, path, output_folder, square) for _ in range(args.repeat)]
+                # Median der Gesamtzeit; Schritte und Speicher stammen aus diesem Lauf
+                median = sorted(runs, key=lambda r: r["seconds"])[len(runs) // 2]
+                name = os.path.basename(path)
+                report["single"].append({"file": name, "kind": name.split("-")[0], "square": square, **median})
+                print(f"{name:<24} square={square!s:<5} {median['seconds']:.3f} s", file=sys.stderr)
+
+            for workers in sorted({1, args.workers}):
+                runs = [in_fresh_process(parallel_case, paths, output_folder, square, workers) for _ in range(args.repeat)]
+                median = sorted(runs, key=lambda r: r["seconds"])[len(runs) // 2]
+                report["parallel"].append({"square": square, **median})
+                print(f"Korpus square={square!s:<5} workers={workers:<3} {median['images_per_sec']:.2f} Bilder/s", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Ergebnis gespeichert: {args.out}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+def compare(old_path, new_path):
+    """Gibt die Zeitänderung je Messfall zwischen zwei Ergebnisdateien aus."""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+
+    def change(a, b):
+        return f"{(b - a) / a * 100:+6.1f} %" if a else "   n/a"
+
+    print(f"{old['meta'].get('commit')} → {new['meta'].get('commit')}")
+    old_single = {(c["file"], c["square"]): c for c in old["single"]}
+    ratios = []
+    for case in new["single"]:
+        before = old_single.get((case["file"], case["square"]))
+        if before is None:
+            continue
+        ratios.append(case["seconds"] / before["seconds"])
+        print(f"{case['file']:<24} square={case['square']!s:<5} "
+              f"Zeit {change(before['seconds'], case['seconds'])}  "
+              f"Bytes {change(before['output_bytes'], case['output_bytes'])}")
+
+    old_parallel = {(c["square"], c["workers"]): c for c in old["parallel"]}
+    for case in new["parallel"]:
+        before = old_parallel.get((case["square"], case["workers"]))
+        if before is not None:
+            print(f"Korpus square={case['square']!s:<5} workers={case['workers']:<3} "
+                  f"Bilder/s {change(before['images_per_sec'], case['images_per_sec'])}")
+
+    if ratios:
+        print(f"Geometrisches Mittel der Zeit: {statistics.geometric_mean(ratios):.3f}×")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark für die WebP-Konvertierung")
+    parser.add_argument("--out", help="Ergebnis als JSON in diese Datei schreiben (sonst stdout)")
+    parser.add_argument("--corpus", help="Ordner für den Testkorpus (wird wiederverwendet)")
+    parser.add_argument("--sizes", type=lambda v: [int(s) for s in v.split(",")], default=list(DEFAULT_SIZES),
+                        help="Kantenlängen, z. B. 500,2000,4000,8000")
+    parser.add_argument("--repeat", type=int, default=1, help="Wiederholungen je Messfall (Median)")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="Prozesse für den parallelen Lauf")
+    parser.add_argument("--compare", nargs=2, metavar=("ALT", "NEU"), help="zwei Ergebnisdateien vergleichen")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare(*args.compare)
+    return run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
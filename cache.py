@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import time
+
+from storage import load_json, save_json, hash_file
+
+MANIFEST_NAME = ".image2webp-manifest.json"
+MANIFEST_VERSION = 1
+
+
+class ConversionCache:
+    """
+    Manifest im Exportordner für inkrementelle Konvertierung. Schlüssel ist der SHA-256 der
+    Quelldatei plus ein Hash der Einstellungen (max_size, square, Varianten, Qualität, Zielname),
+    Wert sind die erzeugten Dateien mit ihrer Größe in Bytes. Der SHA-256 einer Quelle wird
+    nur neu berechnet, wenn sich Größe oder Änderungszeit seit dem letzten Lauf geändert haben;
+    ein Lauf ohne Änderungen kommt so mit stat() aus.
+
+    Wird nur vom Batch-Treiber benutzt und ist daher nicht threadsicher.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.path = os.path.join(root, MANIFEST_NAME)
+        data = load_json(self.path, {})
+        self.entries = data.get("entries", {}) if data.get("version") == MANIFEST_VERSION else {}
+        self.sources = data.get("sources", {}) if data.get("version") == MANIFEST_VERSION else {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+
+    def key(self, job):
+        settings = {k: v for k, v in job.items() if k not in ("input_path", "output_path")}
+        stem = os.path.splitext(os.path.basename(job["input_path"]))[0]
+        settings["target"] = os.path.relpath(os.path.join(job["output_path"], stem), self.root).replace(os.sep, "/")
+        settings_hash = hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        return f"{self.source_hash(job['input_path'])}:{settings_hash}"
+
+    def source_hash(self, path):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        known = self.sources.get(path)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["sha256"]
+        digest = hash_file(path)
+        self.sources[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+        self.dirty = True
+        return digest
+
+    def _intact(self, entry):
+        for output in entry["outputs"]:
+            try:
+                if os.path.getsize(os.path.join(self.root, output["path"])) != output["bytes"]:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def lookup(self, key):
+        """Liefert den Eintrag, wenn alle zugehörigen Ausgabedateien unverändert vorhanden sind."""
+        entry = self.entries.get(key)
+        if entry is None or not self._intact(entry):
+            self.misses += 1
+            return None
+        entry["used"] = time.time()
+        self.dirty = True
+        self.hits += 1
+        return entry
+
+    def store(self, key, result):
+        outputs = result.get("outputs") or [result["output"]]
+        self.entries[key] = {
+            "source": os.path.basename(result["input"]),
+            "outputs": [
+                {"path": os.path.relpath(path, self.root).replace(os.sep, "/"), "bytes": os.path.getsize(path)}
+                for path in outputs
+            ],
+            "original_size": list(result["original_size"]),
+            "size": list(result["size"]),
+            "used": time.time(),
+        }
+        self.dirty = True
+
+    def cached_result(self, entry, input_path):
+        outputs = [os.path.join(self.root, output["path"]) for output in entry["outputs"]]
+        return {
+            "input": input_path,
+            "output": outputs[0],
+            "outputs": outputs,
+            "original_size": tuple(entry["original_size"]),
+            "size": tuple(entry["size"]),
+            "ok": True,
+            "cached": True,
+            "message": f"{os.path.basename(input_path)} unverändert, übersprungen",
+            "seconds": 0.0,
+        }
+
+    def prune(self, max_age_days=None):
+        """
+        Entfernt Einträge, deren Ausgabedateien fehlen oder verändert wurden, und optional
+        alle, die seit `max_age_days` Tagen nicht mehr benutzt wurden. Liefert die Anzahl.
+        """
+        cutoff = time.time() - max_age_days * 86400 if max_age_days is not None else None
+        stale = [
+            key for key, entry in self.entries.items()
+            if not self._intact(entry) or (cutoff is not None and entry.get("used", 0) < cutoff)
+        ]
+        for key in stale:
+            del self.entries[key]
+        gone = [path for path in self.sources if not os.path.exists(path)]
+        for path in gone:
+            del self.sources[path]
+        if stale or gone:
+            self.dirty = True
+        return len(stale)
+
+    def clear(self):
+        self.entries = {}
+        self.sources = {}
+        self.dirty = True
+
+    def save(self):
+        if self.dirty:
+            save_json(self.path, {"version": MANIFEST_VERSION, "entries": self.entries, "sources": self.sources})
+            self.dirty = False
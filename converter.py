@@ -0,0 +1,633 @@
+import hashlib
+import io
+import math
+import os
+import time
+from PIL import Image, ImageChops, ImageColor, ImageFilter, ImageStat
+
+# Der Speicherbedarf sehr großer Quellen wird vom Batch über estimate_peak_memory geplant,
+# daher reicht hier eine großzügige Grenze gegen Dekompressionsbomben (Fehler erst ab 2×).
+Image.MAX_IMAGE_PIXELS = 300_000_000
+
+# Vor dem finalen LANCZOS-Schritt wird per Ganzzahl-Reduktion höchstens bis auf das Doppelte
+# der Zielgröße vorverkleinert (wie Image.resize mit reducing_gap), damit das Ergebnis optisch
+# unverändert bleibt. Die DCT-Skalierung von JPEG filtert sauber und darf bis zur Zielgröße gehen.
+REDUCING_GAP = 2.0
+DRAFT_GAP = 1.0
+SQUARE_SIZE = 2048
+DEFAULT_QUALITY = 80
+
+# Qualitätssuche für das Byte-Budget: 20..95 lässt sich mit 7 Probekodierungen halbieren
+MIN_QUALITY = 20
+MAX_QUALITY = 95
+MAX_BUDGET_TRIALS = 8
+
+# Kodierprofile: Parameter für den libwebp-Encoder, vom schnellsten zum kleinsten Ergebnis.
+# "balanced" entspricht den Pillow-Standardwerten.
+ENCODE_PROFILES = {
+    "fast": {"method": 1},
+    "balanced": {"method": 4},
+    "smallest": {"method": 6},
+}
+DEFAULT_PROFILE = "balanced"
+
+# Kompression: "lossy" wie bisher, "lossless" immer verlustfrei, "auto" wählt pro Bild zwischen
+# verlustfrei, nahezu verlustfrei (Palette mit höchstens 256 Farben, dann verlustfrei) und verlustbehaftet.
+COMPRESSION_MODES = ("lossy", "lossless", "auto")
+DEFAULT_COMPRESSION = "lossy"
+# Bei verlustfreiem WebP steuert "quality" den Aufwand der Kompression (wie cwebp -q)
+LOSSLESS_QUALITY = 75
+# Klassifizierung an einer Vorschau mit höchstens CLASSIFY_SIZE px Kantenlänge: Mehr als
+# MAX_COUNTED_COLORS Farben gilt als Foto; Grafiken bestehen überwiegend aus flachen Flächen
+# (Anteil FLAT_GRAPHIC der Pixel ohne jeden Unterschied zu den Nachbarn, weiche Verläufe zählen nicht).
+CLASSIFY_SIZE = 256
+PALETTE_COLORS = 256
+MAX_COUNTED_COLORS = 4096
+FLAT_GRAPHIC = 0.6
+# Qualitätsprüfung der Probekodierungen (PSNR in dB gegenüber dem unkomprimierten Bild), gemessen
+# nur an Kanten und bis EDGE_RADIUS px daneben: dort fällt Ringing auf, flache Flächen schönen den Wert
+MIN_PSNR = {"near_lossless": 40.0, "lossy": 35.0}
+EDGE_RADIUS = 2
+
+# Vordefinierte Größenvarianten: Name → Liste aus (Kantenlänge, Dateiendung, Qualität)
+VARIANT_SETS = {
+    "storefront": [(2048, "-2048", 80), (1024, "-1024", 80), (640, "-640", 78), (320, "-320", 75)],
+    "retina": [(2048, "-2048", 80), (1024, "-1024", 80)],
+}
+REDUCIBLE_MODES = ('L', 'LA', 'RGB', 'RGBA', 'CMYK')
+
+# Umgang mit Transparenz: "flatten" legt das Bild auf die Hintergrundfarbe, "keep" behält den
+# Alphakanal immer, "auto" behält ihn nur, wenn das Bild wirklich transparente Pixel hat.
+# Ein vollständig deckender Alphakanal wird bei "flatten" und "auto" ohne Compositing verworfen.
+ALPHA_POLICIES = ("flatten", "keep", "auto")
+DEFAULT_ALPHA = "flatten"
+DEFAULT_BACKGROUND = (255, 255, 255)
+ALPHA_MODES = ('RGBA', 'LA')
+
+# Formate, bei denen mehrere Frames eine Animation sind (bei TIFF wären es Seiten)
+ANIMATED_FORMATS = ('GIF', 'WEBP', 'PNG')
+
+
+def resize_image(img, max_size):
+    if img.width > max_size or img.height > max_size:
+        scaling_factor = min(max_size / img.width, max_size / img.height)
+        new_size = (int(img.width * scaling_factor), int(img.height * scaling_factor))
+        img = img.resize(new_size, Image.LANCZOS)
+        return img, True
+    return img, False
+
+def parse_variants(spec):
+    """
+    Liefert die Varianten zu einem Namen aus VARIANT_SETS oder zu einer Liste wie
+    "2048,1024:75,640" (Kantenlänge, optional mit Qualität), größte zuerst.
+    """
+    if spec in VARIANT_SETS:
+        variants = VARIANT_SETS[spec]
+    else:
+        variants = []
+        for part in spec.split(","):
+            size, _, quality = part.strip().partition(":")
+            if not size.isdigit() or (quality and not quality.isdigit()):
+                raise ValueError(f"Ungültige Variante: {part.strip()!r}")
+            variants.append((int(size), f"-{size}", int(quality) if quality else DEFAULT_QUALITY))
+    return sorted(variants, key=lambda variant: variant[0], reverse=True)
+
+def target_size(size, max_size, square, square_size=SQUARE_SIZE):
+    """Größe des Bildinhalts nach dem Skalieren (ohne quadratische Leinwand)."""
+    width, height = size
+    box = square_size if square else max_size
+    scaling_factor = min(box / width, box / height)
+    if not square:
+        scaling_factor = min(scaling_factor, 1.0)
+    return max(1, int(width * scaling_factor)), max(1, int(height * scaling_factor))
+
+def request_reduced_decode(img, size):
+    """
+    Muss vor dem Laden aufgerufen werden: JPEGs werden per DCT-Skalierung (draft)
+    direkt verkleinert dekodiert (1/2, 1/4 oder 1/8), aber nie kleiner als `size`.
+    """
+    if img.format == 'JPEG':
+        img.draft(img.mode, (int(size[0] * DRAFT_GAP), int(size[1] * DRAFT_GAP)))
+
+def pre_reduce(img, size):
+    """Schnelle Ganzzahl-Verkleinerung (Mittelwert über Blöcke) bis kurz vor die Zielgröße."""
+    if img.mode not in REDUCIBLE_MODES:
+        return img
+    factor = int(min(img.width / (size[0] * REDUCING_GAP), img.height / (size[1] * REDUCING_GAP)))
+    if factor >= 2:
+        img = img.reduce(factor)
+    return img
+
+def plan_transform(size, max_size, square, square_size=SQUARE_SIZE):
+    """
+    Berechnet die endgültige Geometrie vorab aus der Originalgröße: Größe des Bildinhalts,
+    Größe der Leinwand und Position des Inhalts darauf.
+    """
+    content = target_size(size, max_size, square, square_size)
+    if square:
+        canvas = (square_size, square_size)
+        offset = ((square_size - content[0]) // 2, (square_size - content[1]) // 2)
+    else:
+        canvas = content
+        offset = (0, 0)
+    return {"content": content, "canvas": canvas, "offset": offset}
+
+def resample(img, plan):
+    if img.size != plan["content"]:
+        img = img.resize(plan["content"], Image.LANCZOS)
+    return img
+
+def parse_background(value):
+    """Farbe wie "#ffffff", "white" oder "255,255,255" als RGB-Tupel; ValueError bei Unsinn."""
+    try:
+        if "," in value:
+            parts = tuple(int(part) for part in value.split(","))
+            if len(parts) == 3 and all(0 <= part <= 255 for part in parts):
+                return parts
+        else:
+            return ImageColor.getrgb(value)[:3]
+    except ValueError:
+        pass
+    raise ValueError(f"Ungültige Hintergrundfarbe: {value}")
+
+def output_options(alpha=DEFAULT_ALPHA, background=DEFAULT_BACKGROUND, compression=DEFAULT_COMPRESSION):
+    """
+    Argumente für convert_image. Standardwerte bleiben weg, damit sich die Cache-Schlüssel
+    bestehender Manifeste nicht ändern.
+    """
+    options = {}
+    if alpha != DEFAULT_ALPHA:
+        options["alpha"] = alpha
+    if tuple(background) != DEFAULT_BACKGROUND:
+        options["background"] = tuple(background)
+    if compression != DEFAULT_COMPRESSION:
+        options["compression"] = compression
+    return options
+
+def has_transparency(img):
+    """True, wenn der Alphakanal mindestens ein nicht deckendes Pixel enthält."""
+    # Nur den Alphakanal prüfen: getextrema() über alle Kanäle dauert etwa achtmal so lang
+    return img.getchannel(img.mode[-1]).getextrema()[0] < 255
+
+def prepare_alpha(img, alpha=DEFAULT_ALPHA):
+    """
+    Bringt das frisch dekodierte Bild in einen Modus mit oder ohne Alphakanal, je nach Policy.
+    Paletten (und L/RGB mit tRNS-Eintrag) mit Transparenz werden zu RGBA/LA, alle anderen
+    Paletten zu RGB. Ein durchgehend deckender Alphakanal wird außer bei "keep" verworfen.
+    """
+    if img.mode == 'P':
+        img = img.convert('RGBA' if img.has_transparency_data else 'RGB')
+    elif img.mode == 'PA':
+        img = img.convert('RGBA')
+    elif img.mode in ('L', 'RGB') and img.has_transparency_data:
+        img = img.convert(img.mode + 'A')
+
+    if img.mode in ALPHA_MODES and alpha != "keep" and not has_transparency(img):
+        img = img.convert(img.mode[:-1])
+    return img
+
+def compose(img, plan, background=DEFAULT_BACKGROUND, alpha=DEFAULT_ALPHA):
+    """
+    Legt den bereits skalierten Inhalt auf die Leinwand. Bei "flatten" wird Transparenz mit
+    `background` gefüllt, sonst bleibt sie erhalten und der Rand der Leinwand ist durchsichtig.
+    """
+    has_alpha = img.mode in ALPHA_MODES
+    if plan["canvas"] == plan["content"] and not (has_alpha and alpha == "flatten"):
+        return img
+
+    if has_alpha and alpha != "flatten":
+        canvas = Image.new("RGBA", plan["canvas"], (*background, 0))
+        canvas.paste(img.convert("RGBA"), plan["offset"])
+        return canvas
+
+    canvas = Image.new("RGB", plan["canvas"], background)
+    canvas.paste(img, plan["offset"], img if has_alpha else None)
+    return canvas
+
+def apply_transform(img, plan, background=DEFAULT_BACKGROUND, alpha=DEFAULT_ALPHA):
+    """
+    Resampelt genau einmal auf die geplante Größe und legt das Bild erst danach, also in
+    Ausgabeauflösung, auf den Hintergrund.
+    """
+    return compose(resample(img, plan), plan, background, alpha)
+
+def encode_webp(img, quality, profile=DEFAULT_PROFILE, lossless=False):
+    buffer = io.BytesIO()
+    img.save(buffer, format="WEBP", quality=quality, lossless=lossless, **ENCODE_PROFILES[profile])
+    return buffer.getvalue()
+
+def classify_image(img):
+    """
+    Schätzt an einer kleinen Vorschau, wie das Bild kodiert werden sollte: "lossless" für
+    Grafiken mit wenigen Farben (Logos, Badges, Größentabellen), "near_lossless" für Grafiken
+    mit Kantenglättung, "lossy" für Fotos. None, wenn die Merkmale nicht eindeutig sind.
+    """
+    if img.mode not in ('L', 'LA', 'RGB', 'RGBA'):
+        return "lossy"
+    scale = min(1.0, CLASSIFY_SIZE / max(img.size))
+    # NEAREST erfindet keine Mischfarben, die Farbanzahl bleibt also aussagekräftig
+    proxy = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.Resampling.NEAREST)
+
+    colors = proxy.getcolors(MAX_COUNTED_COLORS)
+    if colors is None:
+        return "lossy"
+
+    edges = proxy.convert("L").filter(ImageFilter.FIND_EDGES)
+    if edges.width > 2 and edges.height > 2:
+        edges = edges.crop((1, 1, edges.width - 1, edges.height - 1))  # Randpixel filtert Pillow nicht
+    flat = edges.histogram()[0] / (edges.width * edges.height)
+    if flat < FLAT_GRAPHIC:
+        return None
+    return "lossless" if len(colors) <= PALETTE_COLORS else "near_lossless"
+
+def reduce_colors(img, colors=PALETTE_COLORS):
+    """Palette mit höchstens `colors` Farben ohne Dithering, Grundlage für "near_lossless"."""
+    if img.mode in ALPHA_MODES:
+        return img.convert("RGBA").quantize(colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    return img.convert("RGB").quantize(colors, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+
+def premultiplied(img):
+    """RGBA mit vormultipliziertem Alpha: die Farbe unter durchsichtigen Pixeln zählt nicht mit."""
+    rgba = img.convert("RGBA")
+    flat = Image.alpha_composite(Image.new("RGBA", rgba.size, (0, 0, 0, 255)), rgba)
+    return Image.merge("RGBA", (*flat.split()[:3], rgba.getchannel("A")))
+
+def edge_mask(img):
+    """Maske der Pixel an Kanten und bis EDGE_RADIUS px daneben; None, wenn das Bild ganz flach ist."""
+    edges = img.convert("L").filter(ImageFilter.FIND_EDGES).point(lambda v: 255 if v else 0)
+    if edges.getbbox() is None:
+        return None
+    return edges.filter(ImageFilter.MaxFilter(2 * EDGE_RADIUS + 1))
+
+def psnr(img, data, mask=None):
+    """
+    PSNR der kodierten Datei gegenüber `img` in dB (unendlich bei identischen Pixeln), mit
+    `mask` nur über deren Pixel.
+    """
+    with Image.open(io.BytesIO(data)) as decoded:
+        decoded = decoded.convert(img.mode)
+    if img.mode in ALPHA_MODES:
+        img, decoded = premultiplied(img), premultiplied(decoded)
+    squares = [rms * rms for rms in ImageStat.Stat(ImageChops.difference(img, decoded), mask).rms]
+    mse = sum(squares) / len(squares)
+    return math.inf if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+def encode_as(img, kind, quality, profile=DEFAULT_PROFILE):
+    if kind == "lossless":
+        return encode_webp(img, LOSSLESS_QUALITY, profile, lossless=True)
+    if kind == "near_lossless":
+        return encode_webp(reduce_colors(img), LOSSLESS_QUALITY, profile, lossless=True)
+    return encode_webp(img, quality, profile)
+
+def encode_auto(img, quality, profile=DEFAULT_PROFILE):
+    """
+    Kodiert je nach classify_image verlustfrei, nahezu verlustfrei oder verlustbehaftet. Fotos
+    und Grafiken mit wenigen Farben werden direkt kodiert, sonst werden "lossy",
+    "near_lossless" und "lossless" im Speicher probekodiert; es gewinnt die kleinste, die die
+    PSNR-Schwelle aus MIN_PSNR an den Kanten erreicht (verlustfrei besteht immer).
+    Rückgabe: (Bytes, Art)
+    """
+    kind = classify_image(img)
+    if kind in ("lossless", "lossy"):
+        return encode_as(img, kind, quality, profile), kind
+
+    mask = edge_mask(img)
+    best = None
+    for kind in ("lossy", "near_lossless", "lossless"):
+        data = encode_as(img, kind, quality, profile)
+        if best is not None and len(data) >= len(best[0]):
+            continue
+        if kind in MIN_PSNR and psnr(img, data, mask) < MIN_PSNR[kind]:
+            continue
+        best = (data, kind)
+    return best
+
+_encode_speed = {}
+
+def measure_encode_speed(profile):
+    """
+    Sekunden pro Megapixel für `profile` auf diesem Rechner, gemessen an einem synthetischen
+    fotoähnlichen Bild (Verlauf plus Rauschen). Das Ergebnis wird pro Prozess zwischengespeichert.
+    """
+    if profile not in _encode_speed:
+        gradient = Image.linear_gradient("L").resize((1024, 1024))
+        noise = Image.effect_noise((1024, 1024), 24)
+        sample = Image.merge("RGB", (gradient, noise, gradient.rotate(90)))
+        encode_webp(sample, DEFAULT_QUALITY, profile)  # Aufwärmen
+        start = time.perf_counter()
+        encode_webp(sample, DEFAULT_QUALITY, profile)
+        _encode_speed[profile] = (time.perf_counter() - start) / (sample.width * sample.height / 1e6)
+    return _encode_speed[profile]
+
+def output_megapixels(input_path, max_size, square, variants=None):
+    """Schätzt anhand des Dateikopfs, wie viele Megapixel für ein Bild kodiert werden."""
+    with Image.open(input_path) as img:
+        size = img.size
+    sizes = [variant[0] for variant in variants] if variants else [max_size]
+    total = 0
+    for edge in sizes:
+        plan = plan_transform(size, edge, square, square_size=edge)
+        total += plan["canvas"][0] * plan["canvas"][1]
+    return total / 1e6
+
+def encode_to_budget(img, max_bytes, profile=DEFAULT_PROFILE):
+    """
+    Sucht per Intervallhalbierung die höchste Qualität, deren Datei höchstens `max_bytes`
+    groß ist. Alle Probekodierungen bleiben im Speicher, es sind höchstens MAX_BUDGET_TRIALS.
+    Passt selbst MIN_QUALITY nicht, wird diese kleinste Variante geliefert; die Suche hat sie
+    dann meist schon kodiert, sonst zählt die letzte Kodierung mit zu MAX_BUDGET_TRIALS.
+    Rückgabe: (Bytes, Qualität)
+    """
+    data = encode_webp(img, MAX_QUALITY, profile)
+    if len(data) <= max_bytes:
+        return data, MAX_QUALITY
+
+    best = smallest = None
+    low, high = MIN_QUALITY, MAX_QUALITY - 1
+    trials = 1
+    # Solange nichts passt, eine Kodierung für MIN_QUALITY zurückhalten
+    while low <= high and trials < MAX_BUDGET_TRIALS - (best is None):
+        quality = (low + high) // 2
+        data = encode_webp(img, quality, profile)
+        trials += 1
+        if len(data) <= max_bytes:
+            best = (data, quality)
+            low = quality + 1
+        else:
+            high = quality - 1
+            if smallest is None or quality < smallest[1]:
+                smallest = (data, quality)
+
+    if best is not None:
+        return best
+    if smallest is not None and smallest[1] == MIN_QUALITY:
+        return smallest
+    return encode_webp(img, MIN_QUALITY, profile), MIN_QUALITY
+
+class StageClock:
+    """Summiert die Dauer aufeinanderfolgender Verarbeitungsschritte (Sekunden je Schritt)."""
+
+    def __init__(self):
+        self.timings = {}
+        self._last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + now - self._last
+        self._last = now
+
+# Grundbedarf eines Worker-Prozesses (Python, Pillow, libwebp) für die Speicherschätzung
+BASE_MEMORY = 48 * 1024 ** 2
+
+def bytes_per_pixel(mode):
+    """Speicher pro Pixel in Pillows interner Darstellung (8-Bit-Mehrkanalbilder belegen 4 Bytes)."""
+    if mode in ('1', 'L', 'P'):
+        return 1
+    if mode.startswith('I;16'):
+        return 2
+    return 4
+
+def draft_scale(size, content):
+    """Verkleinerungsfaktor, den request_reduced_decode bei JPEG erreicht (1, 2, 4 oder 8)."""
+    ratio = min(size[0] // max(1, int(content[0] * DRAFT_GAP)), size[1] // max(1, int(content[1] * DRAFT_GAP)))
+    return next(scale for scale in (8, 4, 2, 1) if ratio >= scale)
+
+def estimate_peak_memory(input_path, max_size, square, variants=None):
+    """
+    Schätzt nur anhand des Dateikopfs den Spitzenspeicher von convert_image in Bytes:
+    dekodiertes Bild (bei JPEG nach DCT-Skalierung), volle RGBA-Kopien für Palette und Alpha
+    (Konvertierung bzw. vormultipliziertes Alpha beim Verkleinern) und Leinwand plus Encoder-Puffer.
+    """
+    with Image.open(input_path) as img:
+        size, mode, image_format = img.size, img.mode, img.format
+
+    edge = max(variant[0] for variant in variants) if variants else max_size
+    plan = plan_transform(size, edge, square, square_size=edge)
+
+    width, height = size
+    if image_format == 'JPEG':
+        scale = draft_scale(size, plan["content"])
+        width, height = -(-width // scale), -(-height // scale)
+
+    decoded = width * height * bytes_per_pixel(mode)
+    if mode == 'P':
+        decoded += width * height * 8
+    elif mode in ('RGBA', 'LA', 'PA'):
+        decoded += width * height * 4
+    canvas = plan["canvas"][0] * plan["canvas"][1] * 4
+    return BASE_MEMORY + decoded + 3 * canvas
+
+def is_animation(img):
+    return img.format in ANIMATED_FORMATS and getattr(img, "n_frames", 1) > 1
+
+def frame_digest(img):
+    """Fingerabdruck des aktuellen Frames (Modus, Palette, Transparenz und Pixel)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(img.mode.encode("ascii"))
+    if img.mode == 'P':
+        digest.update(bytes(img.getpalette() or ()))
+        digest.update(repr(img.info.get("transparency")).encode("ascii"))
+    digest.update(img.tobytes())
+    return digest.digest()
+
+def frame_timeline(img):
+    """
+    Liest die Animation einmal Frame für Frame und fasst direkt aufeinanderfolgende identische
+    Frames zusammen, ihre Dauer wird addiert. Rückgabe: [[Frame-Index, Dauer in ms], ...]
+    """
+    timeline = []
+    previous = None
+    for index in range(img.n_frames):
+        img.seek(index)
+        img.load()  # WebP setzt die Frame-Dauer erst beim Laden
+        duration = img.info.get("duration", 0)
+        digest = frame_digest(img)
+        if digest == previous:
+            timeline[-1][1] += duration
+        else:
+            timeline.append([index, duration])
+            previous = digest
+    return timeline
+
+class FrameStream(Image.Image):
+    """
+    Animation für Image.save(save_all=True): jedes Frame wird erst beim seek() aus der Quelle
+    gelesen und mit `transform` umgerechnet. Der WebP-Encoder kodiert jedes Frame sofort,
+    im Speicher liegt also immer nur ein Frame statt der ganzen Animation.
+    """
+
+    def __init__(self, source, indices, transform):
+        super().__init__()
+        self.source = source
+        self.indices = indices
+        self.transform = transform
+        self.n_frames = len(indices)
+        self.is_animated = True
+        self._frame = None
+        self.seek(0)
+
+    def seek(self, frame):
+        if frame == self._frame:
+            return
+        self.source.seek(self.indices[frame])
+        out = self.transform(self.source)
+        self.im = out.im
+        self._mode = out.mode
+        self._size = out.size
+        self._frame = frame
+
+    def tell(self):
+        return self._frame
+
+def write_animation(img, output_file_path, plan, quality, timeline, loop, profile=DEFAULT_PROFILE,
+                    alpha=DEFAULT_ALPHA, background=DEFAULT_BACKGROUND, compression=DEFAULT_COMPRESSION):
+    """
+    Schreibt eine animierte WebP-Datei; jedes Frame wird skaliert, auf die Leinwand gelegt und
+    kodiert. Bei compression="auto" wählt libwebp pro Frame zwischen verlustfrei und verlustbehaftet.
+    """
+    if compression == "lossless":
+        encoding = {"lossless": True, "quality": LOSSLESS_QUALITY}
+    else:
+        encoding = {"allow_mixed": compression == "auto", "quality": quality}
+
+    def transform(frame):
+        frame.load()
+        out = pre_reduce(prepare_alpha(frame, alpha), plan["content"])
+        return compose(resample(out, plan), plan, background, alpha)
+
+    frames = FrameStream(img, [index for index, _ in timeline], transform)
+    buffer = io.BytesIO()
+    frames.save(
+        buffer, format="WEBP", save_all=True, duration=[duration for _, duration in timeline], loop=loop,
+        background=(*background, 255) if alpha == "flatten" else (0, 0, 0, 0),
+        **encoding, **ENCODE_PROFILES[profile],
+    )
+    data = buffer.getvalue()
+    with open(output_file_path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+def convert_image(input_path, output_path, max_size, square, variants=None, quality=DEFAULT_QUALITY,
+                  max_bytes=None, profile=DEFAULT_PROFILE, alpha=DEFAULT_ALPHA, background=DEFAULT_BACKGROUND,
+                  compression=DEFAULT_COMPRESSION):
+    """
+    Konvertiert ein Bild nach WebP. Fehler werden nicht abgefangen.
+
+    Mit `variants` (siehe parse_variants) entstehen aus einer einzigen Dekodierung mehrere
+    Größen; jede wird aus der vorherigen, nächstgrößeren herunterskaliert.
+    Mit `max_bytes` wird die Qualität jeder Datei so gewählt, dass sie ins Budget passt.
+    `profile` wählt den Encoder-Aufwand aus ENCODE_PROFILES, `alpha` den Umgang mit
+    Transparenz (ALPHA_POLICIES) und `background` die Farbe für Transparenz und Leinwandrand.
+    `compression` (COMPRESSION_MODES) wählt verlustbehaftet, verlustfrei oder automatisch; passt
+    das Ergebnis nicht ins Byte-Budget, wird verlustbehaftet mit Qualitätssuche kodiert.
+
+    Animierte GIF-, WebP- und PNG-Dateien werden zu animiertem WebP mit denselben Frame-Dauern
+    und Wiederholungen; identische Folge-Frames werden zusammengefasst. Dabei wird jede Variante
+    Frame für Frame aus der Quelle erzeugt, ein Byte-Budget gilt für Animationen nicht.
+    """
+    if not variants:
+        variants = [(max_size, "", quality)]
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    clock = StageClock()
+
+    with Image.open(input_path) as img:
+        original_size = img.size
+        plans = [plan_transform(original_size, size, square, square_size=size) for size, _, _ in variants]
+        if is_animation(img):
+            return _convert_animated(img, input_path, output_path, stem, variants, plans, profile, alpha,
+                                     tuple(background), compression, clock)
+        request_reduced_decode(img, plans[0]["content"])
+        img.load()
+        img = prepare_alpha(img, alpha)
+
+        img = pre_reduce(img, plans[0]["content"])
+        clock.lap("decode")
+        decoded_bytes = img.width * img.height * bytes_per_pixel(img.mode)
+
+        outputs = []
+        sizes = []
+        qualities = []
+        kinds = []
+        written = 0
+        for (size, suffix, variant_quality), plan in zip(variants, plans):
+            img = resample(img, plan)
+            clock.lap("resize")
+            out = compose(img, plan, tuple(background), alpha)
+            clock.lap("flatten")
+
+            data, kind = None, "lossy"
+            if compression == "auto":
+                data, kind = encode_auto(out, variant_quality, profile)
+            elif compression == "lossless":
+                data, kind = encode_as(out, "lossless", variant_quality, profile), "lossless"
+            if max_bytes and (data is None or len(data) > max_bytes):
+                (data, variant_quality), kind = encode_to_budget(out, max_bytes, profile), "lossy"
+            elif data is None:
+                data = encode_webp(out, variant_quality, profile)
+            clock.lap("encode")
+
+            output_file_path = os.path.join(output_path, stem + suffix + ".webp")
+            with open(output_file_path, "wb") as f:
+                f.write(data)
+            clock.lap("write")
+            written += len(data)
+            outputs.append(output_file_path)
+            sizes.append(out.size)
+            qualities.append(variant_quality)
+            kinds.append(kind)
+
+        return {
+            "input": input_path,
+            "output": outputs[0],
+            "outputs": outputs,
+            "original_size": original_size,
+            "size": sizes[0],
+            "sizes": sizes,
+            "qualities": qualities,
+            "compression": kinds,
+            "timings": clock.timings,
+            # Quelldatei, dekodierte Pixel (nach der Vorverkleinerung) und geschriebene WebP-Dateien
+            "bytes_in": os.path.getsize(input_path),
+            "bytes_decoded": decoded_bytes,
+            "bytes_out": written,
+        }
+
+def _convert_animated(img, input_path, output_path, stem, variants, plans, profile, alpha, background, compression,
+                      clock):
+    timeline = frame_timeline(img)
+    # GIFs ohne NETSCAPE-Erweiterung laufen einmal durch; WebP kennt dafür loop=1
+    loop = img.info.get("loop", 1)
+    clock.lap("decode")
+
+    outputs = []
+    written = 0
+    for (size, suffix, variant_quality), plan in zip(variants, plans):
+        output_file_path = os.path.join(output_path, stem + suffix + ".webp")
+        written += write_animation(img, output_file_path, plan, variant_quality, timeline, loop, profile,
+                                   alpha, background, compression)
+        clock.lap("encode")
+        outputs.append(output_file_path)
+
+    return {
+        "input": input_path,
+        "output": outputs[0],
+        "outputs": outputs,
+        "original_size": img.size,
+        "size": plans[0]["canvas"],
+        "sizes": [plan["canvas"] for plan in plans],
+        "qualities": [variant[2] for variant in variants],
+        "compression": [compression] * len(variants),
+        "frames": len(timeline),
+        "source_frames": img.n_frames,
+        "timings": clock.timings,
+        "bytes_in": os.path.getsize(input_path),
+        "bytes_decoded": img.width * img.height * 4,  # ein Frame
+        "bytes_out": written,
+    }
+
+def convert_image_to_webp(input_path, output_path, max_size, square):
+    try:
+        info = convert_image(input_path, output_path, max_size, square)
+        return f"{os.path.basename(input_path)} erfolgreich konvertiert ({info['original_size']} → {info['size']})"
+    except Exception as e:
+        return f"Fehler bei {os.path.basename(input_path)}: {e}"
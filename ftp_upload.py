@@ -0,0 +1,300 @@
+import ftplib
+import os
+import posixpath
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from storage import load_json, save_json, hash_file, data_dir
+
+# Fehler, nach denen sich ein neuer Versuch mit frischer Verbindung lohnt
+RETRY_ERRORS = (ftplib.error_temp, ftplib.error_reply, ftplib.error_proto, OSError, EOFError)
+BLOCK_SIZE = 64 * 1024
+
+SYNC_MANIFEST = os.path.join(data_dir(), "ftp-sync.json")
+SYNC_MANIFEST_VERSION = 1
+
+
+class FtpUploader:
+    """
+    Lädt Dateien über einen Pool aus `sessions` dauerhaft offenen FTP-Verbindungen hoch,
+    eine pro Worker-Thread. Reißt eine Verbindung ab, wird sie neu aufgebaut und der Upload
+    mit exponentiellem Backoff wiederholt; dabei wird ab dem bereits übertragenen Teil
+    fortgesetzt (REST), sofern der Server das unterstützt.
+
+    `progress(name, gesendet, gesamt)` wird aus den Worker-Threads aufgerufen.
+    """
+
+    def __init__(self, host, user, password, directory="", port=21, sessions=4, retries=5,
+                 backoff=1.0, timeout=30, progress=None):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.directory = directory
+        self.port = port
+        self.sessions = sessions
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.progress = progress
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._folders = set()  # schon angelegte Unterordner des Zielordners
+
+    def connect(self):
+        ftp = ftplib.FTP(timeout=self.timeout)
+        ftp.connect(self.host, self.port)
+        ftp.login(self.user, self.password)
+        if self.directory:
+            ftp.cwd(self.directory)
+        ftp.voidcmd("TYPE I")  # Binärmodus, nötig für SIZE und REST
+        return ftp
+
+    def _connection(self):
+        ftp = getattr(self._local, "ftp", None)
+        if ftp is None:
+            ftp = self.connect()
+            self._local.ftp = ftp
+            with self._lock:
+                self._connections.append(ftp)
+        return ftp
+
+    def _drop_connection(self):
+        ftp = getattr(self._local, "ftp", None)
+        self._local.ftp = None
+        if ftp is not None:
+            with self._lock:
+                if ftp in self._connections:
+                    self._connections.remove(ftp)
+            try:
+                ftp.close()
+            except OSError:
+                pass
+
+    def remote_size(self, ftp, name):
+        try:
+            return ftp.size(name) or 0
+        except ftplib.error_perm:
+            return 0  # Datei existiert (noch) nicht
+
+    def make_folders(self, ftp, name):
+        """Legt die Unterordner von `name` (relativ zum Zielordner, mit "/") an, soweit nötig."""
+        parts = posixpath.dirname(name).split("/")
+        for depth in range(1, len(parts) + 1):
+            folder = "/".join(parts[:depth])
+            with self._lock:
+                if not folder or folder in self._folders:
+                    continue
+            try:
+                ftp.mkd(folder)
+            except ftplib.error_perm:
+                pass  # existiert schon; fehlt das Recht, scheitert gleich der STOR mit klarer Meldung
+            with self._lock:
+                self._folders.add(folder)
+
+    def upload(self, path, remote_name=None, make_folders=False):
+        """
+        Lädt eine Datei hoch und liefert ein Ergebnis-Dict; wirft keine Ausnahmen. Mit
+        `make_folders` werden fehlende Unterordner aus `remote_name` ("a/b/bild.webp") angelegt.
+        """
+        name = remote_name or os.path.basename(path)
+        total = os.path.getsize(path)
+        start = time.perf_counter()
+        resume = False  # erst True, wenn ein eigener STOR dieser Datei schon Daten geschickt hat
+        attempts = 0
+        while True:
+            attempts += 1
+            offset = sent = 0
+            try:
+                ftp = self._connection()
+                if make_folders:
+                    self.make_folders(ftp, name)
+                # Nur einen eigenen abgebrochenen Upload fortsetzen, nie eine fremde alte Datei
+                offset = self.remote_size(ftp, name) if resume else 0
+                if offset > total:
+                    offset = 0
+                sent = offset
+
+                def on_block(block):
+                    nonlocal sent
+                    sent += len(block)
+                    if self.progress:
+                        self.progress(name, sent, total)
+
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    try:
+                        ftp.storbinary(f"STOR {name}", f, BLOCK_SIZE, on_block, rest=offset or None)
+                    except ftplib.error_perm:
+                        if not offset:
+                            raise
+                        # Server kann kein REST: komplett neu hochladen
+                        f.seek(0)
+                        sent = 0
+                        offset = 0
+                        ftp.storbinary(f"STOR {name}", f, BLOCK_SIZE, on_block)
+
+                return {
+                    "path": path, "name": name, "ok": True, "bytes": total,
+                    "resumed_from": offset, "attempts": attempts, "seconds": time.perf_counter() - start,
+                    "message": f"Bild hochgeladen: {name}" + (f" (fortgesetzt ab {offset} Bytes)" if offset else ""),
+                }
+            except ftplib.error_perm as e:
+                return {"path": path, "name": name, "ok": False, "attempts": attempts,
+                        "message": f"FTP-Upload fehlgeschlagen für {name}: {e}"}
+            except RETRY_ERRORS as e:
+                self._drop_connection()
+                if attempts > self.retries:
+                    return {"path": path, "name": name, "ok": False, "attempts": attempts,
+                            "message": f"FTP-Upload fehlgeschlagen für {name} nach {attempts} Versuchen: {e}"}
+                # Scheitert schon der Verbindungsaufbau, liegt auf dem Server noch die alte Datei
+                resume = resume or sent > offset
+                time.sleep(self.backoff * 2 ** (attempts - 1))
+
+    def upload_all(self, paths, cancel_event=None):
+        """Lädt alle Dateien parallel hoch und liefert die Ergebnisse in Abschlussreihenfolge."""
+        def task(path):
+            if cancel_event is not None and cancel_event.is_set():
+                return {"path": path, "name": os.path.basename(path), "ok": False, "cancelled": True,
+                        "message": f"Abgebrochen: {os.path.basename(path)}"}
+            return self.upload(path)
+
+        with ThreadPoolExecutor(max_workers=self.sessions, thread_name_prefix="ftp") as pool:
+            futures = [pool.submit(task, path) for path in paths]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+        self.close()
+
+    def list_remote(self):
+        """
+        Liest den Zielordner einmal ein: {Name: {"size": Bytes oder None, "modify": Zeitstempel
+        oder None}}. Nutzt MLSD; kennt der Server das nicht, NLST plus SIZE/MDTM je Datei.
+        """
+        ftp = self._connection()
+        try:
+            listing = {
+                name: {"size": int(facts["size"]) if "size" in facts else None, "modify": facts.get("modify")}
+                for name, facts in ftp.mlsd(facts=["type", "size", "modify"])
+                if facts.get("type") == "file"
+            }
+            ftp.voidcmd("TYPE I")  # Listen laufen im ASCII-Modus, SIZE braucht wieder Binärmodus
+            return listing
+        except ftplib.error_perm:
+            pass  # kein MLSD
+
+        names = ftp.nlst()
+        ftp.voidcmd("TYPE I")
+        listing = {}
+        for name in names:
+            name = posixpath.basename(name)
+            try:
+                size = ftp.size(name)
+            except ftplib.error_perm:
+                continue  # Ordner oder nicht lesbar
+            try:
+                modify = ftp.sendcmd(f"MDTM {name}").split()[-1]
+            except ftplib.error_perm:
+                modify = None
+            listing[name] = {"size": size, "modify": modify}
+        return listing
+
+    def sync_all(self, paths, delete=False, cancel_event=None, manifest_path=SYNC_MANIFEST):
+        """
+        Wie upload_all, lädt aber nur neue oder geänderte Dateien hoch. Verglichen wird die
+        Remote-Liste (einmal pro Aufruf) mit Größe und SHA-256 aus einem lokalen Manifest, das
+        pro Server und Zielordner festhält, was zuletzt hochgeladen wurde. Unveränderte Dateien
+        liefern ein Ergebnis mit "skipped": True.
+
+        Mit `delete` werden danach entfernte .webp-Dateien ohne lokale Entsprechung gelöscht
+        ("deleted": True).
+        """
+        data = load_json(manifest_path, {})
+        targets = data.get("targets", {}) if data.get("version") == SYNC_MANIFEST_VERSION else {}
+        known = targets.setdefault(f"{self.user}@{self.host}:{self.port}/{self.directory.strip('/')}", {})
+
+        try:
+            remote = self.list_remote()
+        except RETRY_ERRORS + (ftplib.error_perm,) as e:
+            self.close()
+            for path in paths:
+                yield {"path": path, "name": os.path.basename(path), "ok": False,
+                       "message": f"FTP-Ordner konnte nicht gelesen werden: {e}"}
+            return
+
+        changed = []
+        local = {}
+        for path in paths:
+            name = os.path.basename(path)
+            try:
+                stat = os.stat(path)
+                entry = known.get(name)
+                # Hash nur neu berechnen, wenn sich die lokale Datei seit dem letzten Lauf geändert hat
+                if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                    digest = entry["sha256"]
+                else:
+                    digest = hash_file(path)
+            except OSError as e:
+                yield {"path": path, "name": name, "ok": False, "message": f"Datei nicht lesbar: {name}: {e}"}
+                continue
+            local[name] = {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+            info = remote.get(name)
+            unchanged = (
+                info is not None and entry is not None
+                and info["size"] in (None, stat.st_size)
+                and entry["sha256"] == digest
+                # Wurde die Datei auf dem Server seitdem ersetzt, neu hochladen
+                and (info["modify"] is None or entry.get("remote_modify") in (None, info["modify"]))
+            )
+            if unchanged:
+                known[name] = {**entry, **local[name]}
+                yield {"path": path, "name": name, "ok": True, "skipped": True, "bytes": stat.st_size,
+                       "message": f"Unverändert, übersprungen: {name}"}
+            else:
+                changed.append(path)
+
+        uploaded = []
+        try:
+            for result in self.upload_all(changed, cancel_event):
+                if result["ok"]:
+                    uploaded.append(result["name"])
+                yield result
+
+            if uploaded or delete:
+                remote = self.list_remote()  # neue Zeitstempel der hochgeladenen Dateien
+            for name in uploaded:
+                known[name] = {**local[name], "remote_modify": (remote.get(name) or {}).get("modify")}
+
+            if delete and not (cancel_event is not None and cancel_event.is_set()):
+                ftp = self._connection()
+                for name in sorted(remote):
+                    if name in local or not name.lower().endswith(".webp"):
+                        continue
+                    try:
+                        ftp.delete(name)
+                        known.pop(name, None)
+                        yield {"path": None, "name": name, "ok": True, "deleted": True,
+                               "message": f"Auf dem Server gelöscht: {name}"}
+                    except ftplib.error_perm as e:
+                        yield {"path": None, "name": name, "ok": False, "deleted": True,
+                               "message": f"Löschen fehlgeschlagen für {name}: {e}"}
+        except RETRY_ERRORS as e:
+            yield {"path": None, "name": "", "ok": False, "message": f"FTP-Verbindung verloren: {e}"}
+        finally:
+            self.close()
+            save_json(manifest_path, {"version": SYNC_MANIFEST_VERSION, "targets": targets})
+
+    def close(self):
+        self._local = threading.local()  # auch die Verbindung des aufrufenden Threads vergessen
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for ftp in connections:
+            try:
+                ftp.quit()
+            except (ftplib.Error, OSError, EOFError):
+                ftp.close()
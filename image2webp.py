@@ -0,0 +1,256 @@
+"""
+Kommandozeile ohne GUI, z. B. für Build-Server und Cronjobs:
+
+    python -m image2webp convert SRC DST [--square] [--workers N] [--max-size PX]
+                                         [--variants storefront|2048,1024:75,...] [--incremental]
+                                         [--max-kb KB] [--profile fast|balanced|smallest]
+                                         [--deadline-min N] [--memory-limit-mb MB]
+                                         [--report bericht.json|bericht.csv]
+                                         [--alpha flatten|keep|auto] [--background FARBE]
+                                         [--compression lossy|lossless|auto]
+    python -m image2webp watch SRC [SRC ...] DST [Optionen wie convert] [--settle-s S] [--poll]
+                                         [--ftp-host HOST --ftp-user USER [--ftp-dir DIR]]
+                                         [--shopify DOMAIN [--token TOKEN]]
+    python -m image2webp cache DST [--max-age-days N | --clear]
+    python -m image2webp shopify-index DOMAIN [--token TOKEN]
+
+Importiert bewusst kein PyQt6, damit es auch auf Servern ohne Display läuft.
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+
+from batch import run_batch, default_workers, default_memory_limit, choose_profile_for_deadline
+from cache import ConversionCache
+from converter import (
+    VARIANT_SETS, ENCODE_PROFILES, DEFAULT_PROFILE, ALPHA_POLICIES, DEFAULT_ALPHA, COMPRESSION_MODES,
+    DEFAULT_COMPRESSION, parse_variants, parse_background, output_options,
+)
+from report import RunReport
+from scanner import iter_jobs
+from watch import HotFolder, SETTLE_SECONDS, POLL_INTERVAL, ftp_forwarder, shopify_forwarder
+
+
+def job_options(args):
+    """Optionen für convert_image aus den gemeinsamen Argumenten von convert und watch; wirft ValueError."""
+    return {
+        "max_size": args.max_size,
+        "square": args.square,
+        "variants": parse_variants(args.variants) if args.variants else None,
+        "max_bytes": args.max_kb * 1024 if args.max_kb else None,
+        "profile": args.profile,
+        **output_options(args.alpha, parse_background(args.background), args.compression),
+    }
+
+def cmd_convert(args):
+    if not os.path.isdir(args.src):
+        print(f"Quellordner nicht gefunden: {args.src}", file=sys.stderr)
+        return 2
+
+    try:
+        options = job_options(args)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    os.makedirs(args.dst, exist_ok=True)
+    cache = ConversionCache(args.dst) if args.incremental else None
+    report = RunReport() if args.report else None
+
+    start = time.perf_counter()
+    converted = 0
+    skipped = 0
+    failures = []
+    jobs = iter_jobs([args.src], args.dst, **options)
+    deadline = None
+    if args.deadline_min:
+        # Für die Schätzung müssen alle Dateiköpfe vorab gelesen werden
+        jobs = list(jobs)
+        profile, estimate = choose_profile_for_deadline(jobs, args.deadline_min, args.workers)
+        for job in jobs:
+            job["profile"] = profile
+        deadline = {"minutes": args.deadline_min, "profile": profile, "estimated_seconds": round(estimate, 1)}
+        if not args.quiet:
+            print(f"Profil {profile} gewählt (geschätzt {estimate / 60:.1f} min)", file=sys.stderr)
+    memory_limit = args.memory_limit_mb * 1024 ** 2 if args.memory_limit_mb else default_memory_limit()
+    for result in run_batch(jobs, args.workers, cache=cache, memory_limit=memory_limit):
+        if not args.quiet:
+            print(result["message"], file=sys.stderr)
+        if report is not None:
+            report.add_conversion(result)
+        if result.get("cached"):
+            skipped += 1
+        elif result["ok"]:
+            converted += 1
+        else:
+            failures.append({"input": result["input"], "message": result["message"]})
+
+    summary = {
+        "source": os.path.abspath(args.src),
+        "destination": os.path.abspath(args.dst),
+        "total": converted + skipped + len(failures),
+        "converted": converted,
+        "skipped": skipped,
+        "failed": len(failures),
+        "seconds": round(time.perf_counter() - start, 3),
+        "failures": failures,
+    }
+    if deadline is not None:
+        summary["deadline"] = deadline
+    if cache is not None:
+        summary["cache"] = {"hits": cache.hits, "misses": cache.misses}
+    if report is not None:
+        report.finish()
+        summary["report"] = os.path.abspath(report.save(args.report))
+        if not args.quiet:
+            print(report.text(), file=sys.stderr)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    return 1 if failures else 0
+
+def cmd_watch(args):
+    missing = [src for src in args.src if not os.path.isdir(src)]
+    if missing:
+        print(f"Quellordner nicht gefunden: {', '.join(missing)}", file=sys.stderr)
+        return 2
+    try:
+        options = job_options(args)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    upload = idle = generator = None
+    if args.ftp_host:
+        from ftp_upload import FtpUploader
+
+        password = os.environ.get("FTP_PASSWORD")
+        if not args.ftp_user or password is None:
+            print("Für FTP --ftp-user angeben und das Passwort in FTP_PASSWORD setzen.", file=sys.stderr)
+            return 2
+        uploader = FtpUploader(args.ftp_host, args.ftp_user, password, args.ftp_dir or "")
+        upload, idle = ftp_forwarder(uploader, args.dst)
+    elif args.shopify:
+        from alttext import AltTextGenerator, AltTextCache
+        from shopify import client_for
+
+        token = args.token or os.environ.get("SHOPIFY_TOKEN")
+        if not token:
+            print("Kein Access-Token: --token angeben oder SHOPIFY_TOKEN setzen.", file=sys.stderr)
+            return 2
+        # ALT-Texte aus dem Cache, mit OPENAI_API_KEY auch von der KI
+        generator = AltTextGenerator(os.environ.get("OPENAI_API_KEY", ""), cache=AltTextCache())
+        upload = shopify_forwarder(client_for(args.shopify, token), generator)
+        idle = generator.cache.save  # neue ALT-Texte nach jedem Stapel sichern
+
+    memory_limit = args.memory_limit_mb * 1024 ** 2 if args.memory_limit_mb else default_memory_limit()
+    hotfolder = HotFolder(
+        args.src, args.dst, options, upload, args.workers, memory_limit,
+        settle=args.settle_s, poll_interval=args.poll_interval, polling=args.poll, idle=idle,
+    )
+    # Dienste (systemd, launchd) beenden mit SIGTERM: laufenden Stapel abbrechen, Manifest speichern
+    signal.signal(signal.SIGTERM, lambda signum, frame: hotfolder.stop())
+    failed = 0
+    try:
+        for stage, result in hotfolder:
+            if stage == "status":
+                print(result, file=sys.stderr)
+                continue
+            failed += not result["ok"]
+            if not args.quiet:
+                print(result["message"], file=sys.stderr)
+    except KeyboardInterrupt:
+        hotfolder.stop()
+    finally:
+        if generator is not None:
+            generator.close()  # speichert auch den ALT-Text-Cache
+    print(f"Überwachung beendet ({failed} Fehler).", file=sys.stderr)
+    return 0
+
+def cmd_cache(args):
+    cache = ConversionCache(args.dst)
+    if args.clear:
+        removed = len(cache.entries)
+        cache.clear()
+    else:
+        removed = cache.prune(args.max_age_days)
+    cache.save()
+    print(json.dumps({"removed": removed, "remaining": len(cache.entries)}, indent=2))
+    return 0
+
+def cmd_shopify_index(args):
+    from shopify import ShopifyClient, ShopifyError  # braucht requests, nur für diesen Befehl
+
+    token = args.token or os.environ.get("SHOPIFY_TOKEN")
+    if not token:
+        print("Kein Access-Token: --token angeben oder SHOPIFY_TOKEN setzen.", file=sys.stderr)
+        return 2
+    try:
+        files, removed = ShopifyClient(args.domain, token).rebuild_index()
+    except (ShopifyError, OSError) as e:
+        print(f"Fehler beim Aufbau des Shopify-Index: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps({"domain": args.domain, "files": files, "removed": removed}, indent=2))
+    return 0
+
+def add_conversion_arguments(parser):
+    """Einstellungen der Konvertierung, gemeinsam für convert und watch."""
+    parser.add_argument("--square", action="store_true", help="quadratisches Produktbild erzeugen")
+    parser.add_argument("--max-size", type=int, default=2048, help="maximale Kantenlänge in Pixeln, mit --square auch Größe des Quadrats (Standard: 2048)")
+    parser.add_argument("--variants", help=f"mehrere Größen aus einer Dekodierung: {', '.join(VARIANT_SETS)} oder z. B. 2048,1024:75,640")
+    parser.add_argument("--max-kb", type=int, help="Byte-Budget pro Datei in KB; die Qualität wird passend gesucht")
+    parser.add_argument("--profile", choices=list(ENCODE_PROFILES), default=DEFAULT_PROFILE, help="Encoder-Aufwand (Standard: %(default)s)")
+    parser.add_argument("--alpha", choices=ALPHA_POLICIES, default=DEFAULT_ALPHA, help="Transparenz: flatten = auf Hintergrundfarbe legen, keep = behalten, auto = nur echte Transparenz behalten (Standard: %(default)s)")
+    parser.add_argument("--background", default="#ffffff", help="Hintergrundfarbe für flatten und den Rand quadratischer Bilder, z. B. #ffffff oder 255,255,255 (Standard: %(default)s)")
+    parser.add_argument("--compression", choices=COMPRESSION_MODES, default=DEFAULT_COMPRESSION, help="lossy, lossless oder auto = Grafiken und Logos verlustfrei, Fotos verlustbehaftet (Standard: %(default)s)")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="Anzahl paralleler Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--memory-limit-mb", type=int, help="Obergrenze für den geschätzten Speicher aller laufenden Konvertierungen (Standard: 60 %% des RAM)")
+    parser.add_argument("--quiet", action="store_true", help="keine Meldungen pro Datei ausgeben")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="image2webp", description="VISIQUE Image 2 WebP Converter (ohne GUI)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser("convert", help="Ordner rekursiv nach WebP konvertieren")
+    convert.add_argument("src", help="Quellordner")
+    convert.add_argument("dst", help="Exportordner (Unterordner werden gespiegelt, Bilder werden am Dateiinhalt erkannt)")
+    add_conversion_arguments(convert)
+    convert.add_argument("--deadline-min", type=float, help="Profil automatisch so wählen, dass der Batch in N Minuten fertig ist")
+    convert.add_argument("--incremental", action="store_true", help="unveränderte Quellen anhand des Manifests im Exportordner überspringen")
+    convert.add_argument("--report", help="Laufbericht mit Zeiten und Bytes je Schritt schreiben (.json mit Zusammenfassung oder .csv pro Datei)")
+    convert.set_defaults(func=cmd_convert)
+
+    watch = commands.add_parser("watch", help="Hotfolder: Quellordner dauerhaft überwachen und neue Bilder konvertieren (Ende mit Strg+C)")
+    watch.add_argument("src", nargs="+", help="ein oder mehrere Quellordner")
+    watch.add_argument("dst", help="Exportordner; unveränderte Quellen werden anhand des Manifests übersprungen")
+    add_conversion_arguments(watch)
+    watch.add_argument("--settle-s", type=float, default=SETTLE_SECONDS, help="so lange muss eine Datei unverändert sein, bevor sie konvertiert wird (Standard: %(default)s)")
+    watch.add_argument("--poll", action="store_true", help="Ordner regelmäßig durchsuchen statt inotify, z. B. für Netzlaufwerke")
+    watch.add_argument("--poll-interval", type=float, default=POLL_INTERVAL, help="Sekunden zwischen zwei Durchsuchungen beim Polling (Standard: %(default)s)")
+    watch.add_argument("--ftp-host", help="fertige Dateien per FTP hochladen (Passwort in der Umgebungsvariable FTP_PASSWORD)")
+    watch.add_argument("--ftp-user", help="FTP-Benutzer")
+    watch.add_argument("--ftp-dir", help="Zielordner auf dem FTP-Server")
+    watch.add_argument("--shopify", metavar="DOMAIN", help="fertige Dateien in die Dateien dieses Shops hochladen")
+    watch.add_argument("--token", help="Admin-API-Access-Token für --shopify (Standard: Umgebungsvariable SHOPIFY_TOKEN)")
+    watch.set_defaults(func=cmd_watch)
+
+    cache = commands.add_parser("cache", help="Manifest der inkrementellen Konvertierung aufräumen")
+    cache.add_argument("dst", help="Exportordner mit Manifest")
+    cache.add_argument("--max-age-days", type=float, help="zusätzlich Einträge entfernen, die so lange nicht benutzt wurden")
+    cache.add_argument("--clear", action="store_true", help="alle Einträge entfernen")
+    cache.set_defaults(func=cmd_cache)
+
+    index = commands.add_parser("shopify-index", help="Upload-Index eines Shops aus dessen Dateiliste neu aufbauen")
+    index.add_argument("domain", help="Shop-Domain, z. B. mein-shop.myshopify.com")
+    index.add_argument("--token", help="Admin-API-Access-Token (Standard: Umgebungsvariable SHOPIFY_TOKEN)")
+    index.set_defaults(func=cmd_shopify_index)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
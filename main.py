@@ -1,890 +1,1616 @@
-import sys
-import os
-from pathlib import Path
-from PIL import Image
-from ftplib import FTP
-import requests
-import json
-import webbrowser
-from openai import OpenAI
-import base64
-
-from PyQt6.QtWidgets import (
-    QApplication, QWidget, QLabel, QPushButton, QFileDialog, QMessageBox,
-    QVBoxLayout, QCheckBox, QHBoxLayout, QTextEdit,
-    QMenuBar, QDialog, QFormLayout, QLineEdit, QListWidget, QInputDialog
-)
-from PyQt6.QtGui import QPixmap, QFontDatabase, QFont, QIcon
-from PyQt6.QtCore import Qt, pyqtSignal, QSettings
-
-from updater import check_for_update
-import webbrowser
-
-version = "2025.7.7"
-
-BASE_DIR = Path(__file__).resolve().parent
-
-def resource_path(relative_path):
-    """Ressourcen kompatibel für PyInstaller laden"""
-    if hasattr(sys, '_MEIPASS'):
-        return os.path.join(sys._MEIPASS, relative_path)
-    return os.path.join(os.path.abspath("."), relative_path)
-
-def resize_image(img, max_size):
-    if img.width > max_size or img.height > max_size:
-        scaling_factor = min(max_size / img.width, max_size / img.height)
-        new_size = (int(img.width * scaling_factor), int(img.height * scaling_factor))
-        img = img.resize(new_size, Image.LANCZOS)
-        return img, True
-    return img, False
-
-def convert_image_to_webp(input_path, output_path, max_size, square):
-    try:
-        with Image.open(input_path) as img:
-            original_size = img.size
-
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-
-            if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
-                white_bg = Image.new("RGB", img.size, (255, 255, 255))
-                white_bg.paste(img, (0, 0), img)
-                img = white_bg
-
-            img, resized = resize_image(img, max_size)
-
-            if square:
-                square_size = 2048
-                scaling_factor = min(square_size / img.width, square_size / img.height)
-                new_width = int(img.width * scaling_factor)
-                new_height = int(img.height * scaling_factor)
-                resized_img = img.resize((new_width, new_height), Image.LANCZOS)
-
-                square_img = Image.new("RGB", (square_size, square_size), (255, 255, 255))
-                img_x = (square_size - new_width) // 2
-                img_y = (square_size - new_height) // 2
-                square_img.paste(resized_img, (img_x, img_y))
-                img = square_img
-
-            output_file_path = os.path.join(output_path, os.path.splitext(os.path.basename(input_path))[0] + ".webp")
-            img.save(output_file_path, format="WEBP", quality=80)
-
-            return f"{os.path.basename(input_path)} erfolgreich konvertiert ({original_size} → {img.size})"
-    except Exception as e:
-        return f"Fehler bei {os.path.basename(input_path)}: {e}"
-
-class ApiSettingsDialog(QDialog):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        
-        self.setWindowTitle("Verbindungen")
-        layout = QFormLayout()
-
-        self.chatgpt_token = QLineEdit()
-        self.shopify_domain = QLineEdit()
-        self.shopify_token = QLineEdit()
-        self.ftp_server = QLineEdit()
-        self.ftp_user = QLineEdit()
-        self.ftp_pass = QLineEdit()
-        self.ftp_dir = QLineEdit()
-
-        settings = QSettings("VISIQUE", "WebPConverter")
-
-        # --- Shopify ---
-        layout.addRow(self.make_section_label("Shopify"))
-
-        self.shop_list = QListWidget()
-        self.shop_list.setFixedHeight(75)
-        layout.addRow("Shops:", self.shop_list)
-
-        self.shop_name = QLineEdit()
-        layout.addRow("Name:", self.shop_name)
-
-        self.shop_domain = QLineEdit()
-        layout.addRow("Domain:", self.shop_domain)
-
-        self.shop_token = QLineEdit()
-        self.shop_token.setEchoMode(QLineEdit.EchoMode.Password)
-        layout.addRow("API Token:", self.shop_token)
-
-        btn_add = QPushButton("Hinzufügen / Aktualisieren")
-        btn_add.clicked.connect(self.on_add_shop)
-        layout.addRow(btn_add)
-
-        btn_remove = QPushButton("Ausgewählten Shop löschen")
-        btn_remove.clicked.connect(self.on_remove_shop)
-        layout.addRow(btn_remove)
-
-        self.accounts = json.loads(settings.value("shopify_accounts", "[]"))
-        self.refresh_shop_list()
-        self.shop_list.currentRowChanged.connect(self.on_shop_selected)
-
-        # --- ChatGPT ---
-        layout.addRow(self.make_section_label("ChatGPT"))
-
-        self.chatgpt_token = QLineEdit()
-        self.chatgpt_token.setEchoMode(QLineEdit.EchoMode.Password)
-        stored_chatgpt = settings.value("chatgpt_token", "")
-        if stored_chatgpt:
-            self.chatgpt_token.setPlaceholderText("••••••••••••")
-        layout.addRow("API Token:", self.chatgpt_token)
-
-        # --- FTP ---
-        layout.addRow(self.make_section_label("FTP"))
-
-        self.ftp_server = QLineEdit()
-        self.ftp_server.setText(settings.value("ftp_server", ""))
-        layout.addRow("Server:", self.ftp_server)
-
-        self.ftp_user = QLineEdit()
-        self.ftp_user.setText(settings.value("ftp_user", ""))
-        layout.addRow("Benutzername:", self.ftp_user)
-
-        self.ftp_pass = QLineEdit()
-        self.ftp_pass.setEchoMode(QLineEdit.EchoMode.Password)
-        stored_ftp_pass = settings.value("ftp_pass", "")
-        if stored_ftp_pass:
-            self.ftp_pass.setPlaceholderText("••••••••••••")
-        layout.addRow("Passwort:", self.ftp_pass)
-
-        self.ftp_dir = QLineEdit()
-        self.ftp_dir.setText(settings.value("ftp_dir", ""))
-        layout.addRow("FTP Folder:", self.ftp_dir)
-
-        # --- Speichern Button ---
-        btn_save = QPushButton("Speichern")
-        btn_save.clicked.connect(self.save_settings)
-        layout.addRow(btn_save)
-
-        self.setLayout(layout)
-
-    def refresh_shop_list(self):
-        self.shop_list.clear()
-        for acc in self.accounts:
-            self.shop_list.addItem(acc["name"])
-
-    def on_shop_selected(self, index):
-        if index < 0 or index >= len(self.accounts):
-            return
-        acc = self.accounts[index]
-        self.shop_name.setText(acc["name"])
-        self.shop_domain.setText(acc["domain"])
-        self.shop_token.setText(acc["token"])
-
-    def on_add_shop(self):
-        name = self.shop_name.text().strip()
-        domain = self.shop_domain.text().strip()
-        token = self.shop_token.text().strip()
-        if not name or not domain or not token:
-            QMessageBox.warning(self, "Fehler", "Alle Felder müssen ausgefüllt sein.")
-            return
-
-        for acc in self.accounts:
-            if acc["name"] == name:
-                acc["domain"] = domain
-                acc["token"] = token
-                break
-        else:
-            self.accounts.append({"name": name, "domain": domain, "token": token})
-
-        self.refresh_shop_list()
-        self.save_to_settings()
-
-    def on_remove_shop(self):
-        index = self.shop_list.currentRow()
-        if 0 <= index < len(self.accounts):
-            del self.accounts[index]
-            self.refresh_shop_list()
-            self.save_to_settings()
-
-    def save_to_settings(self):
-        settings = QSettings("VISIQUE", "WebPConverter")
-        settings.setValue("shopify_accounts", json.dumps(self.accounts))
-
-    def make_section_label(self, text):
-        label = QLabel(text)
-        label.setStyleSheet("font-weight: bold; margin-top: 10px; margin-bottom: 4px; color: #FDCA40;")
-        return label
-    
-
-    def save_settings(self):
-        settings = QSettings("VISIQUE", "WebPConverter")
-
-        if self.chatgpt_token.text():
-            settings.setValue("chatgpt_token", self.chatgpt_token.text())
-        if self.shopify_token.text():
-            settings.setValue("shopify_token", self.shopify_token.text())
-        if self.ftp_pass.text():
-            settings.setValue("ftp_pass", self.ftp_pass.text())
-
-        settings.setValue("shopify_domain", self.shopify_domain.text())
-        settings.setValue("ftp_server", self.ftp_server.text())
-        settings.setValue("ftp_user", self.ftp_user.text())
-        settings.setValue("ftp_dir", self.ftp_dir.text())
-
-        QMessageBox.information(self, "Gespeichert", "Die Einstellungen wurden erfolgreich gespeichert.")
-        self.accept()
-
-class ImageConverter(QWidget):
-    def dragEnterEvent(self, event):
-        if event.mimeData().hasUrls():
-            event.acceptProposedAction()
-
-    def dropEvent(self, event):
-        files = [url.toLocalFile() for url in event.mimeData().urls()]
-        valid = [f for f in files if f.lower().endswith(('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp', '.gif', '.webp', '.avif'))]
-        if valid:
-            self.process_images(valid)
-
-    def __init__(self):
-        super().__init__()
-
-        font_regular_path = BASE_DIR / "Roboto-Regular.ttf"
-        font_semibold_path = BASE_DIR / "Roboto-SemiBold.ttf"
-        font_ids = []
-        for font_path in [font_regular_path, font_semibold_path]:
-            if font_path.exists():
-                font_id = QFontDatabase.addApplicationFont(str(font_path))
-                if font_id != -1:
-                    font_ids.append(font_id)
-        if font_ids:
-            family = QFontDatabase.applicationFontFamilies(font_ids[0])[0]
-            QApplication.instance().setFont(QFont(family, 10))
-
-        self.setAcceptDrops(True)
-        self.setWindowTitle(f"VISIQUE - Image 2 WebP Converter")
-        self.setFixedSize(775, 450)
-        self.move(QApplication.primaryScreen().availableGeometry().center() - self.rect().center())
-
-        palette = self.palette()
-        palette.setColor(self.backgroundRole(), Qt.GlobalColor.black)
-        self.setPalette(palette)
-        self.setAutoFillBackground(True)
-
-        self.background = QLabel(self)
-        self.background.setPixmap(QPixmap(resource_path("bg.jpg")))
-        self.background.setScaledContents(True)
-        self.background.setGeometry(self.rect())
-        self.background.lower()
-
-        layout = QVBoxLayout()
-        layout.setContentsMargins(100, 20, 100, 25)
-
-        menubar = QMenuBar(self)
-
-        # Menü "Einstellungen"
-        menu = menubar.addMenu("Einstellungen")
-        api_action = menu.addAction("Verbindungen")
-        api_action.triggered.connect(self.open_api_settings)
-
-        # Hilfe-Menü mit Version
-        help_menu = menubar.addMenu("?")
-        help_menu.setStyleSheet("font-weight: bold;")
-        poweredby = help_menu.addAction("Powered by VISIQUE.de")
-        poweredby.triggered.connect(lambda: webbrowser.open("https://visique.de"))
-        version_action = help_menu.addAction(f"Version: {version}")
-        version_action.setEnabled(False)
-
-        layout.setMenuBar(menubar)
-
-        # Logo
-        logo_path = Path(resource_path("logo.png"))
-        if logo_path.exists():
-            pixmap = QPixmap(str(logo_path)).scaled(250, 63, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            logo_label = QLabel()
-            logo_label.setPixmap(pixmap)
-            logo_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            logo_label.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-            layout.addWidget(logo_label)
-
-        title = QLabel("Image 2 WebP Converter")
-        title.setFont(QFont("Roboto", 18, QFont.Weight.Bold))
-        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-        title.setStyleSheet("margin-bottom: 10px;")
-        layout.addWidget(title)
-
-        checkbox_layout = QHBoxLayout()
-        checkbox_layout.addStretch()
-        self.square_checkbox = QCheckBox("Produktbild (quadratisch, 2048x2048) erstellen")
-        self.square_checkbox.setStyleSheet("color: white; font-size: 14px; margin-bottom: 25px")
-        checkbox_layout.addWidget(self.square_checkbox)
-        checkbox_layout.addStretch()
-        layout.addLayout(checkbox_layout)
-
-       # Button-Layout horizontal
-        button_layout = QHBoxLayout()
-
-        # Buttons definieren
-        btn_folder = QPushButton("Ordner wählen")
-        btn_files = QPushButton("Bilder wählen")
-        buttons = [btn_folder, btn_files]
-
-        # Prüfe, ob FTP-Daten vorhanden sind → optionalen Button anhängen
-        settings = QSettings("VISIQUE", "WebPConverter")
-        if all(settings.value(key, "") for key in ["ftp_server", "ftp_user", "ftp_pass"]):
-            btn_ftp_upload = QPushButton("FTP Upload")
-            btn_ftp_upload.clicked.connect(self.handle_ftp_upload)
-            buttons.append(btn_ftp_upload)
-
-        # Styling und Verhalten für alle Buttons
-        for btn in buttons:
-            btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            btn.setMinimumHeight(40)
-
-        # Aktionen verbinden
-        btn_folder.clicked.connect(self.select_folder)
-        btn_files.clicked.connect(self.select_files)
-
-        # Buttons ins Layout einfügen
-        button_layout.addStretch()
-        for i, btn in enumerate(buttons):
-            button_layout.addWidget(btn)
-            if i < len(buttons) - 1:
-                button_layout.addSpacing(20)
-        button_layout.addStretch()
-
-        layout.addLayout(button_layout)
-
-
-        self.drop_area = DropArea()
-        self.drop_area.files_dropped.connect(self.process_images)
-        layout.addWidget(self.drop_area)
-
-        # Toggle-Button
-        self.toggle_log_btn = QPushButton("Log anzeigen")
-        self.toggle_log_btn.setCheckable(True)
-        self.toggle_log_btn.setChecked(False)
-        self.toggle_log_btn.setStyleSheet("""
-            QPushButton {
-                margin-top: 10px;
-                border: none;
-                background: none;
-                color: #fff;
-                font-size: 12px;
-            }
-        """)
-        self.toggle_log_btn.clicked.connect(self.toggle_log_visibility)
-        layout.addWidget(self.toggle_log_btn)
-
-        # Log-Bereich (anfangs versteckt)
-        log_label = QLabel("Log Output:")
-        log_label.setFont(QFont("Roboto", 12, QFont.Weight.Bold))
-        log_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
-        log_label.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-        self.log_label = log_label
-        layout.addWidget(log_label)
-        log_label.setVisible(False)
-
-        self.status_output = QTextEdit()
-        self.status_output.setReadOnly(True)
-        self.status_output.setStyleSheet("background-color: #1e1e1e; color: white;")
-        layout.addWidget(self.status_output)
-        self.status_output.setVisible(False)
-
-        self.setLayout(layout)
-
-        self.print_connections()
-
-    def toggle_log_visibility(self):
-        is_visible = self.toggle_log_btn.isChecked()
-        self.status_output.setVisible(is_visible)
-        self.log_label.setVisible(is_visible)
-        self.toggle_log_btn.setText("Log verbergen" if is_visible else "Log anzeigen")
-
-        if self.toggle_log_btn.isChecked():
-            self.setFixedSize(775, 625)
-        else:
-            self.setFixedSize(775, 450)
-
-    def log(self, text):
-        self.status_output.append(text)
-
-    def select_folder(self):
-        folder = QFileDialog.getExistingDirectory(self, "Ordner auswählen")
-        if folder:
-            files = [
-                os.path.join(folder, f)
-                for f in os.listdir(folder)
-                if f.lower().endswith(('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp', '.gif', '.webp', '.avif'))
-            ]
-            self.process_images(files)
-
-    def select_files(self):
-        files, _ = QFileDialog.getOpenFileNames(self, "Bilder auswählen", "",
-                                                "Image files (*.png *.jpg *.jpeg *.tif *.tiff *.bmp *.gif *.webp *.avif)")
-        if files:
-            self.process_images(files)
-
-    def handle_ftp_upload(self):
-        # Bilddateien auswählen
-        files, _ = QFileDialog.getOpenFileNames(
-            self,
-            "Bilder für FTP-Upload auswählen",
-            "",
-            "Image files (*.webp)"
-        )
-        if not files:
-            return
-
-        # FTP-Zugangsdaten aus Einstellungen holen
-        settings = QSettings("VISIQUE", "WebPConverter")
-        host = settings.value("ftp_server", "")
-        user = settings.value("ftp_user", "")
-        password = settings.value("ftp_pass", "")
-        dir = settings.value("ftp_dir", "")
-
-        try:
-            self.log("Verbindung zum FTP-Server wird aufgebaut ...")
-            ftp = FTP(host)
-            ftp.login(user, password)
-            ftp.cwd(dir)
-
-            self.log(f"Erfolgreich verbunden mit {host}.")
-            for path in files:
-                file_name = os.path.basename(path)
-                with open(path, 'rb') as f:
-                    ftp.storbinary(f"STOR {file_name}", f)
-                    self.log(f"Bild hochgeladen: {file_name}")
-
-            ftp.quit()
-            self.log("FTP-Upload abgeschlossen.")
-            QMessageBox.information(self, "Fertig", "Die Bilder wurden auf den FTP-Server hochgeladen.")
-
-        except Exception as e:
-            self.log(f"FTP-Upload fehlgeschlagen: {e}")
-            QMessageBox.critical(self, "Fehler", f"Upload fehlgeschlagen:\n{e}")
-
-    def upload_image_to_shopify(self, image_path, domain, token):
-        settings = QSettings("VISIQUE", "WebPConverter")
-        graphql_url = f"https://{domain}/admin/api/2025-01/graphql.json"
-
-        # Dialog zur Alt-Text-Abfrage
-        dialog = AltTextDialog(image_path, self)
-        if dialog.exec() != QDialog.DialogCode.Accepted:
-            self.log(f"Shopify Upload abgebrochen für {os.path.basename(image_path)}.")
-            return
-
-        alt_text = dialog.get_alt_text()
-        if not alt_text:
-            self.log("ALT-Text wurde nicht eingegeben. Upload übersprungen.")
-            return
-
-        try:
-            self.log("Starte Shopify-Upload...")
-            headers = {
-                "Content-Type": "application/json",
-                "X-Shopify-Access-Token": token
-            }
-
-            filename = os.path.basename(image_path)
-            mime_type = "image/webp"
-            staged_payload = {
-                "query": """
-                    mutation stagedUploadsCreate($input: [StagedUploadInput!]!) {
-                    stagedUploadsCreate(input: $input) {
-                        stagedTargets {
-                        url
-                        resourceUrl
-                        parameters {
-                            name
-                            value
-                        }
-                        }
-                        userErrors {
-                        field
-                        message
-                        }
-                    }
-                    }
-                """,
-                "variables": {
-                    "input": [{
-                        "filename": filename,
-                        "mimeType": mime_type,
-                        "resource": "FILE",
-                        "httpMethod": "POST"
-                    }]
-                }
-            }
-
-            staged_response = requests.post(graphql_url, headers=headers, json=staged_payload)
-            staged_data = staged_response.json()
-
-            targets = staged_data.get("data", {}).get("stagedUploadsCreate", {}).get("stagedTargets", [])
-            if not targets:
-                raise Exception("Kein Upload-Ziel erhalten.")
-
-            upload_url = targets[0]["url"]
-            resource_url = targets[0]["resourceUrl"]
-            parameters = {p["name"]: p["value"] for p in targets[0]["parameters"]}
-
-            with open(image_path, "rb") as f:
-                file_data = f.read()
-
-            files = {'file': (filename, file_data, mime_type)}
-            upload_response = requests.post(upload_url, data=parameters, files=files)
-            if upload_response.status_code >= 300:
-                raise Exception(f"Fehler beim Datei-Upload: {upload_response.text}")
-
-            # Bild registrieren
-            file_create_payload = {
-                "query": """
-                    mutation fileCreate($files: [FileCreateInput!]!) {
-                    fileCreate(files: $files) {
-                        files {
-                        id
-                        alt
-                        createdAt
-                        preview {
-                            image {
-                            url
-                            }
-                        }
-                        }
-                        userErrors {
-                        field
-                        message
-                        }
-                    }
-                    }
-                """,
-                "variables": {
-                    "files": [{
-                        "alt": alt_text,
-                        "contentType": "IMAGE",
-                        "originalSource": resource_url
-                    }]
-                }
-            }
-
-            file_create_response = requests.post(graphql_url, headers=headers, json=file_create_payload)
-            file_data = file_create_response.json()
-
-            errors = file_data.get("errors", [])
-            user_errors = file_data.get("data", {}).get("fileCreate", {}).get("userErrors", [])
-
-            if errors or user_errors:
-                raise Exception(errors[0]["message"] if errors else user_errors[0]["message"])
-
-            self.log(f"Shopify Hochgeladen: {filename} mit ALT-Text: {alt_text}")
-
-        except Exception as e:
-            self.log(f"Fehler beim Shopify-Upload: {e}")
-
-    def process_images(self, file_paths):
-        output_folder = QFileDialog.getExistingDirectory(self, "Export Ordner wählen")
-        if not output_folder:
-            return
-
-        # Prüfen, ob Shopify-Daten vorhanden sind
-        settings = QSettings("VISIQUE", "WebPConverter")
-        accounts = json.loads(settings.value("shopify_accounts", "[]"))
-
-        upload_to_shopify = False
-
-        if accounts:
-            answer = QMessageBox.question(
-                self,
-                "Zu Shopify hochladen?",
-                "Sollen die konvertierten Bilder direkt zu Shopify hochgeladen werden?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-            )
-            upload_to_shopify = (answer == QMessageBox.StandardButton.Yes)
-
-        if upload_to_shopify:
-            names = [a["name"] for a in accounts]
-            selected_name, ok = QInputDialog.getItem(self, "Shop auswählen", "Wähle einen Shopify-Shop:", names, editable=False)
-            if not ok:
-                return
-            selected_shop = next(acc for acc in accounts if acc["name"] == selected_name)
-
-        for path in file_paths:
-            self.log(f"Verarbeite {os.path.basename(path)} ...")
-            msg = convert_image_to_webp(path, output_folder, max_size=2048, square=self.square_checkbox.isChecked())
-            self.log(msg)
-
-            if upload_to_shopify:
-                try:
-                    self.upload_image_to_shopify(os.path.join(output_folder, os.path.splitext(os.path.basename(path))[0] + ".webp"), domain=selected_shop["domain"], token=selected_shop["token"])
-                except Exception as e:
-                    self.log(f"Fehler beim Shopify-Upload: {e}")
-
-        QMessageBox.information(self, "Fertig", "Die Konvertierung ist abgeschlossen!")
-        webbrowser.open(f"file:///{output_folder}")
-
-
-    def open_api_settings(self):
-        dialog = ApiSettingsDialog(self)
-        dialog.exec()
-
-    def print_connections(self):
-        settings = QSettings("VISIQUE", "WebPConverter")
-        ftp_server = settings.value("ftp_server", "")
-        self.log(f"Gespeicherter FTP Server: {ftp_server}")
-
-class DropArea(QLabel):
-    files_dropped = pyqtSignal(list)
-
-    def __init__(self):
-        super().__init__("Dateien hierher ziehen und ablegen")
-        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.set_default_style()
-        self.setAcceptDrops(True)
-
-    def set_default_style(self):
-        self.setStyleSheet("""
-            QLabel {
-                border: 2px dashed #FDCA40;
-                color: #FDCA40;
-                font-size: 14px;
-                margin-top: 25px;
-                padding: 30px;
-                border-radius: 10px;
-                background-color: transparent;
-            }
-        """)
-
-    def set_highlight_style(self):
-        self.setStyleSheet("""
-            QLabel {
-                border: 2px dashed #FFFFFF;
-                color: #FFFFFF;
-                font-size: 14px;
-                padding: 30px;
-                border-radius: 10px;
-                background-color: rgba(253, 202, 64, 0.2);
-            }
-        """)
-
-    def dragEnterEvent(self, event):
-        if event.mimeData().hasUrls():
-            event.acceptProposedAction()
-            self.set_highlight_style()  # Visuellen Effekt aktivieren
-
-    def dragLeaveEvent(self, event):
-        self.set_default_style()  # Effekt zurücksetzen
-
-    def dropEvent(self, event):
-        self.set_default_style()  # Effekt zurücksetzen
-        paths = [url.toLocalFile() for url in event.mimeData().urls()]
-        valid_files = [f for f in paths if f.lower().endswith((
-            '.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp', '.gif', '.webp', '.avif'
-        ))]
-        if valid_files:
-            self.files_dropped.emit(valid_files)
-
-class ClickableLabel(QLabel):
-    def __init__(self, url, parent=None):
-        super().__init__(parent)
-        self.url = url
-
-    def mousePressEvent(self, event):
-        if event.button() == Qt.MouseButton.LeftButton:
-            webbrowser.open(self.url)
-
-class AltTextDialog(QDialog):
-    def __init__(self, image_path, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("ALT-Text eingeben")
-        self.image_path = image_path
-
-        layout = QVBoxLayout()
-
-        # Bildvorschau
-        pixmap = QPixmap(image_path).scaled(600, 600, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-        image_label = QLabel()
-        image_label.setPixmap(pixmap)
-        image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(image_label)
-
-        # Textfeld
-        self.text_input = QLineEdit()
-        self.text_input.setPlaceholderText("ALT-Text eingeben")
-        layout.addWidget(self.text_input)
-
-        # Buttons horizontal
-        btn_layout = QHBoxLayout()
-
-        # Generieren-Button – immer erstellen, aber ggf. ausblenden
-        self.generate_btn = QPushButton("Mit KI generieren")
-        self.generate_btn.clicked.connect(self.generate_alt_text)
-
-        # GPT-Token prüfen und Button ggf. verstecken
-        settings = QSettings("VISIQUE", "WebPConverter")
-        api_key = settings.value("chatgpt_token", "")
-        if api_key:
-            btn_layout.addWidget(self.generate_btn)
-        else:
-            self.generate_btn.hide()
-
-        # Hochladen-Button
-        btn_upload = QPushButton("Hochladen")
-        btn_upload.clicked.connect(self.validate_and_accept)
-        btn_layout.addWidget(btn_upload)
-
-        layout.addLayout(btn_layout)
-
-        self.setLayout(layout)
-
-    def get_alt_text(self):
-        return self.text_input.text().strip()
-    
-    def validate_and_accept(self):
-      alt_text = self.text_input.text().strip()
-      if len(alt_text) < 5:
-          QMessageBox.warning(self, "Ungültiger ALT-Text", "Bitte gib einen ALT-Text mit mindestens 5 Zeichen ein.")
-          return
-      self.accept()
-
-    def generate_alt_text(self):
-        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-        self.generate_btn.setEnabled(False)
-
-        try:
-            # Bild als base64
-            with open(self.image_path, "rb") as f:
-                b64_image = base64.b64encode(f.read()).decode("utf-8")
-
-            image_url = f"data:image/webp;base64,{b64_image}"
-
-            settings = QSettings("VISIQUE", "WebPConverter")
-            api_key = settings.value("chatgpt_token", "")
-            if not api_key:
-                self.status.setText("Kein ChatGPT API-Token hinterlegt.")
-                return
-
-            client = OpenAI(api_key=api_key)
-
-            gpt_response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": (
-                                    "Erstelle einen prägnanten Alt-Text mit maximal 125 Zeichen für das angehängte Produktbild. "
-                                    "Beschreibe objektiv, was auf dem Bild zu sehen ist, idealerweise mit Hinweisen auf Art, "
-                                    "Einsatzbereich oder Zielgruppe. Hinterlege Markennamen und Modell wenn diese ersichtlich sind. "
-                                    "Keine Erklärungen oder Meta-Kommentare wie zb 'Markenname nicht erkenntlich', nur der reine Alt-Text. "
-                                    "Schreibe nicht zu hochgestochen, sondern so, dass es für eine breite Zielgruppe verständlich ist."
-                                ),
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": image_url
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=100
-            )
-
-            alt_text = gpt_response.choices[0].message.content
-            self.text_input.setText(alt_text.strip())
-
-        finally:
-            self.generate_btn.setEnabled(True)
-            QApplication.restoreOverrideCursor()
-
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-
-    asset_url, latest_version = check_for_update(version)
-    if asset_url:
-        msg = f"Version {latest_version} ist verfügbar.\n\nDie neuste Version wird im Downloads Verzeichnis gespeichert."
-        reply = QMessageBox.information(
-            None,
-            "Neue Version verfügbar",
-            msg,
-            QMessageBox.StandardButton.Ok
-        )
-        # Optional: Direkt im Browser öffnen
-        webbrowser.open(asset_url)
-
-    app.setStyleSheet("""
-        QMenuBar {
-            background-color: #141414;
-            color: white;
-            font-size: 13px;
-        }
-        QMenuBar::item {
-            background: transparent;
-            padding: 4px 12px;
-        }
-        QMenuBar::item:selected {
-            background-color: #FDCA40;
-            color: black;
-        }
-        QMenu {
-            background-color: #1e1e1e;
-            color: white;
-            border: 1px solid #FDCA40;
-        }
-        QMenu::item {
-            padding: 6px 20px;
-        }
-        QMenu::item:selected {
-            background-color: #FDCA40;
-            color: black;
-        }
-        QPushButton {
-            background-color: #FDCA40;
-            color: black;
-            font-size: 14px;
-            padding: 0 20px;
-            border-radius: 5px;
-            height: 40px;
-            min-height: 40px;
-            width: 100%;
-        }
-        QPushButton:hover {
-            background-color: #e6b800;
-        }
-        QCheckBox {            
-            color: white;
-            spacing: 8px;
-        }
-        QCheckBox::indicator {
-            border-radius: 5px;
-            width: 18px;
-            height: 18px;
-        }
-        QCheckBox::indicator:unchecked {
-            border: 2px solid #FDCA40;
-            background-color: transparent;
-        }
-        QCheckBox::indicator:checked {
-            background-color: #FDCA40;
-            border: 2px solid #FDCA40;
-        }
-        QLineEdit {
-            min-width: 350px;
-            font-size: 14px;
-            padding: 5px;
-            margin: 2px 0;
-        }
-        QListWidget{
-            min-width: 350px;
-            font-size: 14px;
-            padding: 5px;
-            margin: 2px 0;  
-        }
-    """)
-
-    icon_path = None
-    if sys.platform == "darwin":
-        icon_path = Path(resource_path("icon.icns"))
-    elif sys.platform.startswith("win"):
-        icon_path = Path(resource_path("icon.ico"))
-
-    if icon_path and icon_path.exists():
-        app.setWindowIcon(QIcon(str(icon_path)))
-
-    window = ImageConverter()
-    window.show()
-    sys.exit(app.exec())
+import time
+STARTUP = {"start": time.perf_counter()}  # Zeitmarken für den Startbericht
+
+import sys
+import os
+import threading
+import multiprocessing
+from collections import deque
+from pathlib import Path
+import json
+import webbrowser
+
+from PyQt6.QtWidgets import (
+    QApplication, QWidget, QLabel, QPushButton, QFileDialog, QMessageBox,
+    QVBoxLayout, QCheckBox, QHBoxLayout, QPlainTextEdit,
+    QMenuBar, QDialog, QFormLayout, QLineEdit, QListWidget, QInputDialog,
+    QProgressBar, QSpinBox, QColorDialog
+)
+from PyQt6.QtGui import QPixmap, QFontDatabase, QFont, QIcon, QColor
+from PyQt6.QtCore import Qt, pyqtSignal, QSettings, QThread, QTimer, QObject
+
+from converter import (
+    VARIANT_SETS, ENCODE_PROFILES, DEFAULT_PROFILE, DEFAULT_ALPHA, DEFAULT_COMPRESSION, parse_variants,
+    parse_background, output_options,
+)
+from batch import default_workers, default_memory_limit, choose_profile_for_deadline
+from cache import ConversionCache
+from scanner import iter_jobs, sniff
+from pipeline import Pipeline
+from report import RunReport, default_report_path
+from runlog import start_file_log, result_record, default_log_path
+# Updater, Shopify, FTP und OpenAI (requests, ftplib, openai) werden erst bei Bedarf importiert,
+# damit das Fenster schnell erscheint
+
+version = "2025.7.7"
+
+# Zeit bis zum sichtbaren Fenster, die python main.py --startup-report einhalten muss
+STARTUP_BUDGET = 1.0
+# Höchstens einmal pro Tag nach Updates suchen
+UPDATE_CHECK_INTERVAL = 24 * 60 * 60
+# Das Log-Fenster zeigt nur die letzten Zeilen; neue werden gesammelt alle LOG_FLUSH_MS eingefügt
+LOG_LINES = 5000
+LOG_FLUSH_MS = 100
+
+STARTUP["imports"] = time.perf_counter()
+
+BASE_DIR = Path(__file__).resolve().parent
+
+def resource_path(relative_path):
+    """Ressourcen kompatibel für PyInstaller laden"""
+    if hasattr(sys, '_MEIPASS'):
+        return os.path.join(sys._MEIPASS, relative_path)
+    return os.path.join(os.path.abspath("."), relative_path)
+
+class ApiSettingsDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        
+        self.setWindowTitle("Verbindungen")
+        layout = QFormLayout()
+
+        self.chatgpt_token = QLineEdit()
+        self.shopify_domain = QLineEdit()
+        self.shopify_token = QLineEdit()
+        self.ftp_server = QLineEdit()
+        self.ftp_user = QLineEdit()
+        self.ftp_pass = QLineEdit()
+        self.ftp_dir = QLineEdit()
+
+        settings = QSettings("VISIQUE", "WebPConverter")
+
+        # --- Shopify ---
+        layout.addRow(self.make_section_label("Shopify"))
+
+        self.shop_list = QListWidget()
+        self.shop_list.setFixedHeight(75)
+        layout.addRow("Shops:", self.shop_list)
+
+        self.shop_name = QLineEdit()
+        layout.addRow("Name:", self.shop_name)
+
+        self.shop_domain = QLineEdit()
+        layout.addRow("Domain:", self.shop_domain)
+
+        self.shop_token = QLineEdit()
+        self.shop_token.setEchoMode(QLineEdit.EchoMode.Password)
+        layout.addRow("API Token:", self.shop_token)
+
+        btn_add = QPushButton("Hinzufügen / Aktualisieren")
+        btn_add.clicked.connect(self.on_add_shop)
+        layout.addRow(btn_add)
+
+        btn_remove = QPushButton("Ausgewählten Shop löschen")
+        btn_remove.clicked.connect(self.on_remove_shop)
+        layout.addRow(btn_remove)
+
+        self.accounts = json.loads(settings.value("shopify_accounts", "[]"))
+        self.refresh_shop_list()
+        self.shop_list.currentRowChanged.connect(self.on_shop_selected)
+
+        # --- ChatGPT ---
+        layout.addRow(self.make_section_label("ChatGPT"))
+
+        self.chatgpt_token = QLineEdit()
+        self.chatgpt_token.setEchoMode(QLineEdit.EchoMode.Password)
+        stored_chatgpt = settings.value("chatgpt_token", "")
+        if stored_chatgpt:
+            self.chatgpt_token.setPlaceholderText("••••••••••••")
+        layout.addRow("API Token:", self.chatgpt_token)
+
+        # --- FTP ---
+        layout.addRow(self.make_section_label("FTP"))
+
+        self.ftp_server = QLineEdit()
+        self.ftp_server.setText(settings.value("ftp_server", ""))
+        layout.addRow("Server:", self.ftp_server)
+
+        self.ftp_user = QLineEdit()
+        self.ftp_user.setText(settings.value("ftp_user", ""))
+        layout.addRow("Benutzername:", self.ftp_user)
+
+        self.ftp_pass = QLineEdit()
+        self.ftp_pass.setEchoMode(QLineEdit.EchoMode.Password)
+        stored_ftp_pass = settings.value("ftp_pass", "")
+        if stored_ftp_pass:
+            self.ftp_pass.setPlaceholderText("••••••••••••")
+        layout.addRow("Passwort:", self.ftp_pass)
+
+        self.ftp_dir = QLineEdit()
+        self.ftp_dir.setText(settings.value("ftp_dir", ""))
+        layout.addRow("FTP Folder:", self.ftp_dir)
+
+        self.ftp_sessions = QSpinBox()
+        self.ftp_sessions.setRange(1, 16)
+        self.ftp_sessions.setValue(int(settings.value("ftp_sessions", 4)))
+        layout.addRow("Verbindungen:", self.ftp_sessions)
+
+        self.ftp_sync = QCheckBox("Nur neue oder geänderte Dateien hochladen")
+        self.ftp_sync.setChecked(settings.value("ftp_sync", "false") == "true")
+        layout.addRow(self.ftp_sync)
+
+        self.ftp_delete = QCheckBox("Dateien auf dem Server löschen, die nicht ausgewählt sind")
+        self.ftp_delete.setChecked(settings.value("ftp_delete", "false") == "true")
+        layout.addRow(self.ftp_delete)
+
+        # --- Speichern Button ---
+        btn_save = QPushButton("Speichern")
+        btn_save.clicked.connect(self.save_settings)
+        layout.addRow(btn_save)
+
+        self.setLayout(layout)
+
+    def refresh_shop_list(self):
+        self.shop_list.clear()
+        for acc in self.accounts:
+            self.shop_list.addItem(acc["name"])
+
+    def on_shop_selected(self, index):
+        if index < 0 or index >= len(self.accounts):
+            return
+        acc = self.accounts[index]
+        self.shop_name.setText(acc["name"])
+        self.shop_domain.setText(acc["domain"])
+        self.shop_token.setText(acc["token"])
+
+    def on_add_shop(self):
+        name = self.shop_name.text().strip()
+        domain = self.shop_domain.text().strip()
+        token = self.shop_token.text().strip()
+        if not name or not domain or not token:
+            QMessageBox.warning(self, "Fehler", "Alle Felder müssen ausgefüllt sein.")
+            return
+
+        for acc in self.accounts:
+            if acc["name"] == name:
+                acc["domain"] = domain
+                acc["token"] = token
+                break
+        else:
+            self.accounts.append({"name": name, "domain": domain, "token": token})
+
+        self.refresh_shop_list()
+        self.save_to_settings()
+
+    def on_remove_shop(self):
+        index = self.shop_list.currentRow()
+        if 0 <= index < len(self.accounts):
+            del self.accounts[index]
+            self.refresh_shop_list()
+            self.save_to_settings()
+
+    def save_to_settings(self):
+        settings = QSettings("VISIQUE", "WebPConverter")
+        settings.setValue("shopify_accounts", json.dumps(self.accounts))
+
+    def make_section_label(self, text):
+        label = QLabel(text)
+        label.setStyleSheet("font-weight: bold; margin-top: 10px; margin-bottom: 4px; color: #FDCA40;")
+        return label
+    
+
+    def save_settings(self):
+        settings = QSettings("VISIQUE", "WebPConverter")
+
+        if self.chatgpt_token.text():
+            settings.setValue("chatgpt_token", self.chatgpt_token.text())
+        if self.shopify_token.text():
+            settings.setValue("shopify_token", self.shopify_token.text())
+        if self.ftp_pass.text():
+            settings.setValue("ftp_pass", self.ftp_pass.text())
+
+        settings.setValue("shopify_domain", self.shopify_domain.text())
+        settings.setValue("ftp_server", self.ftp_server.text())
+        settings.setValue("ftp_user", self.ftp_user.text())
+        settings.setValue("ftp_dir", self.ftp_dir.text())
+        settings.setValue("ftp_sessions", self.ftp_sessions.value())
+        settings.setValue("ftp_sync", "true" if self.ftp_sync.isChecked() else "false")
+        settings.setValue("ftp_delete", "true" if self.ftp_delete.isChecked() else "false")
+
+        QMessageBox.information(self, "Gespeichert", "Die Einstellungen wurden erfolgreich gespeichert.")
+        self.accept()
+
+class ConversionWorker(QThread):
+    """
+    Führt einen Batch als Pipeline aus (Prozesspool, optional Shopify-Upload-Threads) und
+    meldet Ergebnisse per Signal an die GUI. ALT-Texte werden über `alt_text_needed` im
+    GUI-Thread abgefragt; die Antwort landet in `alt_texts`.
+    """
+    file_done = pyqtSignal(dict)
+    upload_done = pyqtSignal(dict)
+    progress = pyqtSignal(int, int, float, float)  # erledigt, gesamt, Dateien/s, Restzeit in s
+    stats = pyqtSignal(dict)
+    status = pyqtSignal(str)
+    alt_text_needed = pyqtSignal(str)
+
+    def __init__(self, jobs, workers, cache=None, deadline_minutes=0, memory_limit=None, shop=None,
+                 alt_text_generator=None, pregenerate=False, parent=None):
+        super().__init__(parent)
+        self.jobs = jobs
+        self.workers = workers
+        self.cache = cache
+        self.deadline_minutes = deadline_minutes
+        self.memory_limit = memory_limit
+        self.shop = shop
+        self.alt_text_generator = alt_text_generator
+        # Nur, wenn auch hochgeladen wird und ein Generator (GPT-Token) da ist
+        self.pregenerate = pregenerate and shop is not None and alt_text_generator is not None
+        self.cancel_event = threading.Event()
+        self.alt_texts = {}
+        self.dialog_lock = threading.Lock()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def counted(self, jobs):
+        """Zählt die Aufträge, während der Scanner sie liefert; die Gesamtzahl ist erst am Ende bekannt."""
+        for job in jobs:
+            self.discovered += 1
+            yield job
+        self.scan_complete = True
+
+    def shopify_client(self):
+        from shopify import client_for
+        return client_for(self.shop["domain"], self.shop["token"])
+
+    def pregenerate_alt_text(self, image_path):
+        """Fordert den ALT-Text schon an, während das Bild noch auf den Upload wartet."""
+        try:
+            if self.shopify_client().known(image_path):
+                return  # wird nicht hochgeladen, also keine bezahlte Anfrage
+        except OSError:
+            return
+        self.alt_text_generator.submit(image_path)
+
+    def upload(self, results):
+        """Läuft in einem Upload-Thread der Pipeline; ein Stapel geht in einem Durchgang zu Shopify."""
+        client = self.shopify_client()
+        answers = []
+        for result in results:
+            image_path = result["output"]
+            if client.known(image_path):
+                answers.append(None)  # schon im Shop, upload_many meldet die vorhandene Datei
+                continue
+            if self.pregenerate:
+                self.pregenerate_alt_text(image_path)  # falls der Upload schneller war als run()
+            # Immer nur ein Dialog zur Zeit; der Aufruf blockiert, bis die GUI geantwortet hat
+            with self.dialog_lock:
+                if not self.is_cancelled():
+                    self.alt_text_needed.emit(image_path)
+                answers.append(self.alt_texts.pop(image_path, ""))
+            if answers[-1]:
+                try:
+                    self.alt_text_generator.remember(image_path, answers[-1])
+                except OSError:
+                    pass
+
+        items = [(result["output"], alt_text or "") for result, alt_text in zip(results, answers) if alt_text != ""]
+        uploaded = iter(client.upload_many(items) if items else [])
+        return [
+            next(uploaded) if alt_text != "" else
+            {"ok": False, "skipped": True, "message": f"Shopify Upload abgebrochen für {os.path.basename(result['output'])}."}
+            for result, alt_text in zip(results, answers)
+        ]
+
+    def run(self):
+        jobs = self.jobs
+        if self.deadline_minutes:
+            # Für die Schätzung müssen alle Dateiköpfe vorab gelesen werden
+            jobs = list(jobs)
+            profile, estimate = choose_profile_for_deadline(jobs, self.deadline_minutes, self.workers)
+            for job in jobs:
+                job["profile"] = profile
+            self.status.emit(f"Kodierprofil {profile} gewählt (geschätzt {estimate / 60:.1f} min).")
+
+        self.discovered = 0
+        self.scan_complete = False
+        start = time.perf_counter()
+        pipeline = Pipeline(
+            self.counted(jobs), self.upload if self.shop else None, self.workers,
+            self.cancel_event, self.cache, self.memory_limit,
+        )
+        done = 0
+        for stage, result in pipeline:
+            if stage == "uploaded":
+                self.upload_done.emit(result)
+            else:
+                done += 1
+                self.file_done.emit(result)
+                if self.pregenerate and result["ok"]:
+                    self.pregenerate_alt_text(result["output"])
+                elapsed = time.perf_counter() - start
+                rate = done / elapsed if elapsed > 0 else 0.0
+                total = self.discovered if self.scan_complete else 0  # 0 = Suche läuft noch
+                eta = (total - done) / rate if total and rate > 0 else 0.0
+                self.progress.emit(done, total, rate, eta)
+            if self.shop:
+                self.stats.emit(pipeline.stats())
+        self.pipeline_stats = pipeline.stats()
+
+class FtpUploadWorker(QThread):
+    """Lädt Dateien im Hintergrund über den FtpUploader hoch und meldet den Fortschritt."""
+    file_done = pyqtSignal(dict)
+    progress = pyqtSignal(int, int, float, float)  # fertige Dateien, alle Dateien, gesendete Bytes, alle Bytes
+
+    def __init__(self, uploader, files, sync=False, delete=False, parent=None):
+        super().__init__(parent)
+        self.uploader = uploader
+        self.files = files
+        self.sync = sync
+        self.delete = delete
+        self.cancel_event = threading.Event()
+        self.sent = {}
+        self.total_bytes = sum(os.path.getsize(path) for path in files)
+        self.done = 0
+        self.last_emit = 0.0
+        uploader.progress = self.on_bytes
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def on_bytes(self, name, sent, total):
+        self.sent[name] = sent
+        now = time.monotonic()
+        if now - self.last_emit > 0.1:  # Signalflut bei vielen kleinen Blöcken vermeiden
+            self.last_emit = now
+            self.progress.emit(self.done, len(self.files), sum(self.sent.values()), self.total_bytes)
+
+    def run(self):
+        if self.sync:
+            results = self.uploader.sync_all(self.files, self.delete, self.cancel_event)
+        else:
+            results = self.uploader.upload_all(self.files, self.cancel_event)
+        for result in results:
+            if not result.get("deleted"):
+                self.done += 1
+            if result.get("skipped"):
+                self.sent[result["name"]] = result["bytes"]
+            self.file_done.emit(result)
+            self.progress.emit(self.done, len(self.files), sum(self.sent.values()), self.total_bytes)
+
+class WatchWorker(QThread):
+    """Betreibt einen HotFolder im Hintergrund, bis stop() aufgerufen wird, und meldet jede Datei per Signal."""
+    file_done = pyqtSignal(dict)
+    upload_done = pyqtSignal(dict)
+    status = pyqtSignal(str)
+
+    def __init__(self, hotfolder, alt_text_generator=None, parent=None):
+        super().__init__(parent)
+        self.hotfolder = hotfolder
+        self.alt_text_generator = alt_text_generator
+        self.error = None
+
+    def stop(self):
+        self.hotfolder.stop()
+
+    def run(self):
+        try:
+            for stage, result in self.hotfolder:
+                if stage == "status":
+                    self.status.emit(result)
+                elif stage == "uploaded":
+                    self.upload_done.emit(result)
+                else:
+                    self.file_done.emit(result)
+        except Exception as e:
+            self.error = e
+        finally:
+            if self.alt_text_generator is not None:
+                self.alt_text_generator.close()
+
+class UpdateChecker(QObject):
+    """
+    Sucht in einem Daemon-Thread nach einer neuen Version, damit ein langsames oder fehlendes
+    Netz weder den Start noch das Beenden aufhält. Meldet einen Fund per Signal.
+    """
+    update_available = pyqtSignal(str, str)  # Download-URL, Version
+
+    def start(self):
+        threading.Thread(target=self.run, name="update-check", daemon=True).start()
+
+    def run(self):
+        from updater import check_for_update  # lädt requests
+        asset_url, latest_version = check_for_update(version)
+        if asset_url:
+            try:
+                self.update_available.emit(asset_url, latest_version)
+            except RuntimeError:
+                pass  # Fenster wurde inzwischen geschlossen
+
+def startup_report():
+    """Zeiten je Startschritt seit Programmbeginn bis die Ereignisschleife läuft (Fenster sichtbar)."""
+    STARTUP["event_loop"] = time.perf_counter()
+    stages = {}
+    previous = STARTUP["start"]
+    for name, timestamp in STARTUP.items():
+        if name != "start":
+            stages[name] = round(timestamp - previous, 3)
+            previous = timestamp
+    total = previous - STARTUP["start"]
+    return {"seconds": round(total, 3), "budget": STARTUP_BUDGET, "within_budget": total <= STARTUP_BUDGET, "stages": stages}
+
+class ImageConverter(QWidget):
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event):
+        files = [url.toLocalFile() for url in event.mimeData().urls()]
+        valid = [f for f in files if os.path.isdir(f) or sniff(f)]
+        if valid:
+            self.process_images(valid)
+
+    def __init__(self):
+        super().__init__()
+
+        font_regular_path = BASE_DIR / "Roboto-Regular.ttf"
+        font_semibold_path = BASE_DIR / "Roboto-SemiBold.ttf"
+        font_ids = []
+        for font_path in [font_regular_path, font_semibold_path]:
+            if font_path.exists():
+                font_id = QFontDatabase.addApplicationFont(str(font_path))
+                if font_id != -1:
+                    font_ids.append(font_id)
+        if font_ids:
+            family = QFontDatabase.applicationFontFamilies(font_ids[0])[0]
+            QApplication.instance().setFont(QFont(family, 10))
+
+        self.setAcceptDrops(True)
+        self.setWindowTitle(f"VISIQUE - Image 2 WebP Converter")
+        self.setFixedSize(775, 450)
+        self.move(QApplication.primaryScreen().availableGeometry().center() - self.rect().center())
+
+        palette = self.palette()
+        palette.setColor(self.backgroundRole(), Qt.GlobalColor.black)
+        self.setPalette(palette)
+        self.setAutoFillBackground(True)
+
+        self.background = QLabel(self)
+        self.background.setPixmap(QPixmap(resource_path("bg.jpg")))
+        self.background.setScaledContents(True)
+        self.background.setGeometry(self.rect())
+        self.background.lower()
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(100, 20, 100, 25)
+
+        menubar = QMenuBar(self)
+
+        # Menü "Einstellungen"
+        menu = menubar.addMenu("Einstellungen")
+        api_action = menu.addAction("Verbindungen")
+        api_action.triggered.connect(self.open_api_settings)
+        workers_action = menu.addAction("Parallele Prozesse")
+        workers_action.triggered.connect(self.open_worker_settings)
+        memory_action = menu.addAction("Speicherlimit")
+        memory_action.triggered.connect(self.open_memory_settings)
+        variants_action = menu.addAction("Größenvarianten")
+        variants_action.triggered.connect(self.open_variant_settings)
+        budget_action = menu.addAction("Maximale Dateigröße")
+        budget_action.triggered.connect(self.open_budget_settings)
+        profile_action = menu.addAction("Kodierprofil")
+        profile_action.triggered.connect(self.open_profile_settings)
+        alpha_action = menu.addAction("Transparenz")
+        alpha_action.triggered.connect(self.open_alpha_settings)
+        compression_action = menu.addAction("Kompression")
+        compression_action.triggered.connect(self.open_compression_settings)
+        menu.addSeparator()
+        self.incremental_action = menu.addAction("Unveränderte Bilder überspringen")
+        self.incremental_action.setCheckable(True)
+        self.incremental_action.setChecked(QSettings("VISIQUE", "WebPConverter").value("incremental", "false") == "true")
+        self.incremental_action.toggled.connect(
+            lambda checked: QSettings("VISIQUE", "WebPConverter").setValue("incremental", "true" if checked else "false")
+        )
+        clear_cache_action = menu.addAction("Konvertierungs-Cache aufräumen")
+        clear_cache_action.triggered.connect(self.clear_conversion_cache)
+        self.pregenerate_action = menu.addAction("ALT-Texte vorab mit KI erzeugen")
+        self.pregenerate_action.setCheckable(True)
+        self.pregenerate_action.setChecked(QSettings("VISIQUE", "WebPConverter").value("pregenerate_alt_text", "true") == "true")
+        self.pregenerate_action.toggled.connect(
+            lambda checked: QSettings("VISIQUE", "WebPConverter").setValue("pregenerate_alt_text", "true" if checked else "false")
+        )
+        alt_cache_action = menu.addAction("ALT-Text-Cache")
+        alt_cache_action.triggered.connect(self.open_alt_cache_settings)
+        shopify_index_action = menu.addAction("Shopify-Index neu aufbauen")
+        shopify_index_action.triggered.connect(self.rebuild_shopify_index)
+        menu.addSeparator()
+        self.report_action = menu.addAction("Laufbericht erstellen")
+        self.report_action.setCheckable(True)
+        self.report_action.setChecked(QSettings("VISIQUE", "WebPConverter").value("run_report", "false") == "true")
+        self.report_action.toggled.connect(
+            lambda checked: QSettings("VISIQUE", "WebPConverter").setValue("run_report", "true" if checked else "false")
+        )
+        menu.addSeparator()
+        self.watch_action = menu.addAction("Hotfolder überwachen")
+        self.watch_action.setCheckable(True)
+        self.watch_action.toggled.connect(self.toggle_watch)
+
+        # Hilfe-Menü mit Version
+        help_menu = menubar.addMenu("?")
+        help_menu.setStyleSheet("font-weight: bold;")
+        poweredby = help_menu.addAction("Powered by VISIQUE.de")
+        poweredby.triggered.connect(lambda: webbrowser.open("https://visique.de"))
+        version_action = help_menu.addAction(f"Version: {version}")
+        version_action.setEnabled(False)
+
+        layout.setMenuBar(menubar)
+
+        # Logo
+        logo_path = Path(resource_path("logo.png"))
+        if logo_path.exists():
+            pixmap = QPixmap(str(logo_path)).scaled(250, 63, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+            logo_label = QLabel()
+            logo_label.setPixmap(pixmap)
+            logo_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            logo_label.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+            layout.addWidget(logo_label)
+
+        title = QLabel("Image 2 WebP Converter")
+        title.setFont(QFont("Roboto", 18, QFont.Weight.Bold))
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        title.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        title.setStyleSheet("margin-bottom: 10px;")
+        layout.addWidget(title)
+
+        checkbox_layout = QHBoxLayout()
+        checkbox_layout.addStretch()
+        self.square_checkbox = QCheckBox("Produktbild (quadratisch, 2048x2048) erstellen")
+        self.square_checkbox.setStyleSheet("color: white; font-size: 14px; margin-bottom: 25px")
+        checkbox_layout.addWidget(self.square_checkbox)
+        checkbox_layout.addStretch()
+        layout.addLayout(checkbox_layout)
+
+       # Button-Layout horizontal
+        button_layout = QHBoxLayout()
+
+        # Buttons definieren
+        btn_folder = QPushButton("Ordner wählen")
+        btn_files = QPushButton("Bilder wählen")
+        buttons = [btn_folder, btn_files]
+
+        # Prüfe, ob FTP-Daten vorhanden sind → optionalen Button anhängen
+        settings = QSettings("VISIQUE", "WebPConverter")
+        if all(settings.value(key, "") for key in ["ftp_server", "ftp_user", "ftp_pass"]):
+            btn_ftp_upload = QPushButton("FTP Upload")
+            btn_ftp_upload.clicked.connect(self.handle_ftp_upload)
+            buttons.append(btn_ftp_upload)
+
+        # Styling und Verhalten für alle Buttons
+        for btn in buttons:
+            btn.setCursor(Qt.CursorShape.PointingHandCursor)
+            btn.setMinimumHeight(40)
+
+        # Aktionen verbinden
+        btn_folder.clicked.connect(self.select_folder)
+        btn_files.clicked.connect(self.select_files)
+
+        # Buttons ins Layout einfügen
+        button_layout.addStretch()
+        for i, btn in enumerate(buttons):
+            button_layout.addWidget(btn)
+            if i < len(buttons) - 1:
+                button_layout.addSpacing(20)
+        button_layout.addStretch()
+
+        layout.addLayout(button_layout)
+
+
+        self.drop_area = DropArea()
+        self.drop_area.files_dropped.connect(self.process_images)
+        layout.addWidget(self.drop_area)
+
+        # Fortschritt (nur während einer Konvertierung sichtbar)
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setFixedHeight(8)
+        self.progress_label = QLabel()
+        self.progress_label.setStyleSheet("color: white; font-size: 12px;")
+        self.cancel_btn = QPushButton("Abbrechen")
+        self.cancel_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.cancel_btn.clicked.connect(self.cancel_conversion)
+        progress_layout.addWidget(self.progress_bar, 1)
+        progress_layout.addWidget(self.progress_label)
+        progress_layout.addWidget(self.cancel_btn)
+        self.progress_widgets = [self.progress_bar, self.progress_label, self.cancel_btn]
+        for widget in self.progress_widgets:
+            widget.setVisible(False)
+        layout.addLayout(progress_layout)
+
+        self.worker = None
+        self.watch_worker = None
+        self.batch_report = None
+
+        # Toggle-Button
+        self.toggle_log_btn = QPushButton("Log anzeigen")
+        self.toggle_log_btn.setCheckable(True)
+        self.toggle_log_btn.setChecked(False)
+        self.toggle_log_btn.setStyleSheet("""
+            QPushButton {
+                margin-top: 10px;
+                border: none;
+                background: none;
+                color: #fff;
+                font-size: 12px;
+            }
+        """)
+        self.toggle_log_btn.clicked.connect(self.toggle_log_visibility)
+        layout.addWidget(self.toggle_log_btn)
+
+        # Log-Bereich (anfangs versteckt)
+        log_label = QLabel("Log Output:")
+        log_label.setFont(QFont("Roboto", 12, QFont.Weight.Bold))
+        log_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
+        log_label.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.log_label = log_label
+        layout.addWidget(log_label)
+        log_label.setVisible(False)
+
+        self.status_output = QPlainTextEdit()
+        self.status_output.setReadOnly(True)
+        self.status_output.setMaximumBlockCount(LOG_LINES)
+        self.status_output.setStyleSheet("background-color: #1e1e1e; color: white;")
+        layout.addWidget(self.status_output)
+        self.status_output.setVisible(False)
+
+        # Zeilen landen erst in einem Ringpuffer und werden per Timer gesammelt ins Fenster geschrieben
+        self.log_buffer = deque(maxlen=LOG_LINES)
+        self.log_dropped = 0
+        self.log_timer = QTimer(self)
+        self.log_timer.setSingleShot(True)
+        self.log_timer.setInterval(LOG_FLUSH_MS)
+        self.log_timer.timeout.connect(self.flush_log)
+        try:
+            self.file_log, self.file_log_listener = start_file_log()
+        except OSError as e:
+            self.file_log = self.file_log_listener = None
+            print(f"Protokolldatei nicht verfügbar: {e}", file=sys.stderr)
+
+        self.setLayout(layout)
+
+        self.print_connections()
+
+    def toggle_log_visibility(self):
+        is_visible = self.toggle_log_btn.isChecked()
+        self.status_output.setVisible(is_visible)
+        self.log_label.setVisible(is_visible)
+        self.toggle_log_btn.setText("Log verbergen" if is_visible else "Log anzeigen")
+
+        if self.toggle_log_btn.isChecked():
+            self.setFixedSize(775, 625)
+        else:
+            self.setFixedSize(775, 450)
+
+    def log(self, text, record=None):
+        """
+        Zeile für das Log-Fenster; blockiert nie. Mit `record` (siehe result_record) wird der
+        Eintrag im JSON-Lines-Protokoll um Datei, Status, Größen und Dauer ergänzt.
+        """
+        if len(self.log_buffer) == self.log_buffer.maxlen:
+            self.log_dropped += 1
+        self.log_buffer.append(text)
+        if not self.log_timer.isActive():
+            self.log_timer.start()
+        if self.file_log is not None:
+            self.file_log.info(text, extra={"data": record})
+
+    def flush_log(self):
+        lines = []
+        if self.log_dropped:
+            lines.append(f"... {self.log_dropped} Zeilen ausgelassen, vollständig in {default_log_path()}")
+            self.log_dropped = 0
+        while self.log_buffer:
+            lines.append(self.log_buffer.popleft())
+        if lines:
+            self.status_output.appendPlainText("\n".join(lines))
+
+    def select_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Ordner auswählen")
+        if folder:
+            self.process_images([folder])
+
+    def select_files(self):
+        files, _ = QFileDialog.getOpenFileNames(self, "Bilder auswählen", "",
+                                                "Image files (*.png *.jpg *.jpeg *.tif *.tiff *.bmp *.gif *.webp *.avif)")
+        if files:
+            self.process_images(files)
+
+    def handle_ftp_upload(self):
+        if self.worker is not None:
+            QMessageBox.warning(self, "Bitte warten", "Es läuft bereits eine Verarbeitung.")
+            return
+
+        # Bilddateien auswählen
+        files, _ = QFileDialog.getOpenFileNames(
+            self,
+            "Bilder für FTP-Upload auswählen",
+            "",
+            "Image files (*.webp)"
+        )
+        if not files:
+            return
+
+        # FTP-Zugangsdaten aus Einstellungen holen
+        settings = QSettings("VISIQUE", "WebPConverter")
+        sync = settings.value("ftp_sync", "false") == "true"
+        delete = sync and settings.value("ftp_delete", "false") == "true"
+        if delete:
+            answer = QMessageBox.question(
+                self,
+                "Dateien löschen?",
+                "Alle .webp-Dateien im FTP-Ordner, die nicht ausgewählt sind, werden vom Server gelöscht.\n\nFortfahren?"
+            )
+            if answer != QMessageBox.StandardButton.Yes:
+                return
+
+        from ftp_upload import FtpUploader
+
+        uploader = FtpUploader(
+            settings.value("ftp_server", ""),
+            settings.value("ftp_user", ""),
+            settings.value("ftp_pass", ""),
+            settings.value("ftp_dir", ""),
+            sessions=int(settings.value("ftp_sessions", 4)),
+        )
+
+        self.log(f"FTP-Upload von {len(files)} Dateien über {uploader.sessions} Verbindungen ...")
+        self.ftp_failed = []
+        self.ftp_counts = {"uploaded": 0, "skipped": 0, "deleted": 0}
+        self.batch_report = RunReport() if self.report_action.isChecked() else None
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setValue(0)
+        self.progress_label.setText(f"0/{len(files)}")
+        self.cancel_btn.setEnabled(True)
+        for widget in self.progress_widgets:
+            widget.setVisible(True)
+
+        self.worker = FtpUploadWorker(uploader, files, sync, delete, self)
+        self.worker.file_done.connect(self.on_ftp_file_done)
+        self.worker.progress.connect(self.on_ftp_progress)
+        self.worker.finished.connect(self.on_ftp_finished)
+        self.worker.start()
+
+    def on_ftp_file_done(self, result):
+        self.log(result["message"], result_record("ftp", result))
+        if self.batch_report is not None and result["path"]:
+            self.batch_report.add_upload("ftp", result["path"], result)
+        if not result["ok"]:
+            self.ftp_failed.append(result["name"])
+        elif result.get("deleted"):
+            self.ftp_counts["deleted"] += 1
+        elif result.get("skipped"):
+            self.ftp_counts["skipped"] += 1
+        else:
+            self.ftp_counts["uploaded"] += 1
+
+    def on_ftp_progress(self, done, total, sent_bytes, total_bytes):
+        self.progress_bar.setValue(int(sent_bytes * 1000 / total_bytes) if total_bytes else 0)
+        self.progress_label.setText(f"{done}/{total} · {sent_bytes / 1024 ** 2:.1f} von {total_bytes / 1024 ** 2:.1f} MB")
+
+    def on_ftp_finished(self):
+        cancelled = self.worker.is_cancelled()
+        self.worker = None
+        for widget in self.progress_widgets:
+            widget.setVisible(False)
+        self.finish_report()
+
+        if cancelled:
+            self.log("FTP-Upload abgebrochen.")
+            QMessageBox.information(self, "Abgebrochen", "Der FTP-Upload wurde abgebrochen.")
+        elif self.ftp_failed:
+            self.log(f"FTP-Upload abgeschlossen, {len(self.ftp_failed)} Dateien fehlgeschlagen.")
+            QMessageBox.critical(self, "Fehler", "Upload fehlgeschlagen für:\n" + "\n".join(self.ftp_failed[:20]))
+        else:
+            counts = self.ftp_counts
+            summary = f"{counts['uploaded']} hochgeladen, {counts['skipped']} unverändert, {counts['deleted']} gelöscht"
+            self.log(f"FTP-Upload abgeschlossen: {summary}.")
+            QMessageBox.information(self, "Fertig", f"Die Bilder wurden auf den FTP-Server hochgeladen.\n\n{summary}")
+
+    def ask_alt_text(self, image_path):
+        """Wird blockierend aus einem Upload-Thread aufgerufen, läuft aber im GUI-Thread."""
+        if self.worker is None or self.worker.is_cancelled():
+            return
+        dialog = AltTextDialog(image_path, self, self.worker.alt_text_generator)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.worker.alt_texts[image_path] = dialog.get_alt_text()
+
+    def process_images(self, file_paths):
+        if self.worker is not None:
+            QMessageBox.warning(self, "Bitte warten", "Es läuft bereits eine Konvertierung.")
+            return
+
+        output_folder = QFileDialog.getExistingDirectory(self, "Export Ordner wählen")
+        if not output_folder:
+            return
+
+        # Prüfen, ob Shopify-Daten vorhanden sind
+        settings = QSettings("VISIQUE", "WebPConverter")
+        accounts = json.loads(settings.value("shopify_accounts", "[]"))
+
+        upload_to_shopify = False
+
+        if accounts:
+            answer = QMessageBox.question(
+                self,
+                "Zu Shopify hochladen?",
+                "Sollen die konvertierten Bilder direkt zu Shopify hochgeladen werden?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            upload_to_shopify = (answer == QMessageBox.StandardButton.Yes)
+
+        if upload_to_shopify:
+            names = [a["name"] for a in accounts]
+            selected_name, ok = QInputDialog.getItem(self, "Shop auswählen", "Wähle einen Shopify-Shop:", names, editable=False)
+            if not ok:
+                return
+            selected_shop = next(acc for acc in accounts if acc["name"] == selected_name)
+
+        # ALT-Texte laufen im Hintergrund; ohne GPT-Token gibt es nur den Cache und keinen KI-Button
+        alt_text_generator = None
+        if upload_to_shopify:
+            from alttext import AltTextGenerator, AltTextCache, DEFAULT_THRESHOLD, DEFAULT_MAX_ENTRIES
+
+            alt_cache = AltTextCache(
+                threshold=int(settings.value("alt_cache_threshold", DEFAULT_THRESHOLD)),
+                max_entries=int(settings.value("alt_cache_size", DEFAULT_MAX_ENTRIES)),
+            )
+            alt_text_generator = AltTextGenerator(settings.value("chatgpt_token", ""), cache=alt_cache)
+
+        profile = settings.value("encode_profile", DEFAULT_PROFILE)
+        deadline_minutes = int(settings.value("deadline_minutes", 0)) if profile == "auto" else 0
+        # Ordner werden erst während der Konvertierung durchsucht, Unterordner gespiegelt
+        jobs = iter_jobs(file_paths, output_folder, **self.conversion_options())
+
+        self.batch_output_folder = output_folder
+        self.batch_converted = []
+        self.batch_uploaded = 0
+        self.batch_known = 0
+        self.batch_report = RunReport() if self.report_action.isChecked() else None
+
+        self.log("Starte Konvertierung ...")
+        self.progress_bar.setRange(0, 0)
+        self.progress_label.setText("Suche Bilder ...")
+        self.cancel_btn.setEnabled(True)
+        for widget in self.progress_widgets:
+            widget.setVisible(True)
+
+        cache = ConversionCache(output_folder) if self.incremental_action.isChecked() else None
+        self.worker = ConversionWorker(
+            jobs, self.worker_count(), cache, deadline_minutes, self.memory_limit(),
+            selected_shop if upload_to_shopify else None, alt_text_generator,
+            settings.value("pregenerate_alt_text", "true") == "true", self
+        )
+        self.worker.status.connect(self.log)
+        self.worker.file_done.connect(self.on_file_converted)
+        self.worker.upload_done.connect(self.on_file_uploaded)
+        self.worker.stats.connect(self.on_pipeline_stats)
+        self.worker.alt_text_needed.connect(self.ask_alt_text, Qt.ConnectionType.BlockingQueuedConnection)
+        self.worker.progress.connect(self.on_conversion_progress)
+        self.worker.finished.connect(self.on_batch_finished)
+        self.worker.start()
+
+    def on_file_converted(self, result):
+        self.log(result["message"], result_record("convert", result))
+        if self.batch_report is not None:
+            self.batch_report.add_conversion(result)
+        if result["ok"]:
+            self.batch_converted.append(result["output"])
+
+    def on_file_uploaded(self, result):
+        self.log(result["message"], result_record("shopify", result))
+        if self.batch_report is not None:
+            self.batch_report.add_upload("shopify", result["output"], result)
+        if result["ok"] and result.get("skipped"):
+            self.batch_known += 1
+        elif result["ok"]:
+            self.batch_uploaded += 1
+
+    def on_pipeline_stats(self, stats):
+        upload = stats["upload"]
+        self.progress_bar.setToolTip(
+            f"Konvertierung: {stats['convert']['queue']} in Arbeit, {stats['convert']['per_sec']:.2f}/s\n"
+            f"Upload: {upload['queue']}/{upload['queue_max']} wartend, {upload['done']} fertig, {upload['per_sec']:.2f}/s\n"
+            f"Konvertierung pausiert (Upload zu langsam): {stats['convert']['blocked_s']:.1f} s"
+        )
+
+    def on_conversion_progress(self, done, total, rate, eta):
+        if not total:
+            self.progress_bar.setRange(0, 0)
+            self.progress_label.setText(f"{done} · {rate:.1f} Dateien/s · Suche läuft ...")
+            return
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+        minutes, seconds = divmod(int(eta), 60)
+        self.progress_label.setText(f"{done}/{total} · {rate:.1f} Dateien/s · noch {minutes}:{seconds:02d}")
+
+    def on_batch_finished(self):
+        cancelled = self.worker.is_cancelled()
+        cache = self.worker.cache
+        shop = self.worker.shop
+        if self.worker.alt_text_generator is not None:
+            self.worker.alt_text_generator.close()
+        stats = getattr(self.worker, "pipeline_stats", None)
+        self.worker = None
+        if cache is not None:
+            self.log(f"Cache: {cache.hits} Treffer (übersprungen), {cache.misses} nicht im Cache.")
+        for widget in self.progress_widgets:
+            widget.setVisible(False)
+
+        if shop and stats:
+            self.log(
+                f"Shopify: {self.batch_uploaded} hochgeladen, {self.batch_known} bereits vorhanden "
+                f"({stats['upload']['per_sec']:.2f}/s), "
+                f"Konvertierung {stats['convert']['blocked_s']:.1f} s durch Upload gebremst."
+            )
+        self.finish_report()
+
+        if cancelled:
+            self.log(f"Konvertierung abgebrochen ({len(self.batch_converted)} Dateien fertig).")
+            QMessageBox.information(self, "Abgebrochen", "Die Konvertierung wurde abgebrochen.")
+        else:
+            QMessageBox.information(self, "Fertig", "Die Konvertierung ist abgeschlossen!")
+            webbrowser.open(f"file:///{self.batch_output_folder}")
+
+    def finish_report(self):
+        """Zeigt die Zusammenfassung des Laufberichts im Log und speichert ihn als JSON und CSV."""
+        report, self.batch_report = self.batch_report, None
+        if report is None or not report.files:
+            return
+        report.finish()
+        self.log(report.text())
+        try:
+            path = report.save(default_report_path())
+            report.save(os.path.splitext(path)[0] + ".csv")
+            self.log(f"Laufbericht gespeichert: {path} (und .csv)")
+        except OSError as e:
+            self.log(f"Laufbericht konnte nicht gespeichert werden: {e}")
+
+    def cancel_conversion(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.log("Konvertierung wird abgebrochen ...")
+
+    def toggle_watch(self, checked):
+        if checked and self.watch_worker is None:
+            if not self.start_watch():
+                self.watch_action.blockSignals(True)
+                self.watch_action.setChecked(False)
+                self.watch_action.blockSignals(False)
+        elif not checked and self.watch_worker is not None:
+            self.log("Hotfolder wird beendet ...")
+            self.watch_worker.stop()
+
+    def start_watch(self):
+        """Fragt Hotfolder, Exportordner und Ziel ab und startet die Überwachung; False bei Abbruch."""
+        settings = QSettings("VISIQUE", "WebPConverter")
+        source = QFileDialog.getExistingDirectory(self, "Hotfolder wählen", settings.value("watch_source", ""))
+        if not source:
+            return False
+        output_folder = QFileDialog.getExistingDirectory(self, "Export Ordner wählen", settings.value("watch_output", ""))
+        if not output_folder:
+            return False
+
+        # Unbeaufsichtigt gibt es keinen ALT-Text-Dialog: Shopify bekommt Texte aus Cache bzw. KI
+        targets = {"Nur konvertieren": None}
+        if all(settings.value(key, "") for key in ["ftp_server", "ftp_user", "ftp_pass"]):
+            targets["FTP"] = "ftp"
+        for account in json.loads(settings.value("shopify_accounts", "[]")):
+            targets[f"Shopify: {account['name']}"] = account
+        target = None
+        if len(targets) > 1:
+            label, ok = QInputDialog.getItem(self, "Hotfolder", "Fertige Bilder weitergeben an:", list(targets), editable=False)
+            if not ok:
+                return False
+            target = targets[label]
+
+        from watch import HotFolder, ftp_forwarder, shopify_forwarder
+
+        upload = idle = None
+        alt_text_generator = None
+        if target == "ftp":
+            from ftp_upload import FtpUploader
+
+            uploader = FtpUploader(
+                settings.value("ftp_server", ""), settings.value("ftp_user", ""),
+                settings.value("ftp_pass", ""), settings.value("ftp_dir", ""),
+                sessions=int(settings.value("ftp_sessions", 4)),
+            )
+            upload, idle = ftp_forwarder(uploader, output_folder)
+        elif target is not None:
+            from alttext import AltTextGenerator, AltTextCache, DEFAULT_THRESHOLD, DEFAULT_MAX_ENTRIES
+            from shopify import client_for
+
+            alt_text_generator = AltTextGenerator(settings.value("chatgpt_token", ""), cache=AltTextCache(
+                threshold=int(settings.value("alt_cache_threshold", DEFAULT_THRESHOLD)),
+                max_entries=int(settings.value("alt_cache_size", DEFAULT_MAX_ENTRIES)),
+            ))
+            upload = shopify_forwarder(client_for(target["domain"], target["token"]), alt_text_generator)
+            idle = alt_text_generator.cache.save  # neue ALT-Texte nach jedem Stapel sichern
+
+        settings.setValue("watch_source", source)
+        settings.setValue("watch_output", output_folder)
+        hotfolder = HotFolder([source], output_folder, self.conversion_options(), upload,
+                              self.worker_count(), self.memory_limit(), idle=idle)
+        self.watch_worker = WatchWorker(hotfolder, alt_text_generator, self)
+        self.watch_worker.status.connect(self.log)
+        self.watch_worker.file_done.connect(lambda result: self.log(result["message"], result_record("convert", result)))
+        self.watch_worker.upload_done.connect(
+            lambda result: self.log(result["message"], result_record("ftp" if target == "ftp" else "shopify", result))
+        )
+        self.watch_worker.finished.connect(self.on_watch_finished)
+        self.watch_worker.start()
+        return True
+
+    def on_watch_finished(self):
+        error = self.watch_worker.error
+        self.watch_worker = None
+        self.watch_action.blockSignals(True)
+        self.watch_action.setChecked(False)
+        self.watch_action.blockSignals(False)
+        if error is not None:
+            self.log(f"Hotfolder beendet wegen eines Fehlers: {error}")
+            QMessageBox.critical(self, "Fehler", f"Die Überwachung wurde beendet:\n{error}")
+        else:
+            self.log("Hotfolder beendet.")
+
+    def closeEvent(self, event):
+        if self.watch_worker is not None:
+            self.watch_worker.stop()
+            self.watch_worker.wait()
+        if self.worker is not None:
+            self.worker.cancel()
+            # Upload-Threads warten evtl. auf einen ALT-Text-Dialog, daher Ereignisse weiter verarbeiten
+            while not self.worker.wait(100):
+                QApplication.processEvents()
+        if self.file_log_listener is not None:
+            self.file_log_listener.stop()
+            self.file_log_listener = None
+        super().closeEvent(event)
+
+    def clear_conversion_cache(self):
+        folder = QFileDialog.getExistingDirectory(self, "Exportordner mit Cache wählen")
+        if not folder:
+            return
+        cache = ConversionCache(folder)
+        answer = QMessageBox.question(
+            self,
+            "Cache aufräumen",
+            f"{len(cache.entries)} Einträge gefunden.\n\nAlle Einträge löschen? "
+            "(Bei \"Nein\" werden nur Einträge mit fehlenden oder geänderten Dateien entfernt.)",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel
+        )
+        if answer == QMessageBox.StandardButton.Cancel:
+            return
+        if answer == QMessageBox.StandardButton.Yes:
+            removed = len(cache.entries)
+            cache.clear()
+        else:
+            removed = cache.prune()
+        cache.save()
+        self.log(f"Cache aufgeräumt: {removed} Einträge entfernt.")
+
+    def rebuild_shopify_index(self):
+        accounts = json.loads(QSettings("VISIQUE", "WebPConverter").value("shopify_accounts", "[]"))
+        if not accounts:
+            QMessageBox.information(self, "Kein Shop", "Es ist noch kein Shopify-Shop hinterlegt.")
+            return
+        names = [a["name"] for a in accounts]
+        selected_name, ok = QInputDialog.getItem(self, "Shop auswählen", "Index neu aufbauen für:", names, editable=False)
+        if not ok:
+            return
+        shop = next(acc for acc in accounts if acc["name"] == selected_name)
+
+        from shopify import client_for
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            files, removed = client_for(shop["domain"], shop["token"]).rebuild_index()
+            self.log(f"Shopify-Index für {selected_name}: {files} Dateien im Shop, {removed} veraltete Einträge entfernt.")
+        except Exception as e:
+            self.log(f"Fehler beim Aufbau des Shopify-Index: {e}")
+        finally:
+            QApplication.restoreOverrideCursor()
+
+    def worker_count(self):
+        settings = QSettings("VISIQUE", "WebPConverter")
+        return int(settings.value("workers", default_workers()))
+
+    def conversion_options(self):
+        """Argumente für convert_image aus Hauptfenster und Einstellungen (ohne Quell- und Zielpfad)."""
+        settings = QSettings("VISIQUE", "WebPConverter")
+        profile = settings.value("encode_profile", DEFAULT_PROFILE)
+        return {
+            "max_size": 2048,
+            "square": self.square_checkbox.isChecked(),
+            "variants": self.variant_setting(),
+            "max_bytes": int(settings.value("max_kb", 0)) * 1024 or None,
+            "profile": profile if profile in ENCODE_PROFILES else DEFAULT_PROFILE,
+            **self.output_setting(),
+        }
+
+    def variant_setting(self):
+        spec = QSettings("VISIQUE", "WebPConverter").value("variant_set", "")
+        if not spec:
+            return None
+        try:
+            return parse_variants(spec)
+        except ValueError as e:
+            self.log(f"Größenvarianten ignoriert: {e}")
+            return None
+
+    def open_variant_settings(self):
+        settings = QSettings("VISIQUE", "WebPConverter")
+        single = "Keine (nur 2048 px)"
+        current = settings.value("variant_set", "") or single
+        choices = [single] + list(VARIANT_SETS)
+        if current not in choices:
+            choices.append(current)
+
+        choice, ok = QInputDialog.getItem(
+            self, "Größenvarianten",
+            "Variantensatz wählen oder eigene Liste eingeben (z. B. 2048,1024:75,640):",
+            choices, choices.index(current), editable=True
+        )
+        if not ok:
+            return
+
+        spec = "" if choice == single else choice.strip()
+        if spec:
+            try:
+                parse_variants(spec)
+            except ValueError as e:
+                QMessageBox.warning(self, "Fehler", str(e))
+                return
+        settings.setValue("variant_set", spec)
+
+    def open_budget_settings(self):
+        settings = QSettings("VISIQUE", "WebPConverter")
+        max_kb, ok = QInputDialog.getInt(
+            self, "Maximale Dateigröße", "Höchstens so viele KB pro Bild (0 = feste Qualität 80):",
+            int(settings.value("max_kb", 0)), 0, 100000
+        )
+        if ok:
+            settings.setValue("max_kb", max_kb)
+
+    def open_profile_settings(self):
+        settings = QSettings("VISIQUE", "WebPConverter")
+        auto = "auto (Zeitvorgabe)"
+        choices = list(ENCODE_PROFILES) + [auto]
+        current = settings.value("encode_profile", DEFAULT_PROFILE)
+        current = auto if current == "auto" else current
+
+        choice, ok = QInputDialog.getItem(
+            self, "Kodierprofil", "fast = schnelle Vorschau, smallest = kleinste Dateien:",
+            choices, choices.index(current) if current in choices else 0, editable=False
+        )
+        if not ok:
+            return
+
+        if choice == auto:
+            minutes, ok = QInputDialog.getInt(
+                self, "Zeitvorgabe", "Batch fertig innerhalb von Minuten:",
+                int(settings.value("deadline_minutes", 10)), 1, 10000
+            )
+            if not ok:
+                return
+            settings.setValue("deadline_minutes", minutes)
+            choice = "auto"
+        settings.setValue("encode_profile", choice)
+
+    def output_setting(self):
+        """Transparenz, Hintergrundfarbe und Kompression aus den Einstellungen als Argumente für convert_image."""
+        settings = QSettings("VISIQUE", "WebPConverter")
+        try:
+            background = parse_background(settings.value("alpha_background", "#ffffff"))
+        except ValueError:
+            background = (255, 255, 255)
+        return output_options(
+            settings.value("alpha_policy", DEFAULT_ALPHA), background,
+            settings.value("compression", DEFAULT_COMPRESSION),
+        )
+
+    def open_alpha_settings(self):
+        settings = QSettings("VISIQUE", "WebPConverter")
+        choices = {
+            "flatten": "Auf Hintergrundfarbe legen",
+            "keep": "Transparenz immer behalten",
+            "auto": "Automatisch (nur echte Transparenz behalten)",
+        }
+        current = settings.value("alpha_policy", DEFAULT_ALPHA)
+        labels = list(choices.values())
+        choice, ok = QInputDialog.getItem(
+            self, "Transparenz", "Umgang mit transparenten Bildern:",
+            labels, list(choices).index(current) if current in choices else 0, editable=False
+        )
+        if not ok:
+            return
+        settings.setValue("alpha_policy", next(policy for policy, label in choices.items() if label == choice))
+
+        color = QColorDialog.getColor(
+            QColor(settings.value("alpha_background", "#ffffff")), self,
+            "Hintergrundfarbe (Transparenz und Rand quadratischer Bilder)"
+        )
+        if color.isValid():
+            settings.setValue("alpha_background", color.name())
+
+    def open_compression_settings(self):
+        settings = QSettings("VISIQUE", "WebPConverter")
+        choices = {
+            "lossy": "Verlustbehaftet (Fotos)",
+            "lossless": "Verlustfrei",
+            "auto": "Automatisch (Grafiken und Logos verlustfrei, Fotos verlustbehaftet)",
+        }
+        current = settings.value("compression", DEFAULT_COMPRESSION)
+        labels = list(choices.values())
+        choice, ok = QInputDialog.getItem(
+            self, "Kompression", "Kodierung der WebP-Dateien:",
+            labels, list(choices).index(current) if current in choices else 0, editable=False
+        )
+        if ok:
+            settings.setValue("compression", next(mode for mode, label in choices.items() if label == choice))
+
+    def open_alt_cache_settings(self):
+        from alttext import DEFAULT_THRESHOLD, DEFAULT_MAX_ENTRIES
+
+        settings = QSettings("VISIQUE", "WebPConverter")
+        threshold, ok = QInputDialog.getInt(
+            self, "ALT-Text-Cache",
+            "Ähnlichkeitsschwelle: so viele von 64 Bits des Bild-Hashs dürfen abweichen\n"
+            "(0 = nur identische Bilder, höher = auch andere Ausschnitte; die Farbe muss immer passen):",
+            int(settings.value("alt_cache_threshold", DEFAULT_THRESHOLD)), 0, 20
+        )
+        if not ok:
+            return
+        size, ok = QInputDialog.getInt(
+            self, "ALT-Text-Cache", "Höchstens so viele Einträge speichern (älteste werden verdrängt):",
+            int(settings.value("alt_cache_size", DEFAULT_MAX_ENTRIES)), 10, 1000000
+        )
+        if not ok:
+            return
+        settings.setValue("alt_cache_threshold", threshold)
+        settings.setValue("alt_cache_size", size)
+
+    def memory_limit(self):
+        settings = QSettings("VISIQUE", "WebPConverter")
+        limit_mb = int(settings.value("memory_limit_mb", 0))
+        return limit_mb * 1024 ** 2 if limit_mb else default_memory_limit()
+
+    def open_memory_settings(self):
+        limit_mb, ok = QInputDialog.getInt(
+            self, "Speicherlimit",
+            "Höchstens so viel Arbeitsspeicher (MB) für alle gleichzeitigen Konvertierungen.\n"
+            "Größere Bilder werden einzeln verarbeitet:",
+            self.memory_limit() // 1024 ** 2, 256, 1024 * 1024
+        )
+        if ok:
+            QSettings("VISIQUE", "WebPConverter").setValue("memory_limit_mb", limit_mb)
+
+    def open_worker_settings(self):
+        count, ok = QInputDialog.getInt(
+            self, "Parallele Prozesse", "Anzahl gleichzeitiger Konvertierungen:",
+            self.worker_count(), 1, 64
+        )
+        if ok:
+            QSettings("VISIQUE", "WebPConverter").setValue("workers", count)
+
+
+    def open_api_settings(self):
+        dialog = ApiSettingsDialog(self)
+        dialog.exec()
+
+    def start_update_check(self):
+        settings = QSettings("VISIQUE", "WebPConverter")
+        if time.time() - float(settings.value("last_update_check", 0)) < UPDATE_CHECK_INTERVAL:
+            return
+        settings.setValue("last_update_check", time.time())
+        self.update_checker = UpdateChecker(self)
+        self.update_checker.update_available.connect(self.on_update_available)
+        self.update_checker.start()
+
+    def on_update_available(self, asset_url, latest_version):
+        msg = f"Version {latest_version} ist verfügbar.\n\nDie neuste Version wird im Downloads Verzeichnis gespeichert."
+        QMessageBox.information(
+            self,
+            "Neue Version verfügbar",
+            msg,
+            QMessageBox.StandardButton.Ok
+        )
+        # Optional: Direkt im Browser öffnen
+        webbrowser.open(asset_url)
+
+    def on_started(self):
+        """Läuft im ersten Durchlauf der Ereignisschleife, also sobald das Fenster sichtbar ist."""
+        report = startup_report()
+        stages = ", ".join(f"{name} {seconds:.2f} s" for name, seconds in report["stages"].items())
+        self.log(f"Start in {report['seconds']:.2f} s ({stages})")
+        if "--startup-report" in sys.argv:
+            print(json.dumps(report, indent=2))
+            QApplication.exit(0 if report["within_budget"] else 1)
+            return
+        if not report["within_budget"]:
+            print(f"[Start] {report['seconds']:.2f} s bis zum Fenster, Budget {STARTUP_BUDGET:.2f} s ({stages})", file=sys.stderr)
+        self.start_update_check()
+
+    def print_connections(self):
+        settings = QSettings("VISIQUE", "WebPConverter")
+        ftp_server = settings.value("ftp_server", "")
+        self.log(f"Gespeicherter FTP Server: {ftp_server}")
+
+class DropArea(QLabel):
+    files_dropped = pyqtSignal(list)
+
+    def __init__(self):
+        super().__init__("Dateien hierher ziehen und ablegen")
+        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.set_default_style()
+        self.setAcceptDrops(True)
+
+    def set_default_style(self):
+        self.setStyleSheet("""
+            QLabel {
+                border: 2px dashed #FDCA40;
+                color: #FDCA40;
+                font-size: 14px;
+                margin-top: 25px;
+                padding: 30px;
+                border-radius: 10px;
+                background-color: transparent;
+            }
+        """)
+
+    def set_highlight_style(self):
+        self.setStyleSheet("""
+            QLabel {
+                border: 2px dashed #FFFFFF;
+                color: #FFFFFF;
+                font-size: 14px;
+                padding: 30px;
+                border-radius: 10px;
+                background-color: rgba(253, 202, 64, 0.2);
+            }
+        """)
+
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+            self.set_highlight_style()  # Visuellen Effekt aktivieren
+
+    def dragLeaveEvent(self, event):
+        self.set_default_style()  # Effekt zurücksetzen
+
+    def dropEvent(self, event):
+        self.set_default_style()  # Effekt zurücksetzen
+        paths = [url.toLocalFile() for url in event.mimeData().urls()]
+        valid_files = [f for f in paths if os.path.isdir(f) or sniff(f)]  # Ordner werden rekursiv durchsucht
+        if valid_files:
+            self.files_dropped.emit(valid_files)
+
+class ClickableLabel(QLabel):
+    def __init__(self, url, parent=None):
+        super().__init__(parent)
+        self.url = url
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            webbrowser.open(self.url)
+
+class AltTextDialog(QDialog):
+    def __init__(self, image_path, parent=None, generator=None):
+        super().__init__(parent)
+        self.setWindowTitle("ALT-Text eingeben")
+        self.image_path = image_path
+        self.generator = generator
+        self.future = None
+
+        layout = QVBoxLayout()
+
+        # Bildvorschau
+        pixmap = QPixmap(image_path).scaled(600, 600, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        image_label = QLabel()
+        image_label.setPixmap(pixmap)
+        image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(image_label)
+
+        # Textfeld
+        self.text_input = QLineEdit()
+        self.text_input.setPlaceholderText("ALT-Text eingeben")
+        layout.addWidget(self.text_input)
+
+        self.status = QLabel()
+        self.status.hide()
+        layout.addWidget(self.status)
+
+        # Buttons horizontal
+        btn_layout = QHBoxLayout()
+
+        # Generieren-Button – immer erstellen, aber ggf. ausblenden
+        self.generate_btn = QPushButton("Mit KI generieren")
+        self.generate_btn.clicked.connect(self.generate_alt_text)
+
+        # Ohne GPT-Token Button verstecken
+        if generator is not None and generator.api_key:
+            btn_layout.addWidget(self.generate_btn)
+        else:
+            self.generate_btn.hide()
+
+        # Hochladen-Button
+        btn_upload = QPushButton("Hochladen")
+        btn_upload.clicked.connect(self.validate_and_accept)
+        btn_layout.addWidget(btn_upload)
+
+        layout.addLayout(btn_layout)
+
+        self.setLayout(layout)
+
+        # Auf den Text warten, ohne die Oberfläche zu blockieren
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(200)
+        self.poll_timer.timeout.connect(self.check_generated)
+
+        # Vorab erzeugter Text (siehe AltTextGenerator) wird direkt übernommen
+        if generator is not None and generator.pending(image_path):
+            self.wait_for(generator.submit(image_path), overwrite=False)
+
+    def get_alt_text(self):
+        return self.text_input.text().strip()
+    
+    def validate_and_accept(self):
+      alt_text = self.text_input.text().strip()
+      if len(alt_text) < 5:
+          QMessageBox.warning(self, "Ungültiger ALT-Text", "Bitte gib einen ALT-Text mit mindestens 5 Zeichen ein.")
+          return
+      self.accept()
+
+    def generate_alt_text(self):
+        self.wait_for(self.generator.submit(self.image_path, refresh=self.future is not None), overwrite=True)
+
+    def wait_for(self, future, overwrite):
+        self.future = future
+        self.overwrite = overwrite
+        self.generate_btn.setEnabled(False)
+        self.status.setText("ALT-Text wird generiert ...")
+        self.status.show()
+        self.check_generated()
+        if not future.done():
+            self.poll_timer.start()
+
+    def check_generated(self):
+        if not self.future.done():
+            return
+        self.poll_timer.stop()
+        self.generate_btn.setEnabled(True)
+        try:
+            alt_text = self.future.result()
+        except Exception as e:
+            self.status.setText(f"Fehler bei der KI-Generierung: {e}")
+            return
+        if alt_text is None:
+            self.status.hide()
+            return
+        if alt_text["source"] == "cache":
+            self.status.setText("ALT-Text aus dem Cache übernommen (ähnliches Bild)")
+        else:
+            self.status.setText("ALT-Text von der KI generiert")
+        # Eigene Eingaben nicht mit dem Vorschlag überschreiben, außer der Button wurde gedrückt
+        if self.overwrite or not self.text_input.text().strip():
+            self.text_input.setText(alt_text["text"])
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    app = QApplication(sys.argv)
+    STARTUP["qapplication"] = time.perf_counter()
+
+    app.setStyleSheet("""
+        QMenuBar {
+            background-color: #141414;
+            color: white;
+            font-size: 13px;
+        }
+        QMenuBar::item {
+            background: transparent;
+            padding: 4px 12px;
+        }
+        QMenuBar::item:selected {
+            background-color: #FDCA40;
+            color: black;
+        }
+        QMenu {
+            background-color: #1e1e1e;
+            color: white;
+            border: 1px solid #FDCA40;
+        }
+        QMenu::item {
+            padding: 6px 20px;
+        }
+        QMenu::item:selected {
+            background-color: #FDCA40;
+            color: black;
+        }
+        QPushButton {
+            background-color: #FDCA40;
+            color: black;
+            font-size: 14px;
+            padding: 0 20px;
+            border-radius: 5px;
+            height: 40px;
+            min-height: 40px;
+            width: 100%;
+        }
+        QPushButton:hover {
+            background-color: #e6b800;
+        }
+        QCheckBox {            
+            color: white;
+            spacing: 8px;
+        }
+        QCheckBox::indicator {
+            border-radius: 5px;
+            width: 18px;
+            height: 18px;
+        }
+        QCheckBox::indicator:unchecked {
+            border: 2px solid #FDCA40;
+            background-color: transparent;
+        }
+        QCheckBox::indicator:checked {
+            background-color: #FDCA40;
+            border: 2px solid #FDCA40;
+        }
+        QLineEdit {
+            min-width: 350px;
+            font-size: 14px;
+            padding: 5px;
+            margin: 2px 0;
+        }
+        QProgressBar {
+            border: none;
+            background-color: #1e1e1e;
+            border-radius: 4px;
+        }
+        QProgressBar::chunk {
+            background-color: #FDCA40;
+            border-radius: 4px;
+        }
+        QListWidget{
+            min-width: 350px;
+            font-size: 14px;
+            padding: 5px;
+            margin: 2px 0;  
+        }
+    """)
+
+    icon_path = None
+    if sys.platform == "darwin":
+        icon_path = Path(resource_path("icon.icns"))
+    elif sys.platform.startswith("win"):
+        icon_path = Path(resource_path("icon.ico"))
+
+    if icon_path and icon_path.exists():
+        app.setWindowIcon(QIcon(str(icon_path)))
+
+    STARTUP["style"] = time.perf_counter()
+
+    window = ImageConverter()
+    STARTUP["window"] = time.perf_counter()
+    window.show()
+    STARTUP["show"] = time.perf_counter()
+    # Update-Prüfung erst, wenn das Fenster steht
+    QTimer.singleShot(0, window.on_started)
+    sys.exit(app.exec())
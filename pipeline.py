@@ -0,0 +1,176 @@
+import os
+import queue
+import threading
+import time
+
+from batch import run_batch
+
+UPLOAD_WORKERS = 2
+# Höchstens so viele fertige Dateien warten auf den Upload, danach pausiert die Konvertierung
+UPLOAD_QUEUE_SIZE = 32
+# Höchstens so viele wartende Dateien gehen in einen upload()-Aufruf
+UPLOAD_BATCH = 16
+
+_STOP = object()
+
+
+class StageStats:
+    """Zähler einer Pipeline-Stufe; wird aus mehreren Threads fortgeschrieben."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.done = 0
+        self.failed = 0
+        self.busy = 0.0     # Summe der Bearbeitungszeiten
+        self.blocked = 0.0  # Wartezeit, weil die nächste Stufe nicht hinterherkam
+
+    def record(self, ok, seconds):
+        with self.lock:
+            self.done += 1
+            self.failed += not ok
+            self.busy += seconds
+
+    def snapshot(self, depth, capacity):
+        elapsed = time.perf_counter() - self.started
+        with self.lock:
+            return {
+                "done": self.done,
+                "failed": self.failed,
+                "per_sec": self.done / elapsed if elapsed > 0 else 0.0,
+                "busy_s": round(self.busy, 2),
+                "blocked_s": round(self.blocked, 2),
+                "queue": depth,
+                "queue_max": capacity,
+            }
+
+
+class Pipeline:
+    """
+    Konvertierung und Upload als zweistufige Pipeline: run_batch konvertiert im Prozesspool,
+    fertige Dateien wandern über eine begrenzte Warteschlange zu `upload_workers` Threads.
+    Kodierung und Netzwerk laufen so gleichzeitig. Ist die Warteschlange voll, holt die
+    Konvertierung keine neuen Aufträge mehr (Backpressure), bis wieder Platz ist.
+
+    `upload(results)` bekommt eine Liste von Konvertierungsergebnissen – alles, was sich bis
+    zu `upload_batch` Stück in der Warteschlange angestaut hat – und liefert je Eintrag ein
+    Ergebnis-Dict mit "ok" und "message" in derselben Reihenfolge. Beim Iterieren entstehen Paare ("converted", Ergebnis) und
+    ("uploaded", Ergebnis) in der Reihenfolge, in der sie fertig werden.
+    """
+
+    def __init__(self, jobs, upload=None, workers=None, cancel_event=None, cache=None, memory_limit=None,
+                 upload_workers=UPLOAD_WORKERS, queue_size=UPLOAD_QUEUE_SIZE, upload_batch=UPLOAD_BATCH):
+        self.jobs = jobs
+        self.upload = upload
+        self.workers = workers
+        self.cancel_event = cancel_event or threading.Event()
+        self.cache = cache
+        self.memory_limit = memory_limit
+        self.upload_workers = upload_workers if upload else 0
+        self.upload_batch = upload_batch
+        self.uploads = queue.Queue(maxsize=queue_size)
+        self.events = queue.Queue()
+        self.convert_stats = StageStats()
+        self.upload_stats = StageStats()
+        self.pulled = 0
+        self.error = None
+
+    def stats(self):
+        """Momentaufnahme je Stufe: Erledigt, Durchsatz, Warteschlangentiefe, Wartezeiten."""
+        return {
+            "convert": self.convert_stats.snapshot(self.pulled - self.convert_stats.done, (self.workers or os.cpu_count() or 1) * 2),
+            "upload": self.upload_stats.snapshot(self.uploads.qsize(), self.uploads.maxsize),
+        }
+
+    def _counted(self):
+        for job in self.jobs:
+            self.pulled += 1
+            yield job
+
+    def _enqueue(self, item):
+        """Blockiert, solange die Upload-Warteschlange voll ist; False bei Abbruch."""
+        start = time.perf_counter()
+        try:
+            while not self.cancel_event.is_set():
+                try:
+                    self.uploads.put(item, timeout=0.2)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            self.convert_stats.blocked += time.perf_counter() - start
+
+    def _convert(self):
+        try:
+            batch = run_batch(self._counted(), self.workers, self.cancel_event, self.cache, self.memory_limit)
+            for result in batch:
+                self.convert_stats.record(result["ok"], result.get("seconds", 0.0))
+                self.events.put(("converted", result))
+                if self.upload and result["ok"] and not self._enqueue(result):
+                    batch.close()
+                    break
+        except Exception as e:
+            self.error = e
+        finally:
+            for _ in range(self.upload_workers):
+                self.uploads.put(_STOP)
+
+    def _upload_loop(self):
+        stopped = False
+        while not stopped:
+            items = [self.uploads.get()]
+            # Was sich inzwischen angestaut hat, im selben Aufruf mitnehmen
+            while len(items) < self.upload_batch and items[-1] is not _STOP:
+                try:
+                    items.append(self.uploads.get_nowait())
+                except queue.Empty:
+                    break
+            if items[-1] is _STOP:
+                stopped = True
+                items.pop()
+            if not items:
+                continue
+
+            if self.cancel_event.is_set():
+                for item in items:
+                    self.events.put(("uploaded", {"output": item["output"], "ok": False, "cancelled": True,
+                                                  "message": f"Upload abgebrochen: {os.path.basename(item['output'])}"}))
+                continue
+
+            start = time.perf_counter()
+            try:
+                results = self.upload(items)
+            except Exception as e:
+                results = [{"ok": False, "message": f"Fehler beim Upload von {os.path.basename(item['output'])}: {e}"}
+                           for item in items]
+            seconds = (time.perf_counter() - start) / len(items)
+            for item, result in zip(items, results):
+                result.setdefault("output", item["output"])
+                result.setdefault("seconds", seconds)
+                self.upload_stats.record(result["ok"], seconds)
+                self.events.put(("uploaded", result))
+
+    def __iter__(self):
+        threads = [threading.Thread(target=self._convert, name="pipeline-convert", daemon=True)]
+        threads += [
+            threading.Thread(target=self._upload_loop, name=f"pipeline-upload-{i}", daemon=True)
+            for i in range(self.upload_workers)
+        ]
+        for thread in threads:
+            thread.start()
+        finished = False
+        try:
+            while any(thread.is_alive() for thread in threads) or not self.events.empty():
+                try:
+                    yield self.events.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+            finished = True
+        finally:
+            if not finished:
+                self.cancel_event.set()  # Aufrufer hat vorzeitig aufgehört
+            for thread in threads:
+                thread.join()
+        if self.error is not None:
+            raise self.error
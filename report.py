@@ -0,0 +1,148 @@
+"""
+Laufbericht: Dauer und Bytes jedes Verarbeitungsschritts pro Datei, zusammengefasst mit
+Summen, Perzentilen und den langsamsten Dateien. Gespeichert als JSON oder CSV.
+
+Die Zeiten misst convert_image ohnehin (StageClock); der Bericht sammelt nur die fertigen
+Ergebnis-Dicts ein. Wer keinen RunReport anlegt, zahlt also nichts dafür.
+"""
+import csv
+import os
+import time
+from datetime import datetime
+
+from storage import data_dir, save_json
+
+# Reihenfolge der Schritte in Bericht und CSV
+STAGES = ("decode", "resize", "flatten", "encode", "write", "shopify", "ftp")
+PERCENTILES = (50, 90, 99)
+SLOWEST = 10
+
+
+def percentile(values, p):
+    """Perzentil nach dem Nearest-Rank-Verfahren; `values` muss sortiert sein."""
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * p // 100))
+    return values[rank - 1]
+
+def default_report_path(extension=".json"):
+    """Pfad für einen neuen Bericht im Datenordner der App, z. B. reports/run-20250101-120000.json."""
+    folder = os.path.join(data_dir(), "reports")
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, datetime.now().strftime("run-%Y%m%d-%H%M%S") + extension)
+
+
+class RunReport:
+    """Sammelt die Ergebnisse eines Batches; Einträge werden über die Quelldatei zugeordnet."""
+
+    def __init__(self):
+        self.files = {}
+        self.by_output = {}  # WebP-Datei → Quelldatei, damit Uploads beim richtigen Eintrag landen
+        self.started = time.time()
+        self.clock = time.perf_counter()
+        self.seconds = None
+
+    def _entry(self, key):
+        entry = self.files.get(key)
+        if entry is None:
+            entry = self.files[key] = {"input": key, "ok": True, "cached": False, "bytes_in": 0,
+                                       "bytes_decoded": 0, "bytes_out": 0, "bytes_uploaded": 0, "stages": {}}
+        return entry
+
+    def add_conversion(self, result):
+        entry = self._entry(result["input"])
+        entry["ok"] = result["ok"]
+        entry["cached"] = bool(result.get("cached"))
+        for field in ("bytes_in", "bytes_decoded", "bytes_out"):
+            entry[field] = result.get(field, 0)
+        entry["stages"].update(result.get("timings", {}))
+        if "output" in result:
+            entry["output"] = result["output"]
+            self.by_output[result["output"]] = result["input"]
+
+    def add_upload(self, stage, path, result):
+        """stage: "shopify" oder "ftp"; übersprungene Dateien zählen ohne Zeit und Bytes."""
+        entry = self._entry(self.by_output.get(path, path))
+        entry["ok"] = entry["ok"] and result["ok"]
+        if result["ok"] and not result.get("skipped") and not result.get("deleted"):
+            entry["stages"][stage] = entry["stages"].get(stage, 0.0) + result.get("seconds", 0.0)
+            try:
+                entry["bytes_uploaded"] += result.get("bytes") or os.path.getsize(path)
+            except OSError:
+                pass
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self.clock
+
+    def summary(self):
+        entries = list(self.files.values())
+        stages = {}
+        for stage in STAGES:
+            values = sorted(entry["stages"][stage] for entry in entries if stage in entry["stages"])
+            if not values:
+                continue
+            stages[stage] = {
+                "files": len(values),
+                "total_s": round(sum(values), 3),
+                "mean_s": round(sum(values) / len(values), 4),
+                **{f"p{p}_s": round(percentile(values, p), 4) for p in PERCENTILES},
+                "max_s": round(values[-1], 4),
+            }
+        total = sum(stages[stage]["total_s"] for stage in stages) or 1.0
+        for stage in stages.values():
+            stage["share"] = round(stage["total_s"] / total, 3)
+
+        slowest = sorted(entries, key=lambda e: sum(e["stages"].values()), reverse=True)[:SLOWEST]
+        seconds = self.seconds if self.seconds is not None else time.perf_counter() - self.clock
+        return {
+            "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "seconds": round(seconds, 3),
+            "files": len(entries),
+            "failed": sum(not entry["ok"] for entry in entries),
+            "cached": sum(entry["cached"] for entry in entries),
+            "bytes_in": sum(entry["bytes_in"] for entry in entries),
+            "bytes_out": sum(entry["bytes_out"] for entry in entries),
+            "bytes_uploaded": sum(entry["bytes_uploaded"] for entry in entries),
+            "stages": stages,
+            "slowest": [
+                {"input": entry["input"], "seconds": round(sum(entry["stages"].values()), 3),
+                 "stages": {stage: round(value, 4) for stage, value in entry["stages"].items()}}
+                for entry in slowest if entry["stages"]
+            ],
+        }
+
+    def text(self):
+        """Kurze Zusammenfassung für das Log der GUI."""
+        summary = self.summary()
+        lines = [
+            f"Laufbericht: {summary['files']} Dateien in {summary['seconds']:.1f} s, "
+            f"{summary['bytes_in'] / 1024 ** 2:.1f} MB → {summary['bytes_out'] / 1024 ** 2:.1f} MB"
+            + (f", {summary['bytes_uploaded'] / 1024 ** 2:.1f} MB hochgeladen" if summary["bytes_uploaded"] else "")
+        ]
+        for stage, values in summary["stages"].items():
+            lines.append(
+                f"  {stage:<8} {values['share'] * 100:5.1f} %  {values['total_s']:8.2f} s  "
+                f"p50 {values['p50_s'] * 1000:.0f} ms · p90 {values['p90_s'] * 1000:.0f} ms · max {values['max_s'] * 1000:.0f} ms"
+            )
+        if summary["slowest"]:
+            slowest = summary["slowest"][0]
+            lines.append(f"  Langsamste Datei: {os.path.basename(slowest['input'])} ({slowest['seconds']:.2f} s)")
+        return "\n".join(lines)
+
+    def save(self, path):
+        """Schreibt den Bericht; mit der Endung .csv eine Zeile pro Datei, sonst JSON mit Zusammenfassung."""
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["input", "output", "ok", "cached", "bytes_in", "bytes_decoded", "bytes_out",
+                                 "bytes_uploaded", "total_s"] + [f"{stage}_s" for stage in STAGES])
+                for entry in self.files.values():
+                    writer.writerow(
+                        [entry["input"], entry.get("output", ""), entry["ok"], entry["cached"], entry["bytes_in"],
+                         entry["bytes_decoded"], entry["bytes_out"], entry["bytes_uploaded"],
+                         round(sum(entry["stages"].values()), 4)]
+                        + [round(entry["stages"][stage], 4) if stage in entry["stages"] else "" for stage in STAGES]
+                    )
+        else:
+            save_json(path, {"summary": self.summary(), "files": list(self.files.values())})
+        return path
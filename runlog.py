@@ -0,0 +1,75 @@
+"""
+Strukturiertes Protokoll als JSON Lines (eine Zeile pro Datei und Schritt) mit Rotation.
+
+Geschrieben wird in einem eigenen Thread (QueueHandler/QueueListener): der Aufrufer legt den
+Eintrag nur in eine Warteschlange, Plattenzugriffe bremsen die Konvertierung also nie.
+"""
+import json
+import logging
+import os
+import queue
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from storage import data_dir
+
+LOG_FILE_BYTES = 10 * 1024 ** 2
+LOG_BACKUPS = 5
+LOGGER_NAME = "image2webp.run"
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Zeitstempel, Stufe und Meldung plus alle Felder aus extra={"data": {...}}."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "data", None) or {})
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def default_log_path():
+    return os.path.join(data_dir(), "logs", "image2webp.jsonl")
+
+def start_file_log(path=None, max_bytes=LOG_FILE_BYTES, backups=LOG_BACKUPS):
+    """
+    Hängt an den Logger LOGGER_NAME einen QueueHandler und startet den Schreib-Thread.
+    Liefert (logger, listener); listener.stop() schreibt den Rest und beendet den Thread.
+    """
+    path = path or default_log_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+    handler.setFormatter(JsonLinesFormatter())
+
+    records = queue.SimpleQueue()
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    for old in [h for h in logger.handlers if isinstance(h, QueueHandler)]:
+        logger.removeHandler(old)
+    logger.addHandler(QueueHandler(records))
+
+    listener = QueueListener(records, handler)
+    listener.start()
+    return logger, listener
+
+def result_record(event, result):
+    """Felder eines Ergebnis-Dicts (Konvertierung, Shopify, FTP) für den Protokolleintrag."""
+    record = {
+        "event": event,
+        "file": result.get("input") or result.get("output") or result.get("path") or result.get("name"),
+        "status": "ok" if result["ok"] else "error",
+    }
+    if result.get("cached") or result.get("skipped"):
+        record["status"] = "skipped"
+    elif result.get("deleted"):
+        record["status"] = "deleted" if result["ok"] else "error"
+    elif result.get("cancelled"):
+        record["status"] = "cancelled"
+    for field in ("output", "bytes_in", "bytes_out", "bytes", "seconds", "timings", "original_size", "size", "id"):
+        if result.get(field) is not None:
+            record[field] = result[field]
+    return record
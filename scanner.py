@@ -0,0 +1,80 @@
+import os
+
+HEADER_BYTES = 16
+
+
+def detect_format(header):
+    """Erkennt das Bildformat an den ersten Bytes der Datei; None, wenn es kein Bild ist."""
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "PNG"
+    if header[:3] == b"\xff\xd8\xff":
+        return "JPEG"
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return "GIF"
+    if header[:4] in (b"II*\x00", b"MM\x00*"):
+        return "TIFF"
+    if header[:2] == b"BM":
+        return "BMP"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "WEBP"
+    if header[4:8] == b"ftyp" and header[8:12] in (b"avif", b"avis"):
+        return "AVIF"
+    return None
+
+def sniff(path):
+    try:
+        with open(path, "rb") as f:
+            return detect_format(f.read(HEADER_BYTES))
+    except OSError:
+        return None
+
+def scan_images(root, exclude=None):
+    """
+    Durchsucht `root` rekursiv mit os.scandir und liefert (Pfad, relativer Ordner) für jedes
+    Bild, sobald es gefunden wird – die Konvertierung kann also schon während der Suche
+    beginnen. Versteckte Einträge, Ordner-Symlinks und `exclude` (z. B. ein Exportordner
+    innerhalb der Quelle) werden übersprungen.
+    """
+    exclude = os.path.realpath(exclude) if exclude else None
+    stack = [root]
+    while stack:
+        folder = stack.pop()
+        if exclude and os.path.realpath(folder) == exclude:
+            continue
+        subfolders = []
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subfolders.append(entry.path)
+                        elif entry.is_file() and sniff(entry.path):
+                            yield entry.path, os.path.relpath(folder, root)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        stack.extend(sorted(subfolders, reverse=True))
+
+def iter_sources(paths, exclude=None):
+    """Wie scan_images, aber für eine Auswahl aus Dateien und Ordnern (Drag & Drop, Dialoge)."""
+    for path in paths:
+        if os.path.isdir(path):
+            yield from scan_images(path, exclude)
+        elif sniff(path):
+            yield path, "."
+
+def iter_jobs(paths, output_root, **options):
+    """
+    Erzeugt Aufträge für run_batch und spiegelt dabei die Unterordner der Quelle in
+    `output_root`. Zielordner werden erst angelegt, wenn das erste Bild darin ankommt.
+    """
+    created = set()
+    for path, relative in iter_sources(paths, exclude=output_root):
+        output_path = os.path.normpath(os.path.join(output_root, relative))
+        if output_path not in created:
+            os.makedirs(output_path, exist_ok=True)
+            created.add(output_path)
+        yield {"input_path": path, "output_path": output_path, **options}
@@ -0,0 +1,443 @@
+import os
+import posixpath
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from storage import load_json, save_json, hash_file, data_dir
+
+API_VERSION = "2025-01"
+
+# Dateien pro stagedUploadsCreate- bzw. fileCreate-Aufruf
+BATCH_SIZE = 25
+# Gleichzeitige POSTs an die Staged-Upload-URLs
+UPLOAD_WORKERS = 4
+# (Verbindungsaufbau, Antwort) in Sekunden
+TIMEOUT = (10, 60)
+# Kostenschätzung für Mutationen, solange Shopify noch keine Kosten gemeldet hat
+DEFAULT_COST = 10
+MAX_THROTTLE_RETRIES = 5
+# Dateien pro Seite beim Auflisten (hält die Abfragekosten unter dem Standard-Kontingent)
+PAGE_SIZE = 100
+INDEX_VERSION = 1
+# So lange bleibt ein frisch hochgeladener Index-Eintrag, auch wenn die Dateiliste ihn noch nicht zeigt
+INDEX_GRACE_SECONDS = 3600
+
+STAGED_UPLOADS_MUTATION = """
+    mutation stagedUploadsCreate($input: [StagedUploadInput!]!) {
+    stagedUploadsCreate(input: $input) {
+        stagedTargets {
+        url
+        resourceUrl
+        parameters {
+            name
+            value
+        }
+        }
+        userErrors {
+        field
+        message
+        }
+    }
+    }
+"""
+
+FILE_CREATE_MUTATION = """
+    mutation fileCreate($files: [FileCreateInput!]!) {
+    fileCreate(files: $files) {
+        files {
+        id
+        alt
+        createdAt
+        preview {
+            image {
+            url
+            }
+        }
+        }
+        userErrors {
+        field
+        message
+        }
+    }
+    }
+"""
+
+FILES_QUERY = """
+    query files($first: Int!, $after: String) {
+    files(first: $first, after: $after, query: "media_type:IMAGE") {
+        pageInfo {
+        hasNextPage
+        endCursor
+        }
+        nodes {
+        id
+        alt
+        ... on MediaImage {
+            image {
+            url
+            }
+            originalSource {
+            fileSize
+            url
+            }
+        }
+        }
+    }
+    }
+"""
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+class ShopifyError(Exception):
+    pass
+
+
+class UploadIndex:
+    """
+    Lokaler Index pro Shop: SHA-256 einer hochgeladenen WebP-Datei → Shopify-Datei-ID und URL,
+    damit identische Bilder nicht erneut als Duplikat angelegt werden.
+
+    Beim Neuaufbau aus der Dateiliste des Shops ist der Inhalt unbekannt; solche Einträge
+    werden über "Dateiname:Größe" gefunden und beim ersten Treffer unter dem Hash übernommen.
+    """
+
+    def __init__(self, domain, path=None):
+        self.path = path or os.path.join(data_dir(), f"shopify-{domain}.json")
+        data = load_json(self.path, {})
+        current = data.get("version") == INDEX_VERSION
+        self.hashes = data.get("hashes", {}) if current else {}
+        self.remote = data.get("remote", {}) if current else {}
+        self.lock = threading.Lock()
+
+    def lookup(self, digest, filename, size):
+        with self.lock:
+            entry = self.hashes.get(digest)
+            if entry is not None and not entry.get("id"):
+                del self.hashes[digest]  # Eintrag ohne ID aus älteren Versionen: neu hochladen
+                entry = None
+            if entry is None:
+                entry = self.remote.get(f"{filename}:{size}")
+                if entry is not None:
+                    self.hashes[digest] = entry
+            return entry
+
+    def add(self, digest, filename, size, file_id, url):
+        """Merkt sich eine hochgeladene Datei; ohne Shopify-ID wird nichts eingetragen."""
+        if not file_id:
+            return
+        with self.lock:
+            self.hashes[digest] = {"id": file_id, "url": url, "filename": filename, "size": size, "uploaded": time.time()}
+
+    def replace_remote(self, files, complete=True):
+        """
+        Übernimmt die Dateiliste des Shops; liefert die Zahl entfernter Hash-Einträge. Fehlt eine
+        ID in der Liste, gilt die Datei nur dann als im Shop gelöscht, wenn die Liste `complete`
+        ist (keine Datei mehr in Verarbeitung) und der Eintrag älter als INDEX_GRACE_SECONDS ist;
+        neue Dateien tauchen in der Suche erst mit Verzögerung auf.
+        """
+        with self.lock:
+            self.remote = {f"{f['filename']}:{f['size']}": f for f in files if f.get("url")}
+            if not complete:
+                return 0
+            ids = {f["id"] for f in files}
+            cutoff = time.time() - INDEX_GRACE_SECONDS
+            removed = [
+                digest for digest, entry in self.hashes.items()
+                if entry.get("id") not in ids and entry.get("uploaded", 0) < cutoff
+            ]
+            for digest in removed:
+                del self.hashes[digest]  # im Shop gelöscht
+            return len(removed)
+
+    def save(self):
+        with self.lock:
+            save_json(self.path, {"version": INDEX_VERSION, "hashes": self.hashes, "remote": self.remote})
+
+
+class ShopifyClient:
+    """
+    Admin-API-Client für einen Shop mit einer gepoolten requests.Session (Keep-alive) und
+    Timeouts. Staged Targets und Dateien werden in Stapeln von bis zu `batch_size` Dateien
+    pro GraphQL-Aufruf angefordert bzw. registriert, die Staged-Uploads laufen parallel.
+
+    Die Anfragen werden am Throttle-Status aus `extensions.cost` getaktet: Reicht das
+    Restguthaben für die nächste Anfrage nicht, wird gewartet, bis es nachgefüllt ist,
+    statt eine THROTTLED-Antwort zu riskieren. Threadsicher.
+
+    Bereits hochgeladene Dateien (gleicher Inhalt laut UploadIndex) werden übersprungen.
+    """
+
+    def __init__(self, domain, token, batch_size=BATCH_SIZE, upload_workers=UPLOAD_WORKERS, timeout=TIMEOUT, index=None):
+        self.domain = domain
+        self.token = token
+        self.index = index or UploadIndex(domain)
+        self.batch_size = batch_size
+        self.upload_workers = upload_workers
+        self.timeout = timeout
+        self.graphql_url = f"https://{domain}/admin/api/{API_VERSION}/graphql.json"
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=upload_workers + 2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "X-Shopify-Access-Token": token,
+        })
+
+        self._lock = threading.Lock()
+        self._available = None  # Restguthaben laut letzter Antwort
+        self._maximum = None
+        self._restore_rate = None
+        self._updated = 0.0
+        self._costs = {}  # zuletzt angefragte Kosten je Operation
+
+    def _wait_for_budget(self, cost):
+        with self._lock:
+            if self._available is None or not self._restore_rate:
+                return
+            now = time.monotonic()
+            available = min(self._maximum, self._available + (now - self._updated) * self._restore_rate)
+            wait = (min(cost, self._maximum) - available) / self._restore_rate
+            # Guthaben schon jetzt reservieren, damit parallele Aufrufe nicht dasselbe einplanen
+            self._available = available - cost
+            self._updated = now
+        if wait > 0:
+            time.sleep(wait)
+
+    def _update_budget(self, payload):
+        cost = (payload.get("extensions") or {}).get("cost") or {}
+        status = cost.get("throttleStatus")
+        if not status:
+            return
+        with self._lock:
+            self._available = status["currentlyAvailable"]
+            self._maximum = status["maximumAvailable"]
+            self._restore_rate = status["restoreRate"]
+            self._updated = time.monotonic()
+
+    def graphql(self, operation, query, variables):
+        """Führt eine GraphQL-Anfrage aus und liefert `data`; wirft ShopifyError bei Fehlern."""
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            self._wait_for_budget(self._costs.get(operation, DEFAULT_COST))
+            response = self.session.post(self.graphql_url, json={"query": query, "variables": variables}, timeout=self.timeout)
+            if response.status_code == 429:
+                time.sleep(float(response.headers.get("Retry-After", 1)))
+                continue
+            if response.status_code >= 300:
+                raise ShopifyError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+            payload = response.json()
+            self._update_budget(payload)
+            requested = ((payload.get("extensions") or {}).get("cost") or {}).get("requestedQueryCost")
+            if requested:
+                self._costs[operation] = requested
+
+            errors = payload.get("errors") or []
+            if any((e.get("extensions") or {}).get("code") == "THROTTLED" for e in errors):
+                continue  # _wait_for_budget wartet beim nächsten Versuch passend
+            if errors:
+                raise ShopifyError(errors[0]["message"])
+            return payload["data"]
+        raise ShopifyError("Shopify drosselt die Anfragen weiterhin (THROTTLED).")
+
+    def staged_targets(self, paths):
+        data = self.graphql("stagedUploadsCreate", STAGED_UPLOADS_MUTATION, {
+            "input": [{
+                "filename": os.path.basename(path),
+                "mimeType": "image/webp",
+                "resource": "FILE",
+                "httpMethod": "POST",
+                "fileSize": str(os.path.getsize(path)),
+            } for path in paths]
+        })["stagedUploadsCreate"]
+        if data["userErrors"]:
+            raise ShopifyError(data["userErrors"][0]["message"])
+        if len(data["stagedTargets"]) != len(paths):
+            raise ShopifyError("Kein Upload-Ziel erhalten.")
+        return data["stagedTargets"]
+
+    def post_staged(self, target, path):
+        """Lädt die Datei an die Staged-Upload-URL; liefert die resourceUrl."""
+        parameters = {p["name"]: p["value"] for p in target["parameters"]}
+        with open(path, "rb") as f:
+            # Nicht an die Session-Header (JSON, Token) gebunden: das Ziel ist ein fremder Speicher
+            response = self.session.post(
+                target["url"], data=parameters, files={"file": (os.path.basename(path), f, "image/webp")},
+                headers={"Content-Type": None, "X-Shopify-Access-Token": None}, timeout=self.timeout,
+            )
+        if response.status_code >= 300:
+            raise ShopifyError(f"Fehler beim Datei-Upload: {response.text[:200]}")
+        return target["resourceUrl"]
+
+    def create_files(self, sources):
+        """
+        Registriert [(resourceUrl, ALT-Text)]; liefert je Eintrag (Datei-ID, URL, Fehlermeldung).
+        Ein Eintrag ohne ID hat immer eine Fehlermeldung.
+        """
+        data = self.graphql("fileCreate", FILE_CREATE_MUTATION, {
+            "files": [{"alt": alt_text, "contentType": "IMAGE", "originalSource": url} for url, alt_text in sources]
+        })["fileCreate"]
+        results = [[None, None, None] for _ in sources]
+        files = data["files"] or []
+        if len(files) == len(sources):
+            matched = zip(files, results)
+        else:
+            # Shopify liefert bei Fehlern weniger Dateien: nur über einen eindeutigen ALT-Text zuordnen
+            by_alt = {}
+            for (_, alt_text), result in zip(sources, results):
+                by_alt.setdefault(alt_text or "", []).append(result)
+            matched = []
+            for file in files:
+                candidates = by_alt.get((file or {}).get("alt") or "")
+                if file and candidates and len(candidates) == 1:
+                    matched.append((file, candidates.pop()))
+        for file, result in matched:
+            if file and file.get("id"):
+                result[0] = file["id"]
+                # Die Vorschau-URL fehlt, solange Shopify das Bild noch verarbeitet
+                result[1] = ((file.get("preview") or {}).get("image") or {}).get("url")
+        for error in data["userErrors"]:
+            field = error.get("field") or []
+            # field sieht aus wie ["files", "3", "alt"]
+            if len(field) > 1 and str(field[1]).isdigit() and int(field[1]) < len(results):
+                results[int(field[1])][2] = error["message"]
+            else:
+                for result in results:
+                    result[2] = result[2] or error["message"]
+        for result in results:
+            if result[0] is None and result[2] is None:
+                result[2] = "Shopify hat keine Datei-ID zurückgegeben."
+        return [tuple(result) for result in results]
+
+    def known(self, path):
+        """Index-Eintrag, falls eine Datei mit identischem Inhalt schon im Shop liegt, sonst None."""
+        return self.index.lookup(hash_file(path), os.path.basename(path), os.path.getsize(path))
+
+    def upload_many(self, items):
+        """
+        Lädt [(Pfad, ALT-Text)] hoch und liefert je Datei ein Ergebnis-Dict mit "path", "ok",
+        "id" und "message"; schon vorhandene Dateien mit "skipped": True und ihrer ID.
+        Wirft keine Ausnahmen für einzelne Dateien.
+        """
+        results = [None] * len(items)
+        new = []
+        for i, (path, _) in enumerate(items):
+            try:
+                entry = self.known(path)
+            except OSError as e:
+                results[i] = {"path": path, "ok": False, "message": f"Datei nicht lesbar: {os.path.basename(path)}: {e}"}
+                continue
+            if entry is not None:
+                results[i] = {"path": path, "ok": True, "skipped": True, "id": entry["id"], "url": entry.get("url"),
+                              "message": f"Bereits in Shopify vorhanden: {os.path.basename(path)} ({entry['id']})"}
+            else:
+                new.append(i)
+
+        for start in range(0, len(new), self.batch_size):
+            batch = new[start:start + self.batch_size]
+            for i, result in zip(batch, self._upload_batch([items[i] for i in batch])):
+                results[i] = result
+        self.index.save()
+        return results
+
+    def list_files(self, include_processing=False):
+        """
+        Liefert alle Bilddateien des Shops seitenweise als Dicts mit id, filename, size, url.
+        Dateien in Verarbeitung (noch ohne URL) nur mit `include_processing`, dann mit url None.
+        """
+        after = None
+        while True:
+            data = self.graphql("files", FILES_QUERY, {"first": PAGE_SIZE, "after": after})["files"]
+            for node in data["nodes"]:
+                source = node.get("originalSource") or {}
+                url = (node.get("image") or {}).get("url") or source.get("url")
+                if not url:
+                    if include_processing:
+                        yield {"id": node["id"], "url": None, "filename": None, "size": None}
+                    continue  # noch in Verarbeitung
+                yield {
+                    "id": node["id"],
+                    "url": url,
+                    "filename": posixpath.basename(urlparse(source.get("url") or url).path),
+                    "size": int(source["fileSize"]) if source.get("fileSize") else None,
+                }
+            if not data["pageInfo"]["hasNextPage"]:
+                return
+            after = data["pageInfo"]["endCursor"]
+
+    def rebuild_index(self):
+        """Baut den Upload-Index aus der Dateiliste des Shops neu auf; liefert (Dateien, entfernte Einträge)."""
+        files = list(self.list_files(include_processing=True))
+        # Solange Shopify noch Dateien verarbeitet, ist die Liste nicht verlässlich vollständig
+        complete = all(f["url"] for f in files)
+        removed = self.index.replace_remote(files, complete)
+        self.index.save()
+        return sum(1 for f in files if f["url"]), removed
+
+    def _upload_batch(self, items):
+        def failed(path, error):
+            return {"path": path, "ok": False, "message": f"Fehler beim Shopify-Upload von {os.path.basename(path)}: {error}"}
+
+        try:
+            targets = self.staged_targets([path for path, _ in items])
+        except (ShopifyError, requests.RequestException, OSError) as e:
+            return [failed(path, e) for path, _ in items]
+
+        def post(index):
+            try:
+                return self.post_staged(targets[index], items[index][0]), None
+            except (ShopifyError, requests.RequestException, OSError) as e:
+                return None, e
+
+        with ThreadPoolExecutor(max_workers=self.upload_workers, thread_name_prefix="shopify") as pool:
+            staged = list(pool.map(post, range(len(items))))
+
+        results = [None] * len(items)
+        pending = []
+        for index, (resource_url, error) in enumerate(staged):
+            if error is not None:
+                results[index] = failed(items[index][0], error)
+            else:
+                pending.append(index)
+
+        if pending:
+            try:
+                created = self.create_files([(staged[i][0], items[i][1]) for i in pending])
+            except (ShopifyError, requests.RequestException) as e:
+                created = [(None, None, e)] * len(pending)
+            for index, (file_id, url, error) in zip(pending, created):
+                path, alt_text = items[index]
+                if error is not None or file_id is None:
+                    results[index] = failed(path, error or "Shopify hat keine Datei-ID zurückgegeben.")
+                else:
+                    filename = os.path.basename(path)
+                    self.index.add(hash_file(path), filename, os.path.getsize(path), file_id, url)
+                    results[index] = {"path": path, "ok": True, "id": file_id, "url": url,
+                                      "message": f"Shopify Hochgeladen: {filename} mit ALT-Text: {alt_text}"}
+        return results
+
+def client_for(domain, token):
+    """Liefert den gemeinsamen Client (und damit die Verbindungen) für einen Shop."""
+    with _clients_lock:
+        client = _clients.get(domain)
+        if client is None or client.token != token:
+            client = _clients[domain] = ShopifyClient(domain, token)
+        return client
+
+def upload_image(image_path, domain, token, alt_text):
+    """
+    Lädt ein Bild über einen Staged Upload in die Dateien des Shops und registriert es mit
+    ALT-Text. Wirft eine Exception mit der Fehlermeldung von Shopify, wenn etwas schiefgeht.
+    """
+    result = client_for(domain, token).upload_many([(image_path, alt_text)])[0]
+    if not result["ok"]:
+        raise ShopifyError(result["message"])
+    return result
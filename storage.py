@@ -0,0 +1,42 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+
+def load_json(path, default):
+    """Liest eine JSON-Datei; fehlt sie oder ist sie beschädigt, wird `default` geliefert."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def save_json(path, data):
+    """Schreibt JSON atomar (erst in eine temporäre Datei, dann umbenennen)."""
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def hash_file(path):
+    """SHA-256 des Dateiinhalts als Hex-String."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+def data_dir():
+    """Ordner für programmeigene Daten (Manifeste, Indizes) des angemeldeten Benutzers."""
+    if sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    elif sys.platform.startswith("win"):
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, "VISIQUE", "WebPConverter")
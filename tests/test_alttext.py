@@ -0,0 +1,79 @@
+"""
+AltTextCache mit Wahrnehmungs-Hash und Farbe.
+
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image, ImageDraw
+
+from alttext import AltTextCache, perceptual_hash
+
+
+class AltTextCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache = AltTextCache(os.path.join(self.root, "cache.json"))
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def shirt(self, name, color, size=(400, 500), canvas=None):
+        """Gleiches Motiv in einer Farbe, optional mittig auf einer weißen quadratischen Fläche."""
+        img = Image.new("RGB", size, (255, 255, 255))
+        draw = ImageDraw.Draw(img)
+        draw.polygon([(80, 60), (320, 60), (390, 160), (320, 200), (320, 470), (80, 470), (80, 200), (10, 160)],
+                     fill=color)
+        draw.ellipse((160, 40, 240, 110), fill=(255, 255, 255))
+        if canvas:
+            square = Image.new("RGB", (canvas, canvas), (255, 255, 255))
+            square.paste(img, ((canvas - size[0]) // 2, (canvas - size[1]) // 2))
+            img = square
+        path = os.path.join(self.root, name)
+        img.save(path, quality=85)
+        return path
+
+    def test_square_variant_hits_cache(self):
+        self.cache.store(perceptual_hash(self.shirt("rot.jpg", (200, 30, 30))), "Rotes T-Shirt", "ai")
+        entry = self.cache.lookup(perceptual_hash(self.shirt("rot-quadrat.jpg", (200, 30, 30), canvas=600)))
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry["text"], "Rotes T-Shirt")
+
+    def test_other_color_is_not_a_hit(self):
+        red = perceptual_hash(self.shirt("rot.jpg", (200, 30, 30)))
+        blue = perceptual_hash(self.shirt("blau.jpg", (30, 30, 200)))
+        # Der dHash allein hielte beide für dasselbe Bild
+        self.assertLessEqual((red[0] ^ blue[0]).bit_count(), self.cache.threshold)
+        self.cache.store(red, "Rotes T-Shirt", "ai")
+        self.assertIsNone(self.cache.lookup(blue))
+
+    def test_store_adds_entry_for_other_color(self):
+        red = perceptual_hash(self.shirt("rot.jpg", (200, 30, 30)))
+        blue = perceptual_hash(self.shirt("blau.jpg", (30, 30, 200)))
+        self.cache.store(red, "Rotes T-Shirt", "ai")
+        self.cache.store(blue, "Blaues T-Shirt", "user")
+        self.assertEqual(len(self.cache.entries), 2)
+        self.assertEqual(self.cache.lookup(red)["text"], "Rotes T-Shirt")
+        self.assertEqual(self.cache.lookup(blue)["text"], "Blaues T-Shirt")
+
+    def test_user_correction_replaces_same_image(self):
+        key = perceptual_hash(self.shirt("rot.jpg", (200, 30, 30)))
+        self.cache.store(key, "T-Shirt", "ai")
+        self.cache.store(key, "Rotes Baumwoll-T-Shirt", "user")
+        self.assertEqual(len(self.cache.entries), 1)
+        self.assertEqual(self.cache.lookup(key)["source"], "user")
+
+    def test_save_and_load(self):
+        key = perceptual_hash(self.shirt("rot.jpg", (200, 30, 30)))
+        self.cache.store(key, "Rotes T-Shirt", "ai")
+        self.cache.save()
+        loaded = AltTextCache(self.cache.path)
+        self.assertEqual(loaded.lookup(key)["text"], "Rotes T-Shirt")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+ConversionCache: Quell-Hash nur bei geänderter Größe oder Änderungszeit neu berechnen.
+
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import cache
+from cache import ConversionCache
+
+
+class ConversionCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.source = os.path.join(self.root, "a.jpg")
+        with open(self.source, "wb") as f:
+            f.write(b"alt")
+        self.job = {"input_path": self.source, "output_path": self.root, "max_size": 1000, "square": False}
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_unchanged_source_is_not_hashed_again(self):
+        first = ConversionCache(self.root)
+        key = first.key(self.job)
+        first.save()
+        with mock.patch.object(cache, "hash_file", side_effect=AssertionError("neu gehasht")):
+            self.assertEqual(ConversionCache(self.root).key(self.job), key)
+
+    def test_changed_source_is_hashed_again(self):
+        first = ConversionCache(self.root)
+        key = first.key(self.job)
+        first.save()
+        with open(self.source, "wb") as f:
+            f.write(b"neu")
+        stat = os.stat(self.source)
+        os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertNotEqual(ConversionCache(self.root).key(self.job), key)
+
+    def test_prune_forgets_deleted_sources(self):
+        first = ConversionCache(self.root)
+        first.key(self.job)
+        os.remove(self.source)
+        first.prune()
+        self.assertEqual(first.sources, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+"""
+FtpUploader gegen einen lokalen pyftpdlib-Server (pip install pyftpdlib).
+
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from ftp_upload import FtpUploader, BLOCK_SIZE
+from watch import ftp_forwarder
+
+try:
+    from pyftpdlib.authorizers import DummyAuthorizer
+    from pyftpdlib.handlers import FTPHandler
+    from pyftpdlib.servers import ThreadedFTPServer
+except ImportError:
+    ThreadedFTPServer = None
+
+
+class FailingReader:
+    """
+    Liest die Datei, bricht aber nach `limit` Bytes mit einem Verbindungsfehler ab. Vorher wird
+    `before_failure()` aufgerufen, damit der Server die Bytes sicher geschrieben hat.
+    """
+
+    def __init__(self, f, limit, before_failure):
+        self.f = f
+        self.limit = limit
+        self.before_failure = before_failure
+
+    def read(self, size):
+        if self.f.tell() >= self.limit:
+            self.before_failure()
+            raise ConnectionResetError("Verbindung verloren")
+        return self.f.read(min(size, self.limit - self.f.tell()))
+
+    def seek(self, position):
+        self.f.seek(position)
+
+
+class FlakyUploader(FtpUploader):
+    """Erster Verbindungsaufbau scheitert (`fail_connect`) bzw. erster STOR bricht nach `fail_after` Bytes ab."""
+
+    def __init__(self, *args, fail_connect=False, fail_after=None, before_failure=None, **kwargs):
+        super().__init__(*args, backoff=0, **kwargs)
+        self.fail_connect = fail_connect
+        self.fail_after = fail_after
+        self.before_failure = before_failure
+
+    def connect(self):
+        if self.fail_connect:
+            self.fail_connect = False
+            raise ConnectionRefusedError("Verbindung abgelehnt")
+        ftp = super().connect()
+        if self.fail_after is not None:
+            limit, self.fail_after = self.fail_after, None
+            storbinary = ftp.storbinary
+
+            def failing_storbinary(cmd, fp, *args, **kwargs):
+                ftp.storbinary = storbinary
+                return storbinary(cmd, FailingReader(fp, limit, self.before_failure), *args, **kwargs)
+
+            ftp.storbinary = failing_storbinary
+        return ftp
+
+
+@unittest.skipIf(ThreadedFTPServer is None, "pyftpdlib ist nicht installiert")
+class FtpUploaderTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Ein Server für alle Tests: pyftpdlib teilt sich die IOLoop zwischen Servern
+        cls.root = tempfile.mkdtemp()
+        cls.remote = os.path.join(cls.root, "remote")
+        os.makedirs(cls.remote)
+        authorizer = DummyAuthorizer()
+        authorizer.add_user("user", "pass", cls.remote, perm="elradfmwMT")
+        handler = type("Handler", (FTPHandler,), {"authorizer": authorizer})
+        cls.server = ThreadedFTPServer(("127.0.0.1", 0), handler)
+        cls.port = cls.server.socket.getsockname()[1]
+        cls.thread = threading.Thread(target=cls.server.serve_forever, kwargs={"timeout": 0.1}, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close_all()
+        cls.thread.join(5)
+        shutil.rmtree(cls.root, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(self.remote)
+        os.makedirs(self.remote)
+        self.local = os.path.join(self.root, "a.webp")
+        self.data = os.urandom(5 * BLOCK_SIZE + 123)
+        with open(self.local, "wb") as f:
+            f.write(self.data)
+
+    def uploader(self, **kwargs):
+        return FlakyUploader("127.0.0.1", "user", "pass", port=self.port, **kwargs)
+
+    def remote_data(self):
+        with open(os.path.join(self.remote, "a.webp"), "rb") as f:
+            return f.read()
+
+    def wait_for_remote_size(self, size, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if os.path.getsize(os.path.join(self.remote, "a.webp")) == size:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.01)
+
+    def put_remote(self, data):
+        with open(os.path.join(self.remote, "a.webp"), "wb") as f:
+            f.write(data)
+
+    def test_upload(self):
+        uploader = self.uploader()
+        result = uploader.upload(self.local)
+        uploader.close()
+        self.assertTrue(result["ok"], result["message"])
+        self.assertEqual(result["resumed_from"], 0)
+        self.assertEqual(self.remote_data(), self.data)
+
+    def test_failed_connect_does_not_resume_old_file_of_same_size(self):
+        self.put_remote(os.urandom(len(self.data)))
+        uploader = self.uploader(fail_connect=True)
+        result = uploader.upload(self.local)
+        uploader.close()
+        self.assertTrue(result["ok"], result["message"])
+        self.assertEqual(result["attempts"], 2)
+        self.assertEqual(result["resumed_from"], 0)
+        self.assertEqual(self.remote_data(), self.data)
+
+    def test_failed_connect_does_not_splice_smaller_old_file(self):
+        self.put_remote(os.urandom(2 * BLOCK_SIZE))
+        uploader = self.uploader(fail_connect=True)
+        result = uploader.upload(self.local)
+        uploader.close()
+        self.assertTrue(result["ok"], result["message"])
+        self.assertEqual(result["resumed_from"], 0)
+        self.assertEqual(self.remote_data(), self.data)
+
+    def test_interrupted_transfer_resumes(self):
+        self.put_remote(os.urandom(len(self.data)))  # alte Version wird beim ersten STOR ersetzt
+        uploader = self.uploader(fail_after=3 * BLOCK_SIZE,
+                                 before_failure=lambda: self.wait_for_remote_size(3 * BLOCK_SIZE))
+        result = uploader.upload(self.local)
+        uploader.close()
+        self.assertTrue(result["ok"], result["message"])
+        self.assertEqual(result["attempts"], 2)
+        self.assertEqual(result["resumed_from"], 3 * BLOCK_SIZE)
+        self.assertEqual(self.remote_data(), self.data)
+
+    def test_permanent_error_is_not_retried(self):
+        uploader = self.uploader()
+        result = uploader.upload(self.local, remote_name="fehlt/a.webp")
+        uploader.close()
+        self.assertFalse(result["ok"])
+        self.assertEqual(result["attempts"], 1)
+
+    def test_forwarder_keeps_subfolders_apart(self):
+        output_root = os.path.join(self.root, "export")
+        results = []
+        for folder in ("herren", os.path.join("damen", "shirts")):
+            os.makedirs(os.path.join(output_root, folder), exist_ok=True)
+            path = os.path.join(output_root, folder, "shirt.webp")
+            with open(path, "wb") as f:
+                f.write(folder.encode())
+            results.append({"output": path})
+        uploader = self.uploader(sessions=2)
+        upload, idle = ftp_forwarder(uploader, output_root)
+        answers = upload(results)
+        self.assertTrue(all(answer["ok"] for answer in answers), answers)
+        # Weitere Aufrufe im selben Stapel nutzen dieselben Verbindungen
+        logins = len(uploader._connections)
+        upload(results)
+        self.assertEqual(len(uploader._connections), logins)
+        idle()
+        self.assertEqual(uploader._connections, [])
+        for folder in ("herren", os.path.join("damen", "shirts")):
+            with open(os.path.join(self.remote, folder, "shirt.webp"), "rb") as f:
+                self.assertEqual(f.read(), folder.encode())
+
+
+if __name__ == "__main__":
+    unittest.main()
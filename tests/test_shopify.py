@@ -0,0 +1,128 @@
+"""
+ShopifyClient: Zuordnung der fileCreate-Antwort (files, userErrors) zu den hochgeladenen Dateien,
+mit gestubbten GraphQL-Antworten statt eines echten Shops, und der Abgleich des UploadIndex.
+
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from shopify import ShopifyClient, UploadIndex, INDEX_GRACE_SECONDS
+
+
+class StubClient(ShopifyClient):
+    """Staged Uploads gelingen immer, fileCreate liefert `response`."""
+
+    def __init__(self, index, response):
+        super().__init__("test.myshopify.com", "token", index=index)
+        self.response = response
+
+    def staged_targets(self, paths):
+        return [{"url": "https://staged.example", "resourceUrl": f"https://staged.example/{i}", "parameters": []}
+                for i in range(len(paths))]
+
+    def post_staged(self, target, path):
+        return target["resourceUrl"]
+
+    def graphql(self, operation, query, variables):
+        return {"fileCreate": self.response}
+
+
+class CreateFilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.index = UploadIndex("test.myshopify.com", os.path.join(self.root, "index.json"))
+        self.items = []
+        for name in ("a", "b", "c"):
+            path = os.path.join(self.root, f"{name}.webp")
+            with open(path, "wb") as f:
+                f.write(name.encode())
+            self.items.append((path, f"ALT {name}"))
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def upload(self, response):
+        return StubClient(self.index, response).upload_many(self.items)
+
+    def file(self, name):
+        return {"id": f"gid://shopify/MediaImage/{name}", "alt": f"ALT {name}", "preview": None}
+
+    def test_all_files_created(self):
+        results = self.upload({"files": [self.file(n) for n in "abc"], "userErrors": []})
+        self.assertEqual([r["id"] for r in results], [f"gid://shopify/MediaImage/{n}" for n in "abc"])
+        self.assertEqual(len(self.index.hashes), 3)
+
+    def test_empty_files_with_indexed_error(self):
+        results = self.upload({"files": [], "userErrors": [
+            {"field": ["files", "1", "originalSource"], "message": "Ungültige Quelle"},
+        ]})
+        self.assertFalse(any(r["ok"] for r in results))
+        self.assertIn("Ungültige Quelle", results[1]["message"])
+        self.assertIn("keine Datei-ID", results[0]["message"])
+        self.assertEqual(self.index.hashes, {})
+
+    def test_shorter_files_list_is_matched_by_alt(self):
+        results = self.upload({"files": [self.file("c")], "userErrors": [
+            {"field": ["files", "0", "alt"], "message": "ALT-Text zu lang"},
+        ]})
+        self.assertEqual([r["ok"] for r in results], [False, False, True])
+        self.assertEqual(results[2]["id"], "gid://shopify/MediaImage/c")
+        self.assertEqual([entry["id"] for entry in self.index.hashes.values()], ["gid://shopify/MediaImage/c"])
+
+    def test_global_error(self):
+        results = self.upload({"files": None, "userErrors": [{"field": None, "message": "Zugriff verweigert"}]})
+        self.assertTrue(all("Zugriff verweigert" in r["message"] for r in results))
+        self.assertEqual(self.index.hashes, {})
+
+    def test_failed_files_are_uploaded_again(self):
+        self.upload({"files": [], "userErrors": []})
+        results = self.upload({"files": [self.file(n) for n in "abc"], "userErrors": []})
+        self.assertFalse(any(r.get("skipped") for r in results))
+        self.assertTrue(all(r["ok"] for r in results))
+
+
+class UploadIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.index = UploadIndex("test.myshopify.com", os.path.join(self.root, "index.json"))
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def listed(self, file_id, url="https://cdn.example/a.webp"):
+        return {"id": file_id, "url": url, "filename": "a.webp", "size": 1}
+
+    def test_add_without_id_is_ignored(self):
+        self.index.add("hash", "a.webp", 1, None, None)
+        self.assertEqual(self.index.hashes, {})
+
+    def test_entry_without_id_from_older_version_is_not_a_hit(self):
+        self.index.hashes["hash"] = {"id": None, "url": None, "filename": "a.webp", "size": 1}
+        self.assertIsNone(self.index.lookup("hash", "a.webp", 1))
+
+    def test_fresh_upload_missing_from_listing_is_kept(self):
+        self.index.add("hash", "a.webp", 1, "gid://1", None)
+        self.assertEqual(self.index.replace_remote([]), 0)
+        self.assertIn("hash", self.index.hashes)
+
+    def test_old_entry_missing_from_complete_listing_is_removed(self):
+        self.index.add("hash", "a.webp", 1, "gid://1", None)
+        self.index.hashes["hash"]["uploaded"] = time.time() - INDEX_GRACE_SECONDS - 1
+        self.assertEqual(self.index.replace_remote([self.listed("gid://2")]), 1)
+        self.assertNotIn("hash", self.index.hashes)
+
+    def test_incomplete_listing_removes_nothing(self):
+        self.index.add("hash", "a.webp", 1, "gid://1", None)
+        self.index.hashes["hash"]["uploaded"] = time.time() - INDEX_GRACE_SECONDS - 1
+        self.assertEqual(self.index.replace_remote([self.listed("gid://2", url=None)], complete=False), 0)
+        self.assertIn("hash", self.index.hashes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,420 @@
+"""
+Hotfolder: überwacht Quellordner dauerhaft und konvertiert neue oder geänderte Bilder,
+sobald sie fertig geschrieben sind, optional mit Weitergabe an FTP oder Shopify.
+
+Unter Linux meldet inotify (über ctypes, ohne Zusatzpaket) die Änderungen; der Prozess
+schläft im select(), solange nichts passiert. Anderswo, oder wenn inotify nicht verfügbar
+ist, wird der Ordner alle `poll_interval` Sekunden durchsucht.
+
+Eine Datei gilt als fertig, wenn sich Größe und Änderungszeit `settle` Sekunden lang nicht
+mehr geändert haben. Erst dann geht sie als Auftrag an run_batch; der ConversionCache im
+Exportordner überspringt dabei unveränderte Quellen, auch über Neustarts hinweg.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import ConversionCache
+from pipeline import Pipeline
+from scanner import sniff
+
+# So lange müssen Größe und Änderungszeit unverändert bleiben
+SETTLE_SECONDS = 2.0
+POLL_INTERVAL = 2.0
+# Dateien, die Kopierprogramme und Browser während des Schreibens anlegen
+TEMP_SUFFIXES = (".part", ".partial", ".tmp", ".crdownload", ".download", "~")
+
+# inotify-Konstanten aus <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+# IN_MODIFY fehlt bewusst: es käme bei jedem write() des Kopiervorgangs
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_candidate(path):
+    """Sichtbare Datei ohne Temporär-Endung; ob es ein Bild ist, entscheidet erst sniff()."""
+    name = os.path.basename(path)
+    return not name.startswith(".") and not name.lower().endswith(TEMP_SUFFIXES)
+
+def snapshot(roots, exclude=None):
+    """{Pfad: (Größe, mtime_ns)} aller sichtbaren Dateien unter `roots` ohne den Ordner `exclude`."""
+    exclude = os.path.realpath(exclude) if exclude else None
+    files = {}
+    stack = list(roots)
+    while stack:
+        folder = stack.pop()
+        if exclude and os.path.realpath(folder) == exclude:
+            continue
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file() and is_candidate(entry.path):
+                            stat = entry.stat()
+                            files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return files
+
+
+class PollingWatcher:
+    """Vergleicht alle `interval` Sekunden einen Snapshot der Ordner mit dem vorigen."""
+
+    method = "Polling"
+
+    def __init__(self, roots, exclude=None, interval=POLL_INTERVAL):
+        self.roots = roots
+        self.exclude = exclude
+        self.interval = interval
+        self.woken = threading.Event()
+        self.files = snapshot(roots, exclude)
+        self.initial = set(self.files)
+
+    def poll(self, timeout=None):
+        """Wartet bis zu `timeout` Sekunden (höchstens ein Intervall) und liefert geänderte Pfade."""
+        self.woken.wait(self.interval if timeout is None else min(timeout, self.interval))
+        self.woken.clear()
+        files = snapshot(self.roots, self.exclude)
+        changed = {path for path, signature in files.items() if self.files.get(path) != signature}
+        self.files = files
+        return changed
+
+    def wake(self):
+        self.woken.set()
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Rekursive Überwachung mit inotify (nur Linux). Neue Unterordner bekommen sofort eine
+    eigene Überwachung und werden einmal durchsucht, damit Dateien, die vorher schon darin
+    lagen, nicht verloren gehen. Läuft die Ereignis-Warteschlange des Kernels über, wird
+    alles neu durchsucht. Wirft OSError, wenn inotify nicht verfügbar ist.
+    """
+
+    method = "inotify"
+
+    def __init__(self, roots, exclude=None):
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify gibt es nur unter Linux")
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.roots = roots
+        self.exclude = os.path.realpath(exclude) if exclude else None
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 fehlgeschlagen")
+        self.wake_read, self.wake_write = os.pipe()
+        self.folders = {}  # Watch-Deskriptor → Ordner
+        self.initial = set()  # Dateien, die beim Start schon da waren
+        try:
+            for root in roots:
+                self.initial |= self.add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def add_watch(self, folder):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+        if wd < 0:
+            code = ctypes.get_errno()
+            if code == errno.ENOSPC:
+                # Limit fs.inotify.max_user_watches erreicht: lieber ganz auf Polling wechseln
+                raise OSError(code, f"Zu viele überwachte Ordner ({folder})")
+            return  # Ordner inzwischen verschwunden oder nicht lesbar
+        self.folders[wd] = folder
+
+    def add_tree(self, root):
+        """Überwacht `root` samt Unterordnern und liefert die Dateien, die schon darin liegen."""
+        files = set()
+        stack = [root]
+        while stack:
+            folder = stack.pop()
+            if self.exclude and os.path.realpath(folder) == self.exclude:
+                continue
+            self.add_watch(folder)
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.name.startswith("."):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file() and is_candidate(entry.path):
+                                files.add(entry.path)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return files
+
+    def read_events(self):
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def poll(self, timeout=None):
+        """Schläft, bis Ereignisse eintreffen (höchstens `timeout` Sekunden), und liefert geänderte Pfade."""
+        readable, _, _ = select.select([self.fd, self.wake_read], [], [], timeout)
+        if self.wake_read in readable:
+            os.read(self.wake_read, 64)
+        changed = set()
+        while True:
+            events = self.read_events()
+            if not events:
+                break
+            for wd, mask, name in events:
+                if mask & IN_Q_OVERFLOW:
+                    for root in self.roots:
+                        changed |= self.add_tree(root)
+                    continue
+                folder = self.folders.get(wd)
+                if mask & IN_IGNORED:
+                    self.folders.pop(wd, None)
+                    continue
+                if folder is None or not name or name.startswith("."):
+                    continue
+                path = os.path.join(folder, name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        changed |= self.add_tree(path)
+                elif mask & (IN_CREATE | IN_CLOSE_WRITE | IN_MOVED_TO) and is_candidate(path):
+                    changed.add(path)
+        return changed
+
+    def wake(self):
+        try:
+            os.write(self.wake_write, b"\0")
+        except OSError:
+            pass
+
+    def close(self):
+        for fd in (self.fd, getattr(self, "wake_read", None), getattr(self, "wake_write", None)):
+            if fd is not None and fd >= 0:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self.fd = -1
+
+def open_watcher(roots, exclude=None, poll_interval=POLL_INTERVAL, polling=False):
+    """inotify, wenn möglich, sonst Polling (auch für Netzlaufwerke, deren Änderungen inotify nicht sieht)."""
+    if not polling:
+        try:
+            return InotifyWatcher(roots, exclude)
+        except (OSError, AttributeError):
+            pass  # kein Linux, keine libc mit inotify oder Watch-Limit erreicht
+    return PollingWatcher(roots, exclude, poll_interval)
+
+
+class SettleTracker:
+    """Merkt sich gemeldete Dateien, bis Größe und Änderungszeit `settle` Sekunden stabil sind."""
+
+    def __init__(self, settle=SETTLE_SECONDS):
+        self.settle = settle
+        self.pending = {}  # Pfad → ((Größe, mtime_ns), seit wann unverändert)
+
+    def add(self, paths):
+        for path in paths:
+            self.pending[path] = (None, 0.0)
+
+    def next_check(self):
+        """Sekunden bis zur nächsten nötigen Prüfung; None, wenn nichts aussteht."""
+        return self.settle / 2 if self.pending else None
+
+    def ready(self):
+        """Liefert die Dateien, die sich seit `settle` Sekunden nicht mehr verändert haben, und vergisst sie."""
+        now = time.monotonic()
+        ready = []
+        for path, (signature, since) in list(self.pending.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self.pending[path]  # gelöscht oder umbenannt
+                continue
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current != signature:
+                self.pending[path] = (current, now)
+            elif now - since >= self.settle:
+                del self.pending[path]
+                if stat.st_size:  # leere Platzhalter melden sich beim Beschreiben erneut
+                    ready.append(path)
+        return sorted(ready)
+
+
+class HotFolder:
+    """
+    Dauerbetrieb für Quellordner `sources` → Exportordner `output_root` mit den Optionen von
+    convert_image (`job_options`). Beim Start werden vorhandene Bilder einmal abgeglichen,
+    danach nur noch fertig geschriebene neue oder geänderte Dateien.
+
+    Beim Iterieren entstehen dieselben Paare wie bei Pipeline, ("converted", Ergebnis) und
+    ("uploaded", Ergebnis), dazu ("status", Meldung). Läuft, bis `stop()` aufgerufen wird;
+    der Prozesspool besteht nur, solange ein Stapel konvertiert wird. `idle()` wird nach
+    jedem Stapel aufgerufen, etwa um FTP-Verbindungen bis zum nächsten zu schließen.
+    """
+
+    def __init__(self, sources, output_root, job_options, upload=None, workers=None, memory_limit=None,
+                 settle=SETTLE_SECONDS, poll_interval=POLL_INTERVAL, polling=False, initial_scan=True, idle=None):
+        self.sources = [os.path.abspath(source) for source in sources]
+        self.output_root = os.path.abspath(output_root)
+        self.job_options = job_options
+        self.upload = upload
+        self.workers = workers
+        self.memory_limit = memory_limit
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.polling = polling
+        self.initial_scan = initial_scan
+        self.idle = idle
+        self.stop_event = threading.Event()
+        self.watcher = None
+        self.cache = ConversionCache(self.output_root)
+
+    def stop(self):
+        self.stop_event.set()
+        if self.watcher is not None:
+            self.watcher.wake()
+
+    def is_stopped(self):
+        return self.stop_event.is_set()
+
+    def jobs_for(self, paths):
+        """Aufträge wie bei iter_jobs, mit dem Unterordner relativ zur jeweiligen Quelle."""
+        for path in paths:
+            root = next((source for source in self.sources if path.startswith(source + os.sep)), None)
+            if root is None:
+                continue
+            output_path = os.path.normpath(os.path.join(self.output_root, os.path.relpath(os.path.dirname(path), root)))
+            os.makedirs(output_path, exist_ok=True)
+            yield {"input_path": path, "output_path": output_path, **self.job_options}
+
+    def convert(self, jobs):
+        try:
+            yield from Pipeline(jobs, self.upload, self.workers, self.stop_event, self.cache, self.memory_limit)
+        finally:
+            if self.idle is not None:
+                self.idle()
+
+    def __iter__(self):
+        os.makedirs(self.output_root, exist_ok=True)
+        self.watcher = open_watcher(self.sources, self.output_root, self.poll_interval, self.polling)
+        if self.stop_event.is_set():
+            self.watcher.wake()
+        tracker = SettleTracker(self.settle)
+        try:
+            yield "status", (f"Überwache {len(self.sources)} Ordner ({self.watcher.method}), "
+                             f"Export nach {self.output_root}")
+            if self.initial_scan:
+                # Auch vorhandene Dateien könnten gerade noch geschrieben werden
+                tracker.add(self.watcher.initial)
+            while not self.stop_event.is_set():
+                tracker.add(self.watcher.poll(tracker.next_check()))
+                if self.stop_event.is_set():
+                    break
+                ready = [path for path in tracker.ready() if sniff(path)]
+                if ready:
+                    yield "status", (f"{len(ready)} neue oder geänderte Bilder" if len(ready) > 1 else "1 neues oder geändertes Bild")
+                    yield from self.convert(self.jobs_for(ready))
+        finally:
+            self.watcher.close()
+            self.watcher = None
+            self.cache.save()
+
+
+def remote_name(path, output_root):
+    """Pfad relativ zum Exportordner mit "/", damit gleichnamige Bilder aus Unterordnern sich nicht überschreiben."""
+    relative = os.path.relpath(path, output_root)
+    if relative.startswith(os.pardir + os.sep):
+        return os.path.basename(path)
+    return relative.replace(os.sep, "/")
+
+def ftp_forwarder(uploader, output_root):
+    """
+    upload()- und idle()-Funktion für HotFolder/Pipeline: alle erzeugten Varianten per FTP
+    hochladen, über `uploader.sessions` Verbindungen parallel. Die Ordnerstruktur unter
+    `output_root` wird auf dem Server nachgebildet.
+
+    Der Thread-Pool und damit die FTP-Verbindungen (eine pro Thread) bleiben über alle
+    upload()-Aufrufe eines Stapels bestehen; idle() beendet beide bis zum nächsten Stapel.
+    """
+    pools = []
+
+    def send(path):
+        return uploader.upload(path, remote_name(path, output_root), make_folders=True)
+
+    def upload(results):
+        if not pools:
+            pools.append(ThreadPoolExecutor(max_workers=uploader.sessions, thread_name_prefix="ftp"))
+        batches = [[pools[0].submit(send, path) for path in result.get("outputs") or [result["output"]]]
+                   for result in results]
+        answers = []
+        for futures in batches:
+            uploads = [future.result() for future in futures]
+            failed = [item for item in uploads if not item["ok"]]
+            answers.append({
+                "ok": not failed,
+                "bytes": sum(item.get("bytes", 0) for item in uploads),
+                "message": failed[0]["message"] if failed else "; ".join(item["message"] for item in uploads),
+            })
+        return answers
+
+    def idle():
+        while pools:
+            pools.pop().shutdown()
+        uploader.close()
+
+    return upload, idle
+
+def shopify_forwarder(client, alt_text_generator=None):
+    """
+    upload()-Funktion für HotFolder/Pipeline: Hauptdatei zu Shopify. Ohne Dialog kommt der
+    ALT-Text aus dem AltTextCache bzw. von der KI, sonst bleibt er leer.
+    """
+    def upload(results):
+        items = []
+        for result in results:
+            alt_text = ""
+            if alt_text_generator is not None:
+                try:
+                    # Schon im Shop vorhandene Dateien brauchen keinen (bezahlten) Text
+                    if client.known(result["output"]) is None:
+                        answer = alt_text_generator.submit(result["output"]).result()
+                        alt_text = answer["text"] if answer else ""
+                except Exception:
+                    pass  # Upload nicht am ALT-Text scheitern lassen
+            items.append((result["output"], alt_text))
+        return client.upload_many(items)
+    return upload